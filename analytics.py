@@ -0,0 +1,470 @@
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Optional
+from columnar import parse_clock
+import math
+import numpy as np
+import pandas as pd
+
+HOME, AWAY = 0, 1
+
+REGULATION_SECONDS = 4 * 720
+SHOT_TYPES = ('2pt', '3pt')
+# Colunas das estatísticas de arremesso por jogador
+FGM, FGA, FG3M, FG3A, FTM, FTA, PTS = range(7)
+# Colunas das estatísticas de posse por time
+POSS_FGA, POSS_FTA, POSS_OREB, POSS_TOV = range(4)
+# Campos de uma ação usados pelas métricas; edições em outros campos (descrição, qualificadores,
+# assistências) não alteram o estado e não exigem reconstrução
+METRIC_FIELDS = ('period', 'clock', 'teamId', 'personId', 'actionType', 'subType', 'scoreHome', 'scoreAway')
+
+
+def affects_metrics(old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+    """Indica se a edição de uma ação muda algum campo usado pelas métricas."""
+    return any(old.get(field) != new.get(field) for field in METRIC_FIELDS)
+
+
+def carry_scores(raw: List[str], previous: int = 0) -> np.ndarray:
+    """Converte o placar do feed em inteiros, repetindo o último valor conhecido onde ele vier vazio."""
+    values = np.array([int(value) if value else -1 for value in raw], dtype=np.int64)
+    values = np.concatenate(([previous], values))
+    known = np.where(values >= 0, np.arange(len(values)), 0)
+    return values[np.maximum.accumulate(known)][1:]
+
+
+def action_points(events: List[Dict[str, Any]]) -> np.ndarray:
+    """Pontos marcados em cada ação de um jogo completo, pela variação do placar."""
+    home = carry_scores([e['scoreHome'] for e in events])
+    away = carry_scores([e['scoreAway'] for e in events])
+    return np.maximum(np.diff(home, prepend=0), 0) + np.maximum(np.diff(away, prepend=0), 0)
+
+
+class LiveGameAnalytics:
+    """
+    Métricas derivadas de um jogo, atualizadas incrementalmente a partir do play-by-play.
+
+    Cada chamada a `apply` processa só as ações novas, de forma vetorizada com
+    NumPy, e acumula o estado: linha do tempo da margem, sequências de pontos
+    (runs), posses e pace, arremessos por jogador e uma probabilidade de
+    vitória simples.
+    """
+
+    # Desvio padrão da margem final de um jogo inteiro e vantagem de mando (pontos)
+    MARGIN_STDDEV = 13.0
+    HOME_ADVANTAGE = 2.5
+
+    def __init__(self, game_id: str, home_team_id: int, away_team_id: int):
+        self.game_id = game_id
+        self.home_team_id = home_team_id
+        self.away_team_id = away_team_id
+        # Incrementado a cada reconstrução: atualizações parciais só valem dentro da mesma geração
+        self.generation = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Descarta todo o estado acumulado."""
+        self.last_action_number = 0
+        self.action_count = 0
+        self.period = 1
+        self.clock = 720.0
+        self.elapsed = 0.0
+        self.home_score = 0
+        self.away_score = 0
+        self._timeline_elapsed: List[float] = []
+        self._timeline_margin: List[int] = []
+        self._run_side = -1
+        self._run_points = 0
+        self._largest_run = np.zeros(2, dtype=np.int64)
+        self._possession_stats = np.zeros((2, 4), dtype=np.int64)
+        self._players: Dict[int, np.ndarray] = {}
+
+    def sync(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Aplica apenas as ações ainda não processadas da lista completa de eventos.
+
+        As ações novas são localizadas varrendo a lista a partir do fim, então o
+        custo é proporcional ao número de ações novas. Se ações antigas sumiram
+        ou foram inseridas, o estado é reconstruído do zero.
+
+        Args:
+            events: Eventos no formato de get_play_by_play, em ordem
+
+        Returns:
+            True se o estado mudou
+        """
+        start = len(events)
+        while start > 0 and events[start - 1]['actionNumber'] > self.last_action_number:
+            start -= 1
+        if start != self.action_count:
+            self.rebuild(events)
+            return True
+        if start == len(events):
+            return False
+        self.apply(events[start:])
+        return True
+
+    def rebuild(self, events: List[Dict[str, Any]]) -> None:
+        """Reconstrói o estado a partir da lista completa (usado após correções no feed)."""
+        self.generation += 1
+        self.reset()
+        if events:
+            self.apply(events)
+
+    def apply(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Incorpora ações novas ao estado.
+
+        Args:
+            events: Ações com actionNumber acima do último processado, em ordem
+        """
+        count = len(events)
+        period = np.fromiter((e['period'] for e in events), dtype=np.int64, count=count)
+        clock = np.fromiter((parse_clock(e['clock']) for e in events), dtype=np.float64, count=count)
+        team_id = np.fromiter((e['teamId'] for e in events), dtype=np.int64, count=count)
+        person_id = np.fromiter((e['personId'] for e in events), dtype=np.int64, count=count)
+        action_type = np.array([e['actionType'] for e in events])
+        sub_type = np.array([e['subType'] for e in events])
+
+        # Tempo decorrido de jogo (segundos) em cada ação
+        period_length = np.where(period <= 4, 720.0, 300.0)
+        period_start = np.where(period <= 4, (period - 1) * 720.0, REGULATION_SECONDS + (period - 5) * 300.0)
+        elapsed = period_start + period_length - np.where(np.isnan(clock), period_length, clock)
+
+        # Placar corrente: ações sem placar herdam o valor anterior
+        home = carry_scores([e['scoreHome'] for e in events], self.home_score)
+        away = carry_scores([e['scoreAway'] for e in events], self.away_score)
+        home_delta = np.diff(home, prepend=self.home_score)
+        away_delta = np.diff(away, prepend=self.away_score)
+        points = np.maximum(home_delta, 0) + np.maximum(away_delta, 0)
+
+        scoring = (home_delta != 0) | (away_delta != 0)
+        self._timeline_elapsed.extend(elapsed[scoring].tolist())
+        self._timeline_margin.extend((home - away)[scoring].tolist())
+
+        self._apply_runs(np.where(home_delta > 0, HOME, AWAY)[points > 0], points[points > 0])
+
+        side = np.where(team_id == self.home_team_id, HOME, np.where(team_id == self.away_team_id, AWAY, -1))
+        self._apply_possessions(side, action_type, sub_type)
+        self._apply_players(person_id, action_type, points)
+
+        last = events[-1]
+        self.last_action_number = last['actionNumber']
+        self.action_count += count
+        self.period = int(period[-1])
+        if not np.isnan(clock[-1]):
+            self.clock = float(clock[-1])
+        self.elapsed = float(elapsed[-1])
+        self.home_score = int(home[-1])
+        self.away_score = int(away[-1])
+
+    def _apply_runs(self, sides: np.ndarray, points: np.ndarray) -> None:
+        """Atualiza a sequência atual e a maior sequência de pontos sem resposta de cada time."""
+        if not len(sides):
+            return
+        starts = np.flatnonzero(np.r_[True, sides[1:] != sides[:-1]])
+        run_points = np.add.reduceat(points, starts)
+        run_sides = sides[starts]
+        if run_sides[0] == self._run_side:
+            run_points[0] += self._run_points
+        for side in (HOME, AWAY):
+            self._largest_run[side] = max(self._largest_run[side], run_points[run_sides == side].max(initial=0))
+        self._run_side = int(run_sides[-1])
+        self._run_points = int(run_points[-1])
+
+    def _apply_possessions(self, side: np.ndarray, action_type: np.ndarray, sub_type: np.ndarray) -> None:
+        """Acumula arremessos, lances livres, rebotes ofensivos e turnovers por time."""
+        columns = {
+            POSS_FGA: np.isin(action_type, SHOT_TYPES),
+            POSS_FTA: action_type == 'freethrow',
+            POSS_OREB: (action_type == 'rebound') & (sub_type == 'offensive'),
+            POSS_TOV: action_type == 'turnover',
+        }
+        for column, mask in columns.items():
+            counts = np.bincount(side[mask & (side >= 0)], minlength=2)
+            self._possession_stats[:, column] += counts
+
+    def _apply_players(self, person_id: np.ndarray, action_type: np.ndarray, points: np.ndarray) -> None:
+        """Acumula o aproveitamento de arremessos por jogador."""
+        is_shot = np.isin(action_type, SHOT_TYPES)
+        is_three = action_type == '3pt'
+        is_free_throw = action_type == 'freethrow'
+        mask = (is_shot | is_free_throw) & (person_id > 0)
+        if not mask.any():
+            return
+
+        made = points > 0
+        players, index = np.unique(person_id[mask], return_inverse=True)
+        stats = np.zeros((len(players), 7), dtype=np.int64)
+        rows = np.column_stack([
+            is_shot & made, is_shot, is_three & made, is_three, is_free_throw & made, is_free_throw, points,
+        ])[mask]
+        np.add.at(stats, index, rows)
+        for player, row in zip(players.tolist(), stats):
+            if player in self._players:
+                self._players[player] += row
+            else:
+                self._players[player] = row.copy()
+
+    def _remaining_seconds(self) -> float:
+        """Segundos restantes de jogo (na prorrogação, os restantes do período atual)."""
+        if self.period <= 4:
+            return max(0.0, REGULATION_SECONDS - self.elapsed)
+        return self.clock
+
+    def win_probability(self) -> float:
+        """
+        Probabilidade de vitória do mandante por um modelo normal simples:
+        margem atual mais a vantagem de mando restante, sobre o desvio esperado
+        para o tempo que falta.
+        """
+        margin = self.home_score - self.away_score
+        fraction = self._remaining_seconds() / REGULATION_SECONDS
+        if fraction <= 0:
+            return 1.0 if margin > 0 else 0.0 if margin < 0 else 0.5
+        expected = margin + self.HOME_ADVANTAGE * fraction
+        stddev = self.MARGIN_STDDEV * math.sqrt(fraction)
+        return 0.5 * (1 + math.erf(expected / (stddev * math.sqrt(2))))
+
+    @property
+    def timeline_length(self) -> int:
+        """Número de pontos da linha do tempo da margem."""
+        return len(self._timeline_elapsed)
+
+    def summary(self) -> Dict[str, Any]:
+        """Métricas atuais do jogo em formato serializável."""
+        return self._summary(0, self._players)
+
+    def delta(self, timeline_from: int, players: Iterable[int]) -> Dict[str, Any]:
+        """
+        Métricas atuais só com as partes que crescem ao longo do jogo limitadas ao que mudou.
+
+        Args:
+            timeline_from: Pontos da linha do tempo já enviados (vão só os seguintes)
+            players: personIds das ações novas; jogadores sem arremessos são ignorados
+
+        Returns:
+            Mesmo formato de `summary`, com `marginTimelineFrom` indicando a posição dos pontos
+        """
+        data = self._summary(timeline_from, [player for player in set(players) if player in self._players])
+        data['marginTimelineFrom'] = timeline_from
+        return data
+
+    def _summary(self, timeline_from: int, players: Iterable[int]) -> Dict[str, Any]:
+        possessions = (
+            self._possession_stats[:, POSS_FGA]
+            + 0.44 * self._possession_stats[:, POSS_FTA]
+            - self._possession_stats[:, POSS_OREB]
+            + self._possession_stats[:, POSS_TOV]
+        )
+        pace = float(possessions.mean() * 2880 / self.elapsed) if self.elapsed > 0 else 0.0
+        home_probability = self.win_probability()
+        team_ids = {HOME: self.home_team_id, AWAY: self.away_team_id}
+
+        return {
+            'gameId': self.game_id,
+            'lastActionNumber': self.last_action_number,
+            'period': self.period,
+            'homeScore': self.home_score,
+            'awayScore': self.away_score,
+            'margin': self.home_score - self.away_score,
+            'marginTimeline': [
+                {'elapsed': elapsed, 'margin': margin}
+                for elapsed, margin in zip(self._timeline_elapsed[timeline_from:],
+                                           self._timeline_margin[timeline_from:])
+            ],
+            'runs': {
+                'current': {
+                    'teamId': team_ids.get(self._run_side, 0),
+                    'points': self._run_points,
+                },
+                'largest': {
+                    'home': int(self._largest_run[HOME]),
+                    'away': int(self._largest_run[AWAY]),
+                },
+            },
+            'possessions': {
+                'home': round(float(possessions[HOME]), 1),
+                'away': round(float(possessions[AWAY]), 1),
+            },
+            'pace': round(pace, 1),
+            'players': {
+                str(player): {
+                    'fgm': int(row[FGM]), 'fga': int(row[FGA]),
+                    'fg3m': int(row[FG3M]), 'fg3a': int(row[FG3A]),
+                    'ftm': int(row[FTM]), 'fta': int(row[FTA]),
+                    'pts': int(row[PTS]),
+                    'fgPct': round(float(row[FGM] / row[FGA]), 3) if row[FGA] else 0.0,
+                }
+                for player, row in ((player, self._players[player]) for player in players)
+            },
+            'winProbability': {
+                'home': round(home_probability, 4),
+                'away': round(1 - home_probability, 4),
+            },
+        }
+
+
+class AnalyticsStore:
+    """
+    Estado de analytics por jogo (o hub e a rota REST mantêm cada um o seu).
+
+    Mantém no máximo `maxsize` jogos, descartando o usado há mais tempo.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._games: "OrderedDict[str, LiveGameAnalytics]" = OrderedDict()
+
+    def update(self, details: Dict[str, Any], events: List[Dict[str, Any]], rebuild: bool = False) -> bool:
+        """
+        Atualiza o estado do jogo com o play-by-play mais recente.
+
+        Args:
+            details: Detalhes do jogo (para os IDs dos times)
+            events: Lista completa de eventos do play-by-play
+            rebuild: Força reconstrução (ex.: o feed corrigiu ações antigas)
+
+        Returns:
+            True se o estado do jogo mudou
+        """
+        game_id = details['gameId']
+        analytics = self._games.get(game_id)
+        if analytics is None:
+            analytics = LiveGameAnalytics(game_id, details['homeTeam']['teamId'], details['awayTeam']['teamId'])
+            self._games[game_id] = analytics
+            while len(self._games) > self.maxsize:
+                self._games.popitem(last=False)
+        self._games.move_to_end(game_id)
+
+        if rebuild:
+            analytics.rebuild(events)
+            return True
+        return analytics.sync(events)
+
+    def get(self, game_id: str) -> Optional[LiveGameAnalytics]:
+        """Estado atual do jogo, se existir."""
+        return self._games.get(game_id)
+
+
+class NBAAnalytics:
+    """
+    Análises de forma recente e confrontos a partir do game log da temporada.
+
+    Todas as médias saem de um único groupby vetorizado, que funciona tanto
+    para os jogos de um time quanto para a tabela inteira dos 30 times.
+    """
+
+    AVERAGE_COLUMNS = ['PTS', 'OPP_PTS', 'FG_PCT', 'FG3_PCT', 'FT_PCT', 'REB', 'AST', 'TOV', 'PLUS_MINUS']
+
+    def __init__(self):
+        # Forma de todos os times para a última versão do game log vista
+        self._form_key = None
+        self._form: Optional[pd.DataFrame] = None
+
+    def _aggregate(self, games: pd.DataFrame) -> pd.DataFrame:
+        """Médias, campanha e splits casa/fora por time (uma linha por TEAM_ID)."""
+        grouped = games.groupby('TEAM_ID')
+        form = grouped[self.AVERAGE_COLUMNS].mean()
+        form['GP'] = grouped.size()
+        form['W'] = grouped['WIN'].sum()
+        form['L'] = form['GP'] - form['W']
+        splits = games.pivot_table(index='TEAM_ID', columns='HOME', values='PTS', aggfunc='mean')
+        form['HOME_PTS'] = splits.get(True, np.nan)
+        form['AWAY_PTS'] = splits.get(False, np.nan)
+        return form
+
+    def team_form(self, log: pd.DataFrame, last_n: int = 10) -> pd.DataFrame:
+        """
+        Forma recente de todos os times em uma única passada.
+
+        Args:
+            log: Game log da temporada (TeamGameLog.frame())
+            last_n: Número de jogos mais recentes considerados por time
+
+        Returns:
+            DataFrame indexado por TEAM_ID com médias, campanha e splits casa/fora
+        """
+        recent = log.sort_values('GAME_DATE').groupby('TEAM_ID').tail(last_n)
+        return self._aggregate(recent)
+
+    def matchup_totals(self, form: pd.DataFrame) -> pd.DataFrame:
+        """
+        Total de pontos esperado para todos os confrontos mandante x visitante.
+
+        Cada time marca a média entre o que costuma marcar e o que o adversário
+        costuma sofrer; a matriz inteira é calculada por broadcasting.
+
+        Args:
+            form: Resultado de team_form
+
+        Returns:
+            DataFrame (mandante x visitante) com o total esperado
+        """
+        scored = form['PTS'].to_numpy()
+        allowed = form['OPP_PTS'].to_numpy()
+        home_expected = (scored[:, None] + allowed[None, :]) / 2
+        away_expected = (scored[None, :] + allowed[:, None]) / 2
+        return pd.DataFrame(home_expected + away_expected, index=form.index, columns=form.index)
+
+    def season_form(self, game_log, last_n: int = 10) -> pd.DataFrame:
+        """
+        Forma recente de todos os times, recalculada só quando o game log muda.
+
+        Args:
+            game_log: TeamGameLog da temporada (NBAClient.get_season_game_log)
+            last_n: Número de jogos mais recentes considerados por time
+
+        Returns:
+            Resultado de team_form para a versão atual do game log
+        """
+        log = game_log.frame()
+        key = (game_log.season, game_log.version, last_n)
+        if self._form_key != key:
+            self._form = self.team_form(log, last_n) if not log.empty else pd.DataFrame()
+            self._form_key = key
+        return self._form
+
+    def calculate_averages(self, form: pd.DataFrame, team_id: Optional[int]) -> Dict[str, Any]:
+        """
+        Médias de um time a partir da tabela de forma.
+
+        Args:
+            form: Resultado de team_form / season_form
+            team_id: ID do time
+
+        Returns:
+            Dicionário com campanha ('record'), médias e splits casa/fora; vazio se o time não tiver jogos
+        """
+        if team_id not in form.index:
+            return {}
+        row = form.loc[team_id]
+        averages = {'record': f"{int(row['W'])}-{int(row['L'])}"}
+        for column in self.AVERAGE_COLUMNS + ['HOME_PTS', 'AWAY_PTS']:
+            averages[column] = round(float(row[column]), 3) if pd.notna(row[column]) else None
+        return averages
+
+    def analyze_matchup(self, home_team_id: Optional[int], away_team_id: Optional[int],
+                        form: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Compara a forma recente de mandante e visitante.
+
+        Args:
+            home_team_id: ID do mandante
+            away_team_id: ID do visitante
+            form: Resultado de team_form / season_form
+
+        Returns:
+            Dicionário com a forma de cada time, total de pontos esperado e diferença de pontos por jogo
+        """
+        home_form = self.calculate_averages(form, home_team_id)
+        away_form = self.calculate_averages(form, away_team_id)
+        if not home_form or not away_form:
+            return {'home_form': home_form, 'away_form': away_form, 'total_expected_pts': 0.0, 'ppg_diff': 0.0}
+
+        return {
+            'home_team_id': home_team_id,
+            'away_team_id': away_team_id,
+            'home_form': home_form,
+            'away_form': away_form,
+            'total_expected_pts': float(self.matchup_totals(form).loc[home_team_id, away_team_id]),
+            'ppg_diff': home_form['PTS'] - away_form['PTS'],
+        }
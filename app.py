@@ -1,12 +1,50 @@
-from fastapi import FastAPI, HTTPException, WebSocket
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from nba_client import NBAClient
+from async_client import AsyncNBAClient
+from archive import DEFAULT_ARCHIVE_DIR
+from upstream import transport_from_env
+from hub import GameHub, ScoreboardHub
+from polling import PollSchedule
+from analytics import AnalyticsStore
+from shotchart import ShotChartStore, aggregate, to_response
+from responses import EncodedResponse, respond, dumps
+from cache import ResponseCache
+from metrics import (REGISTRY, SERIALIZATION_LATENCY, WEBSOCKET_BYTES, WEBSOCKET_MESSAGES,
+                     Gauge, MetricsMiddleware, monitor_event_loop)
+from logs import configure_logging, get_levels, set_level
+from capture import DEFAULT_CAPTURE_DIR, GameRecorder, GameRecording, GameReplay, list_recordings
+from shared import store_from_env, worker_id
+import columnar
+from typing import Optional
+from contextlib import asynccontextmanager
 import pandas as pd
 import numpy as np
 import asyncio
-import json
+import datetime
+import logging
+import os
 
-app = FastAPI(title="NBA Betting Analytics API", description="API para análises e previsões de jogos da NBA", version="1.0.0")
+configure_logging()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Mantém o snapshot do scoreboard ao vivo atualizado em background
+    # (com backend compartilhado, só o worker líder busca o upstream)
+    if shared_store is not None:
+        scoreboard_refresher = asyncio.create_task(client.live_scoreboard.run_shared(shared_store, WORKER_ID))
+    else:
+        scoreboard_refresher = asyncio.create_task(client.live_scoreboard.run())
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    yield
+    scoreboard_refresher.cancel()
+    loop_monitor.cancel()
+    await client.aclose()
+    if shared_store is not None:
+        await shared_store.aclose()
+
+app = FastAPI(title="NBA Betting Analytics API", description="API para análises e previsões de jogos da NBA", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -16,50 +54,340 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
+# Latência e bytes por rota para o /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Com NBA_UPSTREAM_FIXTURES definida o upstream é substituído por respostas gravadas (benchmarks, uso offline)
+upstream = transport_from_env()
+client = AsyncNBAClient(archive_dir=None if upstream else DEFAULT_ARCHIVE_DIR, transport=upstream)
+# Com NBA_CAPTURE_DIR definida, todo snapshot ao vivo buscado no upstream é gravado para replay
+if os.environ.get('NBA_CAPTURE_DIR'):
+    client.recorder = GameRecorder(DEFAULT_CAPTURE_DIR)
+# Com NBA_SHARED_STORE definida (redis://... ou 'memory'), os workers do uvicorn compartilham
+# as respostas em cache e elegem um líder que faz o polling de cada jogo
+shared_store = store_from_env()
+WORKER_ID = worker_id()
+client.shared = shared_store
+# Analytics dos jogos consultados só via REST; os jogos acompanhados pelo hub usam o estado dele
+analytics = AnalyticsStore()
+shot_charts = ShotChartStore()
+# Respostas já serializadas e comprimidas: dados imutáveis (jogos finalizados, datas passadas)
+# sem expiração e dados ao vivo pelo mesmo TTL do cache do cliente
+encoded_responses = ResponseCache(maxsize=1024)
+hub = GameHub(client, PollSchedule(), store=shared_store, owner=WORKER_ID)
+# Resumo de todos os jogos de hoje, alimentado pelo scoreboard ao vivo
+scoreboard_hub = ScoreboardHub(client)
+
+MAX_BATCH_SIZE = 50
+MAX_RANGE_DAYS = 400
+SSE_KEEPALIVE = 15
 
-client = NBAClient()
+def _cache_metrics():
+    caches = {'responses': client.cache, 'encoded': encoded_responses}
+    return {(name,): cache.stats()['hitRatio'] for name, cache in caches.items()}
+
+REGISTRY.register(Gauge('nba_websocket_subscribers', 'WebSockets inscritos por jogo.', ['game_id'],
+                        collect=lambda: {(game_id,): count for game_id, count in hub.subscriber_counts().items()}))
+REGISTRY.register(Gauge('nba_scoreboard_subscribers', 'Inscritos no stream do scoreboard.',
+                        collect=lambda: {(): scoreboard_hub.subscriber_count()}))
+REGISTRY.register(Gauge('nba_cache_hit_ratio', 'Taxa de acerto dos caches em memória.', ['cache'], collect=_cache_metrics))
+REGISTRY.register(Gauge('nba_upstream_rate_limit_waits', 'Requisições que esperaram o rate limiter do upstream.',
+                        collect=lambda: {(): client.rate_limiter.waits}))
+
+async def _relay(websocket: WebSocket, queue: asyncio.Queue, stream: str):
+    """Repassa as mensagens da fila ao socket até o cliente desconectar."""
+    # Escuta o socket em paralelo para detectar desconexões mesmo sem mensagens novas
+    receiver = asyncio.create_task(websocket.receive_text())
+    try:
+        while True:
+            getter = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            # Se as duas tasks terminaram juntas, a mensagem já saiu da fila e precisa ser enviada
+            if getter in done:
+                with SERIALIZATION_LATENCY.time(kind='websocket'):
+                    payload = dumps(getter.result())
+                await websocket.send_text(payload.decode('utf-8'))
+                WEBSOCKET_MESSAGES.inc(stream=stream)
+                WEBSOCKET_BYTES.inc(len(payload), stream=stream)
+            else:
+                getter.cancel()
+            if receiver in done:
+                receiver.result()  # propaga WebSocketDisconnect
+                receiver = asyncio.create_task(websocket.receive_text())
+    finally:
+        receiver.cancel()
 
 @app.websocket("/ws/games/{game_id}")
-async def websocket_game_updates(websocket: WebSocket, game_id: str):
+async def websocket_game_updates(websocket: WebSocket, game_id: str, since: Optional[int] = None):
     await websocket.accept()
+    # Todos os sockets do mesmo jogo compartilham um único poller no hub.
+    # `since` permite retomar o play-by-play a partir de um actionNumber após reconexão.
+    queue = hub.subscribe(game_id, since)
     try:
-        while True:
-            # Fetch live game details
-            details = client.get_game_details(game_id)
-            if details:
-                print(f"Sending game update for game {game_id}")
-                await websocket.send_json({"type": "game_update", "data": details})
-            
-            # Fetch play-by-play
-            pbp = client.get_play_by_play(game_id)
-            if pbp:
-                print(f"Sending play-by-play update for game {game_id}")
-                await websocket.send_json({"type": "playbyplay_update", "data": pbp})
-            
-            # Wait 30 seconds before next update
-            await asyncio.sleep(10)
+        await _relay(websocket, queue, 'game')
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
-        print(f"WebSocket error for game {game_id}: {e}")
+        logger.error("WebSocket error for game %s: %s", game_id, e, extra={'gameId': game_id})
+        await websocket.close()
     finally:
+        hub.unsubscribe(game_id, queue)
+
+def _parse_game_ids(games: Optional[str]):
+    """IDs separados por vírgula; None quando omitido (todos os jogos de hoje)."""
+    if not games:
+        return None
+    return {game_id.strip() for game_id in games.split(",") if game_id.strip()} or None
+
+@app.websocket("/ws/scoreboard")
+async def websocket_scoreboard(websocket: WebSocket, games: Optional[str] = None):
+    await websocket.accept()
+    # Um socket para vários jogos: snapshot inicial e depois só patches dos campos que mudaram
+    queue = scoreboard_hub.subscribe(_parse_game_ids(games))
+    try:
+        await _relay(websocket, queue, 'scoreboard')
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error("WebSocket error for scoreboard: %s", e)
         await websocket.close()
+    finally:
+        scoreboard_hub.unsubscribe(queue)
+
+@app.get("/scoreboard/stream")
+async def stream_scoreboard(games: Optional[str] = None):
+    """Mesmo conteúdo do /ws/scoreboard via Server-Sent Events."""
+    queue = scoreboard_hub.subscribe(_parse_game_ids(games))
+
+    async def events():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    # Comentário SSE mantém a conexão aberta em proxies
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {dumps(message['data']).decode('utf-8')}\n\n"
+        finally:
+            scoreboard_hub.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 @app.get("/")
 def read_root():
     return {"message": "NBA Betting Analytics API", "version": "1.0.0"}
 
-@app.get("/games/{date}")
-def get_games_by_date(date: str):
-    games = client.get_games_by_date(date)
+@app.get("/stats")
+def get_stats():
+    return client.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/logging")
+def get_log_levels():
+    return {"levels": get_levels()}
+
+@app.put("/logging")
+def put_log_level(level: str, logger_name: Optional[str] = Query(None, alias="logger")):
+    try:
+        effective = set_level(level, logger_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"logger": logger_name or "root", "level": effective}
+
+def _validate_date_range(start_date: str, end_date: str):
+    try:
+        start = datetime.datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.datetime.strptime(end_date, '%Y-%m-%d')
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Datas devem estar no formato YYYY-MM-DD")
+    if end < start:
+        raise HTTPException(status_code=400, detail="'from' deve ser anterior ou igual a 'to'")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Intervalo máximo de {MAX_RANGE_DAYS} dias")
+
+@app.get("/games")
+async def get_games_by_date_range(start_date: str = Query(..., alias="from"), end_date: str = Query(..., alias="to")):
+    _validate_date_range(start_date, end_date)
+
+    async def stream():
+        async for game_date, games in client.get_games_by_date_range(start_date, end_date):
+            yield dumps({"date": game_date, "games": games}) + b"\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# Declarada antes de /games/{date} para que "details" não seja lido como data
+@app.get("/games/details")
+async def get_games_details(ids: str):
+    game_ids = [game_id.strip() for game_id in ids.split(",") if game_id.strip()]
+    if not game_ids:
+        raise HTTPException(status_code=400, detail="Informe ao menos um ID de jogo")
+    if len(game_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Máximo de {MAX_BATCH_SIZE} jogos por requisição")
+    games = await client.get_games_details(game_ids)
     return {"games": games}
 
+def _json_response(request: Request, key: tuple, field: str, value, ttl: Optional[float]):
+    if ttl is None:
+        # Dado imutável: serializa e comprime uma única vez
+        encoded = EncodedResponse({field: value})
+        encoded_responses.set(key, (None, encoded), None)
+        return respond(request, encoded, ttl)
+    # Dado ao vivo: o cliente devolve o mesmo objeto enquanto ele está no cache,
+    # então a resposta só é serializada de novo quando o dado muda
+    hit, entry = encoded_responses.get(key)
+    if hit and entry[0] is value:
+        encoded = entry[1]
+    else:
+        # Muda a cada poucos segundos: compressão mais leve
+        encoded = EncodedResponse({field: value}, compress_level=1)
+        encoded_responses.set(key, (value, encoded), ttl)
+    return respond(request, encoded, ttl)
+
+def _encoded_hit(request: Request, key: tuple):
+    """Resposta pronta de um dado imutável, sem consultar o cliente."""
+    hit, entry = encoded_responses.get(key)
+    if hit and entry[0] is None:
+        return respond(request, entry[1], None)
+    return None
+
+@app.get("/games/{date}")
+async def get_games_by_date(request: Request, date: str):
+    key = ('get_games_by_date', date)
+    cached = _encoded_hit(request, key)
+    if cached is not None:
+        return cached
+    games = await client.get_games_by_date(date)
+    if not games:
+        return {"games": games}
+    return _json_response(request, key, "games", games, client.response_ttl(*key, games))
+
 @app.get("/games/{game_id}/details")
-def get_game_details(game_id: str):
-    details = client.get_game_details(game_id)
+async def get_game_details(request: Request, game_id: str):
+    key = ('get_game_details', game_id)
+    cached = _encoded_hit(request, key)
+    if cached is not None:
+        return cached
+    details = await client.get_game_details(game_id)
     if not details:
         raise HTTPException(status_code=404, detail="Jogo não encontrado")
-    return {"details": details}
+    return _json_response(request, key, "details", details, client.response_ttl(*key, details))
 
 @app.get("/games/{game_id}/playbyplay")
-def get_play_by_play(game_id: str):
-    pbp = client.get_play_by_play(game_id)
-    return {"play_by_play": pbp}
+async def get_play_by_play(request: Request, game_id: str, format: str = Query("json", pattern="^(json|arrow|parquet)$")):
+    key = ('get_play_by_play', game_id)
+    if format == "json":
+        cached = _encoded_hit(request, key)
+        if cached is not None:
+            return cached
+    pbp = await client.get_play_by_play(game_id)
+    if format == "json":
+        if not pbp:
+            return {"play_by_play": pbp}
+        return _json_response(request, key, "play_by_play", pbp, client.response_ttl(*key, pbp))
+
+    # Formato colunar para consumidores analíticos
+    if columnar.pa is None:
+        raise HTTPException(status_code=501, detail="Exportação Arrow/Parquet requer pyarrow")
+    frame = columnar.play_by_play_frame(pbp)
+    if format == "arrow":
+        return Response(columnar.to_arrow(frame), media_type="application/vnd.apache.arrow.stream")
+    return Response(columnar.to_parquet(frame), media_type="application/vnd.apache.parquet")
+
+@app.get("/games/{game_id}/analytics")
+async def get_game_analytics(game_id: str):
+    # Jogo com inscritos: o hub já mantém as métricas (e publica os deltas); só lê o estado dele
+    if hub.subscriber_count(game_id):
+        live = hub.analytics.get(game_id)
+        if live is not None:
+            return {"analytics": live.summary()}
+    details = await client.get_game_details(game_id)
+    if not details:
+        raise HTTPException(status_code=404, detail="Jogo não encontrado")
+    pbp = await client.get_play_by_play(game_id)
+    # Só as ações novas desde a última atualização do jogo são processadas
+    analytics.update(details, pbp)
+    return {"analytics": analytics.get(details['gameId']).summary()}
+
+def _forget_game(game_id: str):
+    """Descarta as respostas em cache do jogo ao iniciar ou encerrar um replay."""
+    for method in ('get_game_details', 'get_play_by_play'):
+        client.cache.invalidate((method, game_id))
+        encoded_responses.invalidate((method, game_id))
+
+@app.get("/replays")
+def get_replays():
+    return {
+        "active": [replay.info() for replay in client.replays.values()],
+        "recordings": list_recordings(DEFAULT_CAPTURE_DIR),
+    }
+
+@app.post("/replays/{game_id}")
+def start_replay(game_id: str, speed: float = Query(1.0, gt=0, le=1000), offset: float = Query(0.0, ge=0)):
+    # O jogo passa a ser servido pela gravação nas mesmas rotas REST e WebSocket
+    try:
+        recording = GameRecording(game_id, DEFAULT_CAPTURE_DIR)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Gravação não encontrada")
+    client.replays[game_id] = GameReplay(recording, speed, offset)
+    _forget_game(game_id)
+    return {"replay": client.replays[game_id].info()}
+
+@app.delete("/replays/{game_id}")
+def stop_replay(game_id: str):
+    if client.replays.pop(game_id, None) is None:
+        raise HTTPException(status_code=404, detail="Replay não encontrado")
+    _forget_game(game_id)
+    return {"stopped": game_id}
+
+@app.get("/shotchart")
+async def get_shot_chart(team: Optional[str] = None, player: Optional[int] = None, game_id: Optional[str] = None,
+                         start_date: Optional[str] = Query(None, alias="from"), end_date: Optional[str] = Query(None, alias="to")):
+    team_id = None
+    if team:
+        team_id = int(team) if team.isdigit() else client.get_team_id(team)
+        if team_id is None:
+            raise HTTPException(status_code=404, detail="Time não encontrado")
+
+    if game_id:
+        game_ids = [gid.strip() for gid in game_id.split(",") if gid.strip()]
+    elif start_date and end_date:
+        _validate_date_range(start_date, end_date)
+        game_ids = [
+            game['gameId']
+            async for _, games in client.get_games_by_date_range(start_date, end_date)
+            for game in games
+            if team_id is None or team_id in (game['homeTeamId'], game['awayTeamId'])
+        ]
+    else:
+        raise HTTPException(status_code=400, detail="Informe 'game_id' ou o intervalo 'from'/'to'")
+
+    # Cada jogo fora do cache de bins e do arquivo local custa uma busca de play-by-play no upstream,
+    # que divide o rate limit com o polling ao vivo; o número dessas buscas por requisição é limitado
+    def missing(gids):
+        return [gid for gid in gids if shot_charts.get(gid) is None
+                and (client.archive is None or not client.archive.contains(('get_play_by_play', gid)))]
+
+    if len(game_ids) > MAX_BATCH_SIZE and len(await asyncio.to_thread(missing, game_ids)) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo de {MAX_BATCH_SIZE} jogos fora do arquivo local por requisição; reduza o intervalo",
+        )
+
+    semaphore = asyncio.Semaphore(client.batch_concurrency)
+
+    async def load(gid: str):
+        # Bins de jogos finalizados já estão prontos; só jogos novos ou ao vivo leem o play-by-play
+        bins = shot_charts.get(gid)
+        if bins is None:
+            async with semaphore:
+                events = await client.get_play_by_play(gid)
+            bins = shot_charts.build(gid, events)
+        return bins
+
+    games = await asyncio.gather(*(load(gid) for gid in game_ids))
+    attempts, made = aggregate(games, team_id, player)
+    return {"games": len(game_ids), **to_response(attempts, made)}
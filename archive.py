@@ -0,0 +1,144 @@
+from typing import Any, Hashable, Optional, Tuple
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+DEFAULT_ARCHIVE_DIR = os.environ.get('NBA_ARCHIVE_DIR', 'data')
+
+
+class GameArchive:
+    """
+    Arquivo local (SQLite) das respostas imutáveis do NBAClient.
+
+    Guarda jogos finalizados (detalhes e play-by-play) e datas passadas do
+    ScoreboardV3 como JSON comprimido com zlib, indexados pela mesma chave
+    usada no cache em memória (nome do método e argumento).
+    """
+
+    def __init__(self, directory: str = DEFAULT_ARCHIVE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'archive.db')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' method TEXT NOT NULL,'
+            ' arg TEXT NOT NULL,'
+            ' payload BLOB NOT NULL,'
+            ' archived_at TEXT NOT NULL,'
+            ' PRIMARY KEY (method, arg))'
+        )
+        self._conn.commit()
+
+    def _split_key(self, key: Hashable) -> Tuple[str, str]:
+        method, arg = key
+        return str(method), str(arg)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Busca uma resposta arquivada.
+
+        Args:
+            key: Tupla (método, argumento), a mesma chave do cache
+
+        Returns:
+            Valor arquivado ou None se não existir
+        """
+        method, arg = self._split_key(key)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload FROM responses WHERE method = ? AND arg = ?', (method, arg)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def contains(self, key: Hashable) -> bool:
+        """Indica se a chave já está arquivada."""
+        method, arg = self._split_key(key)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM responses WHERE method = ? AND arg = ?', (method, arg)
+            ).fetchone()
+        return row is not None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Arquiva uma resposta imutável.
+
+        Args:
+            key: Tupla (método, argumento)
+            value: Valor serializável em JSON
+        """
+        method, arg = self._split_key(key)
+        payload = zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (method, arg, payload, archived_at) VALUES (?, ?, ?, ?)',
+                (method, arg, payload, datetime.datetime.utcnow().isoformat()),
+            )
+            self._conn.commit()
+
+
+def backfill(client, season: str, delay: float = 0.6) -> None:
+    """
+    Preenche o arquivo com todos os jogos de uma temporada.
+
+    Percorre as datas e jogos da temporada pelo LeagueGameLog e chama os
+    métodos do cliente, que arquivam automaticamente tudo que estiver finalizado.
+    Jogos já arquivados são pulados.
+
+    Args:
+        client: NBAClient com arquivo habilitado
+        season: Temporada no formato 'YYYY-YY' (ex.: '2023-24')
+        delay: Pausa em segundos entre chamadas ao upstream
+    """
+    from nba_api.stats.endpoints import leaguegamelog
+
+    log = leaguegamelog.LeagueGameLog(season=season, player_or_team_abbreviation='T')
+    rows = log.get_data_frames()[0][['GAME_ID', 'GAME_DATE']].drop_duplicates('GAME_ID')
+    archive = client.archive
+
+    dates = sorted(rows['GAME_DATE'].unique())
+    for i, game_date in enumerate(dates, 1):
+        if not archive.contains(('get_games_by_date', game_date)):
+            client.get_games_by_date(game_date)
+            time.sleep(delay)
+        print(f"[{i}/{len(dates)}] {game_date}")
+
+    game_ids = list(rows['GAME_ID'])
+    for i, game_id in enumerate(game_ids, 1):
+        for method in ('get_game_details', 'get_play_by_play'):
+            if not archive.contains((method, game_id)):
+                getattr(client, method)(game_id)
+                time.sleep(delay)
+        print(f"[{i}/{len(game_ids)}] {game_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arquivo local de jogos finalizados da NBA")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    backfill_parser = subparsers.add_parser('backfill', help="Arquiva todos os jogos de uma temporada")
+    backfill_parser.add_argument('season', help="Temporada no formato YYYY-YY (ex.: 2023-24)")
+    backfill_parser.add_argument('--dir', default=DEFAULT_ARCHIVE_DIR, help="Diretório do arquivo")
+    backfill_parser.add_argument('--delay', type=float, default=0.6, help="Pausa entre chamadas (segundos)")
+    args = parser.parse_args()
+
+    from nba_client import NBAClient
+
+    client = NBAClient(archive_dir=args.dir)
+    try:
+        backfill(client, args.season, args.delay)
+    except KeyboardInterrupt:
+        print("Backfill interrompido.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,374 @@
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Hashable, AsyncIterator, Tuple
+from nba_client import NBAClient
+from archive import DEFAULT_ARCHIVE_DIR
+from scoreboard import AsyncLiveScoreboard
+from singleflight import SingleFlight
+from ratelimit import TokenBucket
+from metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from shared import IMMUTABLE_TTL, decode, encode
+import asyncio
+import datetime
+import httpx
+import logging
+import time
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele o httpx não decodifica respostas 'br'
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncNBAClient(NBAClient):
+    """
+    Variante assíncrona do NBAClient para uso dentro do event loop (FastAPI).
+
+    Mantém os mesmos nomes de métodos e formatos de retorno do NBAClient, mas
+    fala direto com os endpoints JSON da NBA usando um único httpx.AsyncClient
+    com conexões keep-alive reaproveitadas, em vez das chamadas bloqueantes do
+    nba_api. Cache, arquivo e parsing são herdados do cliente síncrono.
+    """
+
+    STATS_URL = 'https://stats.nba.com/stats'
+    LIVE_URL = 'https://cdn.nba.com/static/json/liveData'
+
+    def __init__(self, cache_size: int = 512, archive_dir: Optional[str] = DEFAULT_ARCHIVE_DIR,
+                 batch_concurrency: int = 8, timeout: float = 10.0, connect_timeout: float = 5.0,
+                 max_connections: int = 20, max_keepalive_connections: int = 10,
+                 requests_per_second: float = 5.0, burst: int = 10,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Args:
+            cache_size: Número máximo de respostas no cache em memória
+            archive_dir: Diretório do arquivo local (None desabilita)
+            batch_concurrency: Máximo de jogos buscados em paralelo por get_games_details
+            timeout: Timeout de leitura/escrita por requisição (segundos)
+            connect_timeout: Timeout de conexão e de espera por uma conexão livre no pool (segundos)
+            max_connections: Máximo de requisições simultâneas ao upstream
+            max_keepalive_connections: Conexões ociosas mantidas abertas no pool
+            requests_per_second: Limite global de requisições ao upstream por segundo
+            burst: Rajada máxima de requisições acima do limite médio
+            transport: Transporte HTTP alternativo (ex.: upstream gravado do upstream.py);
+                com ele os limites do pool não se aplicam
+        """
+        super().__init__(cache_size, archive_dir, batch_concurrency)
+        # O Host é definido por requisição, pois o pool atende stats.nba.com e cdn.nba.com
+        headers = {key: value for key, value in self.headers.items() if key != 'Host'}
+        if brotli is None:
+            headers['Accept-Encoding'] = 'gzip, deflate'
+        self.http = httpx.AsyncClient(
+            headers=headers,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout, pool=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            transport=transport,
+        )
+        self.live_scoreboard = AsyncLiveScoreboard(self._fetch_live_games)
+        # Chamadas concorrentes idênticas compartilham uma única busca no upstream
+        self.flights = SingleFlight()
+        # Limite global de requisições ao upstream (polling e rotas REST)
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        # Gravação dos snapshots ao vivo (capture.GameRecorder), desligada por padrão
+        self.recorder = None
+        # Jogos servidos a partir de uma gravação (capture.GameReplay) em vez do upstream
+        self.replays: Dict[str, Any] = {}
+        # Backend compartilhado entre workers (shared.py); None = cache só local
+        self.shared = None
+
+    async def aclose(self) -> None:
+        """Fecha as conexões do pool HTTP."""
+        await self.http.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores do cache e da deduplicação de chamadas ao upstream."""
+        return {
+            'cache': self.cache.stats(),
+            'singleFlight': self.flights.stats(),
+            'rateLimiter': {'waits': self.rate_limiter.waits},
+        }
+
+    async def _get_json(self, url: str, params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Faz um GET no upstream e retorna o JSON da resposta."""
+        # Ex.: 'scoreboardv3', 'boxscoresummaryv3', 'todaysScoreboard', 'playbyplay'
+        endpoint = url.rsplit('/', 1)[-1].split('_')[0].removesuffix('.json')
+        await self.rate_limiter.acquire()
+        started = time.perf_counter()
+        try:
+            response = await self.http.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            UPSTREAM_ERRORS.inc(endpoint=endpoint, reason=str(e.response.status_code))
+            raise
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(endpoint=endpoint, reason=type(e).__name__)
+            raise
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint)
+
+    async def _cached(self, key: Hashable, fetch: Callable[[], Awaitable[Any]],
+                      ttl_for: Callable[[Any], Optional[float]]) -> Any:
+        """
+        Versão assíncrona de NBAClient._cached: cache em memória, arquivo em disco
+        e, por último, o upstream. Em caso de miss, chamadores concorrentes com a
+        mesma chave aguardam uma única busca.
+        """
+        hit, value = self.cache.get(key)
+        if hit:
+            return value
+        return await self.flights.do(key, lambda: self._load(key, fetch, ttl_for))
+
+    async def _load(self, key: Hashable, fetch: Callable[[], Awaitable[Any]],
+                    ttl_for: Callable[[Any], Optional[float]]) -> Any:
+        """Busca `key` no arquivo, no backend compartilhado ou no upstream e armazena o resultado."""
+        if self.archive is not None:
+            value = await asyncio.to_thread(self.archive.get, key)
+            # Mesma regra do NBAClient._cached: só valores finais são servidos do arquivo
+            if value is not None and ttl_for(value) is None:
+                self.cache.set(key, value, None)
+                return value
+
+        # v2: entradas com o valor e o instante de expiração ({'value', 'expiresAt'})
+        shared_key = 'nba:cache:v2:' + ':'.join(str(part) for part in key)
+        if self.shared is not None:
+            # Outro worker pode já ter buscado o valor no upstream
+            try:
+                raw = await self.shared.get(shared_key)
+            except Exception as e:
+                logger.warning("Shared store unavailable: %s", e)
+                raw = None
+            if raw is not None:
+                entry = decode(raw)
+                # A expiração vem de quem gravou: o valor expira em todos os workers ao mesmo tempo
+                remaining = None if entry['expiresAt'] is None else entry['expiresAt'] - time.time()
+                if remaining is None or remaining > 0:
+                    self.cache.set(key, entry['value'], remaining)
+                    return entry['value']
+
+        value = await fetch()
+        if value and self.recorder is not None:
+            await asyncio.to_thread(self.recorder.record, key, value)
+        # None = erro no upstream; listas vazias (datas sem jogos) também são armazenadas
+        if value is not None:
+            ttl = ttl_for(value)
+            if ttl is None and self.archive is not None:
+                await asyncio.to_thread(self.archive.put, key, value)
+            self.cache.set(key, value, ttl)
+            if self.shared is not None:
+                try:
+                    entry = {'value': value, 'expiresAt': None if ttl is None else time.time() + ttl}
+                    await self.shared.set(shared_key, encode(entry), IMMUTABLE_TTL if ttl is None else ttl)
+                except Exception as e:
+                    logger.warning("Shared store unavailable: %s", e)
+        return value
+
+    def replay_speed(self, game_id: str) -> float:
+        """Velocidade da reprodução do jogo (1.0 se ele vem do upstream)."""
+        replay = self.replays.get(game_id)
+        return replay.speed if replay is not None else 1.0
+
+    async def _fetch_live_games(self) -> List[Dict[str, Any]]:
+        """Busca a lista de jogos do ScoreBoard ao vivo."""
+        data = await self.flights.do(
+            ('live_scoreboard',),
+            lambda: self._get_json(f'{self.LIVE_URL}/scoreboard/todaysScoreboard_00.json'),
+        )
+        return data['scoreboard']['games']
+
+    async def get_games_by_date(self, game_date: str) -> List[Dict[str, Any]]:
+        """
+        Busca jogos de uma data específica, usando o cache quando possível.
+
+        Args:
+            game_date: Data no formato 'YYYY-MM-DD'
+
+        Returns:
+            Lista de jogos com informações básicas
+        """
+        # None indica erro no upstream; para quem chama, equivale a nenhum resultado
+        return await self._cached(
+            ('get_games_by_date', game_date),
+            lambda: self._fetch_games_by_date(game_date),
+            lambda games: self._games_ttl(game_date, games),
+        ) or []
+
+    async def _fetch_games_by_date(self, game_date: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Busca jogos de uma data específica usando ScoreboardV3.
+
+        Args:
+            game_date: Data no formato 'YYYY-MM-DD'
+
+        Returns:
+            Lista de jogos com informações básicas
+        """
+        try:
+            date_obj = datetime.datetime.strptime(game_date, '%Y-%m-%d')
+            formatted_date = date_obj.strftime('%m/%d/%Y')
+
+            if formatted_date == self._get_today_et():
+                # Usar o snapshot do scoreboard ao vivo para jogos de hoje
+                games_list = await self.live_scoreboard.games()
+            else:
+                data = await self._get_json(
+                    f'{self.STATS_URL}/scoreboardv3',
+                    {'GameDate': game_date, 'LeagueID': '00'},
+                )
+                games_list = data['scoreboard']['games']
+
+            return self._parse_games(games_list, game_date)
+        except Exception as e:
+            logger.error("Error fetching games for %s: %s", game_date, e, extra={'gameDate': game_date})
+            return None
+
+    async def get_games_by_date_range(self, start_date: str, end_date: str,
+                                      concurrency: Optional[int] = None) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Busca os jogos de cada data do intervalo em paralelo, entregando cada
+        data assim que resolve (não necessariamente em ordem cronológica).
+
+        No máximo `concurrency` datas ficam em andamento ao mesmo tempo, então o
+        uso de memória não cresce com o tamanho do intervalo. Datas em cache ou
+        arquivadas não vão ao upstream.
+
+        Args:
+            start_date: Data inicial no formato 'YYYY-MM-DD'
+            end_date: Data final (inclusiva) no formato 'YYYY-MM-DD'
+            concurrency: Máximo de datas buscadas simultaneamente (padrão: batch_concurrency)
+
+        Yields:
+            Tuplas (data, lista de jogos)
+        """
+        start = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
+        limit = concurrency or self.batch_concurrency
+
+        async def fetch(game_date: str) -> Tuple[str, List[Dict[str, Any]]]:
+            return game_date, await self.get_games_by_date(game_date)
+
+        pending = set()
+        try:
+            day = start
+            while day <= end or pending:
+                while day <= end and len(pending) < limit:
+                    pending.add(asyncio.ensure_future(fetch(day.isoformat())))
+                    day += datetime.timedelta(days=1)
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            # Cliente desconectou no meio do stream: não deixar buscas órfãs
+            for task in pending:
+                task.cancel()
+
+    async def get_game_details(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca detalhes completos de um jogo, usando o cache quando possível.
+
+        Args:
+            game_id: ID do jogo
+
+        Returns:
+            Dicionário com detalhes do jogo
+        """
+        replay = self.replays.get(game_id)
+        if replay is not None:
+            return replay.details()
+        return await self._cached(
+            ('get_game_details', game_id),
+            lambda: self._fetch_game_details(game_id),
+            lambda details: self._ttl_for_statuses([details['status']]),
+        )
+
+    async def _fetch_game_details(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca detalhes completos de um jogo usando BoxScoreSummaryV3.
+        Para jogos ao vivo, usa o snapshot do ScoreBoard.
+
+        Args:
+            game_id: ID do jogo
+
+        Returns:
+            Dicionário com detalhes do jogo
+        """
+        try:
+            # Jogos de temporadas passadas nunca estão ao vivo
+            if not self._is_past_season(game_id):
+                live_game = await self.live_scoreboard.get_game(game_id)
+                if live_game and self._parse_game_status(live_game['gameStatus']) == "live":
+                    return self._build_game_details_from_scoreboard(live_game)
+
+            data = await self._get_json(f'{self.STATS_URL}/boxscoresummaryv3', {'GameID': game_id})
+            return self._parse_box_score(data['boxScoreSummary'])
+        except Exception as e:
+            logger.error("Error fetching game details for %s: %s", game_id, e, extra={'gameId': game_id})
+            return None
+
+    async def get_games_details(self, game_ids: List[str], concurrency: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Busca detalhes de vários jogos em paralelo, limitado por um semáforo.
+
+        Falhas são reportadas por jogo, sem derrubar o lote inteiro.
+
+        Args:
+            game_ids: IDs dos jogos
+            concurrency: Máximo de buscas simultâneas (padrão: batch_concurrency)
+
+        Returns:
+            Dicionário por ID com {'details': ...} ou {'error': ...}
+        """
+        game_ids = list(dict.fromkeys(game_ids))
+        semaphore = asyncio.Semaphore(concurrency or self.batch_concurrency)
+
+        async def fetch(game_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    details = await self.get_game_details(game_id)
+                except Exception as e:
+                    return {'error': str(e)}
+            if not details:
+                return {'error': 'Jogo não encontrado'}
+            return {'details': details}
+
+        results = await asyncio.gather(*(fetch(game_id) for game_id in game_ids))
+        return dict(zip(game_ids, results))
+
+    async def get_play_by_play(self, game_id: str) -> List[Dict[str, Any]]:
+        """
+        Busca eventos do play-by-play, usando o cache quando possível.
+
+        Args:
+            game_id: ID do jogo
+
+        Returns:
+            Lista de eventos do jogo
+        """
+        replay = self.replays.get(game_id)
+        if replay is not None:
+            return replay.play_by_play()
+        # None indica erro no upstream; para quem chama, equivale a nenhum resultado
+        return await self._cached(
+            ('get_play_by_play', game_id),
+            lambda: self._fetch_play_by_play(game_id),
+            lambda events: self._play_by_play_ttl(events),
+        ) or []
+
+    async def _fetch_play_by_play(self, game_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Busca eventos do play-by-play no feed ao vivo da NBA.
+
+        Args:
+            game_id: ID do jogo
+
+        Returns:
+            Lista de eventos do jogo
+        """
+        try:
+            data = await self._get_json(f'{self.LIVE_URL}/playbyplay/playbyplay_{game_id}.json')
+            return self._parse_play_by_play(data['game']['actions'])
+        except Exception as e:
+            logger.error("Error fetching play-by-play for %s: %s", game_id, e, extra={'gameId': game_id})
+            return None
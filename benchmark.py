@@ -0,0 +1,264 @@
+from typing import Any, Dict, List
+from collections import defaultdict
+from upstream import DEFAULT_FIXTURES_DIR, load_fixture
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import httpx
+import numpy as np
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _percentiles(seconds: List[float]) -> Dict[str, float]:
+    """p50/p90/p99/máximo/média em milissegundos."""
+    if not seconds:
+        return {'p50Ms': 0.0, 'p90Ms': 0.0, 'p99Ms': 0.0, 'maxMs': 0.0, 'meanMs': 0.0}
+    values = np.array(seconds) * 1000
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        'p50Ms': round(float(p50), 3),
+        'p90Ms': round(float(p90), 3),
+        'p99Ms': round(float(p99), 3),
+        'maxMs': round(float(values.max()), 3),
+        'meanMs': round(float(values.mean()), 3),
+    }
+
+
+class ServerThread:
+    """Servidor uvicorn com a API em uma thread própria (event loop separado do gerador de carga)."""
+
+    def __init__(self, app, port: int):
+        import uvicorn
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self, timeout: float = 10.0) -> None:
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError("Servidor não iniciou")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def bench_route(http: httpx.AsyncClient, urls: List[str], requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Mede uma rota REST com `concurrency` requisições simultâneas.
+
+    Args:
+        http: Cliente HTTP apontando para a API
+        urls: URLs da rota, usadas em rodízio (ex.: um jogo diferente por requisição)
+        requests: Total de requisições
+        concurrency: Requisições simultâneas
+
+    Returns:
+        Vazão, latências e erros da rota
+    """
+    latencies: List[float] = []
+    errors = 0
+    size = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, size, next_index
+        while next_index < requests:
+            url = urls[next_index % len(urls)]
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await http.get(url)
+                size += len(response.content)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughputRps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'bytes': size,
+        **_percentiles(latencies),
+    }
+
+
+async def bench_websocket(url: str, clients: int, duration: float) -> Dict[str, Any]:
+    """
+    Conecta `clients` sockets ao mesmo jogo e mede o fan-out dos deltas de play-by-play.
+
+    O spread de cada delta é o intervalo entre o primeiro e o último cliente a
+    recebê-lo; só deltas recebidos por todos os clientes entram na conta.
+    """
+    import websockets
+
+    connect_latencies: List[float] = []
+    arrivals: Dict[int, List[float]] = defaultdict(list)
+    messages = 0
+    size = 0
+    failures = 0
+
+    async def client():
+        nonlocal messages, size, failures
+        started = time.perf_counter()
+        try:
+            async with websockets.connect(url, max_size=None) as ws:
+                await ws.recv()
+                connect_latencies.append(time.perf_counter() - started)
+                deadline = time.perf_counter() + duration
+                while True:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        raw = await asyncio.wait_for(ws.recv(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    received = time.perf_counter()
+                    messages += 1
+                    size += len(raw)
+                    message = json.loads(raw)
+                    if message['type'] == 'playbyplay_delta':
+                        arrivals[message['data']['lastActionNumber']].append(received)
+        except (OSError, websockets.exceptions.WebSocketException):
+            failures += 1
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    spreads = [max(times) - min(times) for times in arrivals.values() if len(times) == clients]
+    connect = _percentiles(connect_latencies)
+    spread = _percentiles(spreads)
+    return {
+        'clients': clients,
+        'failures': failures,
+        'connectP50Ms': connect['p50Ms'],
+        'connectP99Ms': connect['p99Ms'],
+        'updates': len(arrivals),
+        'updatesReceivedByAll': len(spreads),
+        'messages': messages,
+        'bytes': size,
+        'fanoutSpreadP50Ms': spread['p50Ms'],
+        'fanoutSpreadP99Ms': spread['p99Ms'],
+        'fanoutSpreadMaxMs': spread['maxMs'],
+    }
+
+
+def build_routes(game_date: str, finished_ids: List[str], live_ids: List[str]) -> Dict[str, List[str]]:
+    """URLs de cada rota medida, a partir dos jogos das fixtures."""
+    routes = {'games_by_date': [f'/games/{game_date}']}
+    for label, ids in (('finished', finished_ids), ('live', live_ids)):
+        if ids:
+            routes[f'details_{label}'] = [f'/games/{game_id}/details' for game_id in ids]
+            routes[f'playbyplay_{label}'] = [f'/games/{game_id}/playbyplay' for game_id in ids]
+            routes[f'playbyplay_arrow_{label}'] = [f'/games/{game_id}/playbyplay?format=arrow' for game_id in ids]
+            routes[f'analytics_{label}'] = [f'/games/{game_id}/analytics' for game_id in ids]
+    if finished_ids:
+        routes['details_batch'] = ['/games/details?ids=' + ','.join(finished_ids[:50])]
+        routes['shotchart'] = ['/shotchart?game_id=' + ','.join(finished_ids)]
+    return routes
+
+
+async def run(base_url: str, routes: Dict[str, List[str]], live_ids: List[str], args) -> Dict[str, Any]:
+    results: Dict[str, Any] = {'rest': {}}
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0,
+                                 limits=httpx.Limits(max_connections=args.concurrency)) as http:
+        for name, urls in routes.items():
+            results['rest'][name] = await bench_route(http, urls, args.requests, args.concurrency)
+            print(f"{name:<26} {results['rest'][name]['throughputRps']:>9.1f} req/s  "
+                  f"p50 {results['rest'][name]['p50Ms']:>8.2f} ms  p99 {results['rest'][name]['p99Ms']:>8.2f} ms  "
+                  f"erros {results['rest'][name]['errors']}")
+
+    if args.ws_clients and live_ids:
+        ws_url = base_url.replace('http://', 'ws://') + f'/ws/games/{live_ids[0]}'
+        results['websocket'] = await bench_websocket(ws_url, args.ws_clients, args.ws_duration)
+        ws = results['websocket']
+        print(f"websocket ({ws['clients']} clientes)  conexão p99 {ws['connectP99Ms']:.2f} ms  "
+              f"{ws['updatesReceivedByAll']} deltas  spread p50 {ws['fanoutSpreadP50Ms']:.2f} ms  "
+              f"p99 {ws['fanoutSpreadP99Ms']:.2f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline da API sobre um upstream gravado (upstream.py)")
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIR, help="Diretório das fixtures")
+    parser.add_argument('--date', help="Data dos jogos finalizados nas fixtures (padrão: a primeira gravada)")
+    parser.add_argument('--requests', type=int, default=500, help="Requisições por rota")
+    parser.add_argument('--concurrency', type=int, default=20, help="Requisições simultâneas")
+    parser.add_argument('--ws-clients', type=int, default=100, help="Clientes WebSocket simulados (0 desativa)")
+    parser.add_argument('--ws-duration', type=float, default=15.0, help="Tempo de escuta de cada cliente (segundos)")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="Intervalo de polling dos jogos ao vivo (segundos)")
+    parser.add_argument('--live-pace', type=float, default=2.0, help="Ações por segundo nos jogos ao vivo simulados")
+    parser.add_argument('--latency', type=float, default=0.05, help="Latência injetada no upstream (segundos)")
+    parser.add_argument('--jitter', type=float, default=0.05, help="Latência extra aleatória no upstream (segundos)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fração de erros 503 injetados no upstream")
+    parser.add_argument('--output', default='bench_results.json', help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+
+    if args.date is None:
+        dates = sorted(os.listdir(os.path.join(args.fixtures, 'scoreboardv3'))) \
+            if os.path.isdir(os.path.join(args.fixtures, 'scoreboardv3')) else []
+        if not dates:
+            parser.error(f"Nenhuma fixture em {args.fixtures}; gere com 'python upstream.py synthesize' ou 'record'")
+        args.date = dates[0].split('.')[0]
+
+    scoreboard = load_fixture(args.fixtures, f'scoreboardv3/{args.date}.json.gz') or {'scoreboard': {'games': []}}
+    today = load_fixture(args.fixtures, 'todaysScoreboard.json.gz') or {'scoreboard': {'games': []}}
+    finished_ids = [str(game['gameId']) for game in scoreboard['scoreboard']['games']]
+    live_ids = [str(game['gameId']) for game in today['scoreboard']['games'] if game['gameStatus'] == 2]
+
+    # O app lê a configuração do upstream no import
+    os.environ['NBA_UPSTREAM_FIXTURES'] = args.fixtures
+    os.environ['NBA_UPSTREAM_LATENCY'] = str(args.latency)
+    os.environ['NBA_UPSTREAM_JITTER'] = str(args.jitter)
+    os.environ['NBA_UPSTREAM_ERROR_RATE'] = str(args.error_rate)
+    os.environ['NBA_UPSTREAM_LIVE_PACE'] = str(args.live_pace)
+    import app as api
+    from polling import PollSchedule
+
+    api.hub.schedule = PollSchedule(live=args.poll_interval, crunch_time=args.poll_interval,
+                                    period_break=args.poll_interval, halftime=args.poll_interval)
+
+    port = _free_port()
+    server = ServerThread(api.app, port)
+    server.start()
+    try:
+        routes = build_routes(args.date, finished_ids, live_ids)
+        results = asyncio.run(run(f'http://127.0.0.1:{port}', routes, live_ids, args))
+    finally:
+        server.stop()
+
+    results = {
+        'startedAt': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'config': vars(args),
+        **results,
+        'upstream': api.upstream.stats(),
+        'service': api.client.stats(),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados gravados em {args.output}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Benchmark interrompido.", file=sys.stderr)
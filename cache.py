@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Cache LRU com TTL por entrada para as respostas do NBAClient.
+
+    Cada entrada tem seu próprio TTL (em segundos); TTL None significa que a
+    entrada só sai do cache por evicção LRU. Quando o cache atinge `maxsize`,
+    a entrada usada há mais tempo é removida.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        # O cliente síncrono é chamado de várias threads (asyncio.to_thread)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Busca uma entrada válida no cache.
+
+        Args:
+            key: Chave da entrada
+
+        Returns:
+            Tupla (encontrado, valor)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        """
+        Armazena uma entrada no cache.
+
+        Args:
+            key: Chave da entrada
+            value: Valor a armazenar
+            ttl: Tempo de vida em segundos (None = até ser removida por LRU)
+        """
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove uma entrada do cache, se existir."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores do cache (tamanho, hits, misses, evicções e taxa de acerto)."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRatio': self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,344 @@
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPTURE_DIR = os.environ.get('NBA_CAPTURE_DIR', 'captures')
+
+# Tipos de registro no log de um jogo
+DETAILS = 0
+PBP_KEYFRAME = 1
+PBP_DELTA = 2
+
+# Entrada do índice: timestamp (epoch), tipo, offset e tamanho do payload no .log
+INDEX_ENTRY = struct.Struct('<dBQI')
+INDEX_DTYPE = np.dtype([('ts', '<f8'), ('kind', 'u1'), ('offset', '<u8'), ('length', '<u4')])
+
+
+def _is_game_end(events: List[Dict[str, Any]]) -> bool:
+    return bool(events) and events[-1]['actionType'] == 'game' and events[-1]['subType'] == 'end'
+
+
+def _apply_delta(actions: Dict[int, Dict[str, Any]], delta: Dict[str, Any]) -> None:
+    for action in delta['upsert']:
+        actions[action['actionNumber']] = action
+    for number in delta['removed']:
+        actions.pop(number, None)
+
+
+def list_recordings(directory: str = DEFAULT_CAPTURE_DIR) -> List[str]:
+    """IDs dos jogos com gravação no diretório."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-4] for name in os.listdir(directory) if name.endswith('.idx'))
+
+
+class GameRecorder:
+    """
+    Grava os snapshots ao vivo de detalhes e play-by-play de cada jogo.
+
+    Cada jogo tem um log append-only (`<game_id>.log`, payloads JSON
+    comprimidos com zlib) e um índice de entradas de tamanho fixo
+    (`<game_id>.idx`) com timestamp, tipo, offset e tamanho de cada registro.
+    Detalhes só são gravados quando mudam; o play-by-play é gravado como delta
+    (ações novas/editadas e removidas) com um snapshot completo (keyframe) a
+    cada `keyframe_interval` registros, para que a leitura possa pular para
+    qualquer ponto aplicando poucos deltas.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CAPTURE_DIR, keyframe_interval: int = 50):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        self._lock = threading.Lock()
+        self._details: Dict[str, Dict[str, Any]] = {}
+        self._actions: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._since_keyframe: Dict[str, int] = {}
+
+    def record(self, key: Hashable, value: Any, ts: Optional[float] = None) -> None:
+        """
+        Grava um valor recém-buscado no upstream, se for de um jogo ao vivo.
+
+        Args:
+            key: Chave do cache do cliente, (método, game_id)
+            value: Valor retornado por get_game_details ou get_play_by_play
+            ts: Timestamp do snapshot (padrão: agora)
+        """
+        method, game_id = key
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            if method == 'get_game_details':
+                self._record_details(str(game_id), value, ts)
+            elif method == 'get_play_by_play':
+                self._record_play_by_play(str(game_id), value, ts)
+
+    def _record_details(self, game_id: str, details: Dict[str, Any], ts: float) -> None:
+        # A gravação começa quando o jogo é visto ao vivo e inclui o snapshot final
+        if details['status'] != 'live' and game_id not in self._details:
+            return
+        if self._details.get(game_id) == details:
+            return
+        self._details[game_id] = details
+        self._append(game_id, DETAILS, details, ts)
+
+    def _record_play_by_play(self, game_id: str, events: List[Dict[str, Any]], ts: float) -> None:
+        if game_id not in self._details:
+            return
+        current = {action['actionNumber']: action for action in events}
+        previous = self._actions.get(game_id)
+        if previous is None or self._since_keyframe[game_id] >= self.keyframe_interval:
+            self._append(game_id, PBP_KEYFRAME, events, ts)
+            self._since_keyframe[game_id] = 0
+        else:
+            upsert = [action for number, action in current.items() if previous.get(number) != action]
+            removed = [number for number in previous if number not in current]
+            if not upsert and not removed:
+                return
+            self._append(game_id, PBP_DELTA, {'upsert': upsert, 'removed': removed}, ts)
+            self._since_keyframe[game_id] += 1
+        self._actions[game_id] = current
+
+        if _is_game_end(events) and self._details[game_id]['status'] == 'finished':
+            # Jogo terminou: nada mais a gravar
+            self._details.pop(game_id)
+            self._actions.pop(game_id)
+            self._since_keyframe.pop(game_id)
+
+    def _append(self, game_id: str, kind: int, payload: Any, ts: float) -> None:
+        """Acrescenta o payload ao log e depois a entrada ao índice (o índice nunca aponta para dados incompletos)."""
+        data = zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        base = os.path.join(self.directory, game_id)
+        with open(base + '.log', 'ab') as log:
+            offset = log.tell()
+            log.write(data)
+        with open(base + '.idx', 'ab') as index:
+            index.write(INDEX_ENTRY.pack(ts, kind, offset, len(data)))
+
+
+class GameRecording:
+    """
+    Leitura de uma gravação: índice e log mapeados em memória.
+
+    As posições de detalhes e keyframes ficam em arrays, então achar o estado
+    em qualquer instante é uma busca binária mais, no máximo, os deltas desde
+    o último keyframe.
+    """
+
+    def __init__(self, game_id: str, directory: str = DEFAULT_CAPTURE_DIR):
+        base = os.path.join(directory, game_id)
+        if not os.path.exists(base + '.idx') or os.path.getsize(base + '.idx') == 0:
+            raise FileNotFoundError(f"Nenhuma gravação para o jogo {game_id}")
+        self.game_id = game_id
+        # Só entradas completas (uma gravação em andamento pode ter uma entrada pela metade)
+        entries = os.path.getsize(base + '.idx') // INDEX_DTYPE.itemsize
+        self.index = np.memmap(base + '.idx', dtype=INDEX_DTYPE, mode='r', shape=(entries,))
+        with open(base + '.log', 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.timestamps = np.asarray(self.index['ts'])
+        kinds = np.asarray(self.index['kind'])
+        self._details_positions = np.flatnonzero(kinds == DETAILS)
+        self._keyframe_positions = np.flatnonzero(kinds == PBP_KEYFRAME)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def start(self) -> float:
+        return float(self.timestamps[0])
+
+    @property
+    def end(self) -> float:
+        return float(self.timestamps[-1])
+
+    def payload(self, position: int) -> Any:
+        """Payload descomprimido do registro na posição informada."""
+        entry = self.index[position]
+        offset = int(entry['offset'])
+        return json.loads(zlib.decompress(self._data[offset:offset + int(entry['length'])]))
+
+    def kind(self, position: int) -> int:
+        return int(self.index[position]['kind'])
+
+    def count_until(self, ts: float) -> int:
+        """Número de registros com timestamp até `ts`."""
+        return int(np.searchsorted(self.timestamps, ts, side='right'))
+
+    def last_details(self, count: int) -> Optional[int]:
+        """Posição do último registro de detalhes entre os `count` primeiros."""
+        i = np.searchsorted(self._details_positions, count) - 1
+        return int(self._details_positions[i]) if i >= 0 else None
+
+    def last_keyframe(self, count: int) -> Optional[int]:
+        """Posição do último keyframe de play-by-play entre os `count` primeiros."""
+        i = np.searchsorted(self._keyframe_positions, count) - 1
+        return int(self._keyframe_positions[i]) if i >= 0 else None
+
+    def state_at(self, ts: float) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Estado do jogo como a API o mostrava em um instante.
+
+        Returns:
+            Tupla (detalhes, play-by-play)
+        """
+        count = self.count_until(ts)
+        details_position = self.last_details(count)
+        details = self.payload(details_position) if details_position is not None else None
+        keyframe = self.last_keyframe(count)
+        if keyframe is None:
+            return details, []
+        actions = {action['actionNumber']: action for action in self.payload(keyframe)}
+        for position in range(keyframe + 1, count):
+            if self.kind(position) == PBP_DELTA:
+                _apply_delta(actions, self.payload(position))
+        return details, sorted(actions.values(), key=lambda action: action['actionNumber'])
+
+
+class GameReplay:
+    """
+    Reprodução de uma gravação em tempo real ou acelerado.
+
+    O instante da gravação avança com o relógio multiplicado por `speed`. O
+    estado é avançado incrementalmente a cada consulta (só os registros novos
+    são lidos), então milhares de reproduções simultâneas custam pouco.
+    """
+
+    def __init__(self, recording: GameRecording, speed: float = 1.0, offset: float = 0.0):
+        """
+        Args:
+            recording: Gravação do jogo
+            speed: Multiplicador de velocidade (1 = tempo real, 100 = 100x)
+            offset: Segundos a partir do início da gravação onde a reprodução começa
+        """
+        self.recording = recording
+        self.speed = speed
+        self.offset = offset
+        self._started = time.monotonic()
+        self._count = 0
+        self._details: Optional[Dict[str, Any]] = None
+        self._actions: Dict[int, Dict[str, Any]] = {}
+        self._events: Optional[List[Dict[str, Any]]] = []
+
+    def position(self) -> float:
+        """Instante atual da reprodução (timestamp da gravação)."""
+        elapsed = (time.monotonic() - self._started) * self.speed
+        return min(self.recording.start + self.offset + elapsed, self.recording.end)
+
+    @property
+    def finished(self) -> bool:
+        return self.position() >= self.recording.end
+
+    def _advance(self) -> None:
+        count = self.recording.count_until(self.position())
+        if count <= self._count:
+            return
+        keyframe = self.recording.last_keyframe(count)
+        if keyframe is not None and keyframe >= self._count:
+            # Um keyframe no caminho dispensa aplicar os deltas anteriores a ele
+            details_position = self.recording.last_details(keyframe + 1)
+            if details_position is not None:
+                self._details = self.recording.payload(details_position)
+            self._actions = {action['actionNumber']: action for action in self.recording.payload(keyframe)}
+            start = keyframe + 1
+        else:
+            start = self._count
+        for position in range(start, count):
+            kind = self.recording.kind(position)
+            if kind == DETAILS:
+                self._details = self.recording.payload(position)
+            elif kind == PBP_DELTA:
+                _apply_delta(self._actions, self.recording.payload(position))
+        self._count = count
+        self._events = None
+
+    def details(self) -> Optional[Dict[str, Any]]:
+        """Detalhes do jogo no instante atual da reprodução."""
+        self._advance()
+        return self._details
+
+    def play_by_play(self) -> List[Dict[str, Any]]:
+        """Play-by-play no instante atual da reprodução."""
+        self._advance()
+        if self._events is None:
+            self._events = sorted(self._actions.values(), key=lambda action: action['actionNumber'])
+        return self._events
+
+    def info(self) -> Dict[str, Any]:
+        """Resumo da reprodução para a API."""
+        return {
+            'gameId': self.recording.game_id,
+            'speed': self.speed,
+            'recordedFrom': self.recording.start,
+            'recordedTo': self.recording.end,
+            'position': self.position(),
+            'elapsed': self.position() - self.recording.start,
+            'finished': self.finished,
+        }
+
+
+async def capture_live_games(client, schedule=None) -> None:
+    """
+    Acompanha todos os jogos ao vivo de hoje até o fim, buscando detalhes e
+    play-by-play na cadência do PollSchedule; o recorder do cliente grava tudo.
+    """
+    from polling import PollSchedule
+
+    schedule = schedule or PollSchedule()
+    watchers: Dict[str, asyncio.Task] = {}
+
+    async def watch(game_id: str) -> None:
+        while True:
+            details = await client.get_game_details(game_id)
+            await client.get_play_by_play(game_id)
+            interval = schedule.interval(details)
+            if interval is None:
+                logger.info("Captura de %s concluída", game_id, extra={'gameId': game_id})
+                return
+            await asyncio.sleep(interval)
+
+    while True:
+        for game in await client.live_scoreboard.games():
+            game_id = str(game['gameId'])
+            if game['gameStatus'] == 2 and game_id not in watchers:
+                logger.info("Capturando %s", game_id, extra={'gameId': game_id})
+                watchers[game_id] = asyncio.create_task(watch(game_id))
+        await asyncio.sleep(client.live_scoreboard.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gravação dos jogos ao vivo para replay")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help="Grava todos os jogos ao vivo de hoje")
+    record_parser.add_argument('--dir', default=DEFAULT_CAPTURE_DIR, help="Diretório das gravações")
+    subparsers.add_parser('list', help="Lista as gravações").add_argument('--dir', default=DEFAULT_CAPTURE_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for game_id in list_recordings(args.dir):
+            recording = GameRecording(game_id, args.dir)
+            print(f"{game_id}  {len(recording)} registros  {(recording.end - recording.start) / 60:.0f} min")
+        return
+
+    from async_client import AsyncNBAClient
+    from logs import configure_logging
+
+    configure_logging(json_format=False)
+    client = AsyncNBAClient(archive_dir=None)
+    client.recorder = GameRecorder(args.dir)
+    try:
+        asyncio.run(capture_live_games(client))
+    except KeyboardInterrupt:
+        print("Captura interrompida.")
+
+
+if __name__ == '__main__':
+    main()
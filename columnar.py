@@ -0,0 +1,96 @@
+from typing import List, Dict, Any
+import re
+import io
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional; só as exportações Arrow/Parquet dependem dele
+    pa = None
+    pq = None
+
+_CLOCK_RE = re.compile(r'PT(?:(\d+)M)?(?:([\d.]+)S)?')
+
+# Colunas categóricas (dictionary-encoded no Arrow/Parquet)
+CATEGORY_COLUMNS = ['actionType', 'subType', 'teamTricode', 'qualifiers']
+
+
+def parse_clock(clock: str) -> float:
+    """
+    Converte o relógio ISO 8601 do feed da NBA ('PT11M42.00S') em segundos restantes.
+
+    Retorna NaN se o relógio estiver vazio ou em formato desconhecido.
+    """
+    match = _CLOCK_RE.fullmatch(clock or '')
+    if not match or not any(match.groups()):
+        return float('nan')
+    minutes, seconds = match.groups()
+    return int(minutes or 0) * 60 + float(seconds or 0)
+
+
+def _score(value: str) -> int:
+    return int(value) if value else 0
+
+
+def _coord(value: Any) -> float:
+    return float('nan') if value is None else float(value)
+
+
+def play_by_play_frame(events: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Converte a lista de eventos de NBAClient.get_play_by_play em um DataFrame colunar compacto.
+
+    Cada campo vira uma coluna NumPy tipada (int32/int16/float32) em vez de um
+    dict Python por evento; texto repetitivo (tipo de ação, time, qualifiers)
+    vira coluna categórica. Os qualifiers de cada ação são unidos com ';'.
+
+    Args:
+        events: Eventos no formato de get_play_by_play
+
+    Returns:
+        DataFrame com uma linha por ação
+    """
+    frame = pd.DataFrame({
+        'actionNumber': np.fromiter((e['actionNumber'] for e in events), dtype=np.int32, count=len(events)),
+        'period': np.fromiter((e['period'] for e in events), dtype=np.int16, count=len(events)),
+        'clock': np.fromiter((parse_clock(e['clock']) for e in events), dtype=np.float32, count=len(events)),
+        'teamId': np.fromiter((e['teamId'] for e in events), dtype=np.int32, count=len(events)),
+        'teamTricode': [e['teamTricode'] for e in events],
+        'personId': np.fromiter((e['personId'] for e in events), dtype=np.int32, count=len(events)),
+        'actionType': [e['actionType'] for e in events],
+        'subType': [e['subType'] for e in events],
+        'scoreHome': np.fromiter((_score(e['scoreHome']) for e in events), dtype=np.int16, count=len(events)),
+        'scoreAway': np.fromiter((_score(e['scoreAway']) for e in events), dtype=np.int16, count=len(events)),
+        'x': np.fromiter((_coord(e['x']) for e in events), dtype=np.float32, count=len(events)),
+        'y': np.fromiter((_coord(e['y']) for e in events), dtype=np.float32, count=len(events)),
+        'qualifiers': [';'.join(e['qualifiers']) for e in events],
+    })
+    for column in CATEGORY_COLUMNS:
+        frame[column] = frame[column].astype('category')
+    return frame
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow não está instalado; instale-o para exportar Arrow/Parquet")
+
+
+def to_arrow(frame: pd.DataFrame) -> bytes:
+    """Serializa o DataFrame no formato Arrow IPC stream (colunas categóricas ficam dictionary-encoded)."""
+    _require_pyarrow()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def to_parquet(frame: pd.DataFrame) -> bytes:
+    """Serializa o DataFrame em Parquet (compressão zstd)."""
+    _require_pyarrow()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression='zstd')
+    return buffer.getvalue()
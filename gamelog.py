@@ -0,0 +1,81 @@
+from nba_api.stats.endpoints import leaguegamelog
+from typing import Dict, Optional
+import pandas as pd
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TeamGameLog:
+    """
+    Tabela com o game log de todos os times em uma temporada (LeagueGameLog).
+
+    É buscada uma vez e depois atualizada incrementalmente, pedindo ao
+    upstream só os jogos a partir da última data já carregada. Consultas por
+    time usam um índice por TEAM_ID montado a cada atualização.
+    """
+
+    def __init__(self, season: str, max_age: float = 900.0):
+        """
+        Args:
+            season: Temporada no formato 'YYYY-YY'
+            max_age: Idade máxima da tabela (segundos) antes de buscar jogos novos
+        """
+        self.season = season
+        self.max_age = max_age
+        self.version = 0
+        self._frame: Optional[pd.DataFrame] = None
+        self._by_team: Dict[int, pd.DataFrame] = {}
+        self._fetched_at: Optional[float] = None
+
+    def _fetch(self, date_from: Optional[pd.Timestamp]) -> pd.DataFrame:
+        """Busca o game log da temporada, opcionalmente a partir de uma data."""
+        log = leaguegamelog.LeagueGameLog(
+            season=self.season,
+            player_or_team_abbreviation='T',
+            date_from_nullable=date_from.strftime('%m/%d/%Y') if date_from is not None else '',
+        )
+        return log.get_data_frames()[0]
+
+    def refresh(self) -> None:
+        """Busca os jogos novos e reconstrói o índice por time; em caso de erro mantém a tabela atual."""
+        date_from = self._frame['GAME_DATE'].max() if self._frame is not None and not self._frame.empty else None
+        try:
+            new_games = self._fetch(date_from)
+        except Exception as e:
+            logger.error("Error fetching game log for %s: %s", self.season, e, extra={'season': self.season})
+            return
+
+        new_games = self._prepare(new_games)
+        if self._frame is not None:
+            # A última data é buscada de novo; jogos repetidos ficam com a versão mais recente
+            new_games = pd.concat([self._frame, new_games], ignore_index=True)
+            new_games = new_games.drop_duplicates(['TEAM_ID', 'GAME_ID'], keep='last')
+        self._frame = new_games.sort_values(['TEAM_ID', 'GAME_DATE'], ignore_index=True)
+        self._by_team = {int(team_id): games for team_id, games in self._frame.groupby('TEAM_ID')}
+        self._fetched_at = time.monotonic()
+        self.version += 1
+
+    def _prepare(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Adiciona as colunas derivadas usadas nas análises."""
+        frame = frame.copy()
+        frame['GAME_DATE'] = pd.to_datetime(frame['GAME_DATE'])
+        frame['HOME'] = frame['MATCHUP'].str.contains(' vs. ', regex=False)
+        frame['WIN'] = frame['WL'] == 'W'
+        frame['OPP_PTS'] = frame['PTS'] - frame['PLUS_MINUS']
+        return frame
+
+    def _ensure_fresh(self) -> None:
+        if self._fetched_at is None or time.monotonic() - self._fetched_at > self.max_age:
+            self.refresh()
+
+    def frame(self) -> pd.DataFrame:
+        """Tabela completa da temporada (uma linha por time por jogo)."""
+        self._ensure_fresh()
+        return self._frame if self._frame is not None else pd.DataFrame()
+
+    def team_games(self, team_id: int) -> pd.DataFrame:
+        """Jogos de um time, do mais antigo para o mais recente."""
+        self._ensure_fresh()
+        return self._by_team.get(team_id, pd.DataFrame())
@@ -0,0 +1,472 @@
+from typing import Dict, Any, List, Optional, Set
+from polling import PollSchedule
+from analytics import AnalyticsStore, affects_metrics
+from shared import decode, encode, worker_id
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class GameHub:
+    """
+    Hub de broadcast por jogo: um único poller em background por game_id,
+    compartilhado por todos os WebSockets inscritos naquele jogo.
+
+    O poller é iniciado com o primeiro inscrito e cancelado quando o último
+    sai, de modo que as chamadas ao upstream não crescem com o número de
+    clientes conectados.
+
+    Cada inscrito recebe um snapshot completo ao se conectar; depois disso o
+    play-by-play é enviado como delta (ações novas, correções e remoções)
+    e os detalhes do jogo só são reenviados quando mudam. As métricas de
+    analytics são atualizadas uma vez por poll e enviadas a todos os inscritos.
+    """
+
+    # Com backend compartilhado: margem do lease do líder além do próximo intervalo de polling,
+    # e de quanto em quanto tempo um seguidor sem mensagens verifica se o líder ainda existe
+    LEASE_MARGIN = 10.0
+    FOLLOW_CHECK = 5.0
+    # Último estado publicado pelo líder, para seguidores que chegam depois
+    STATE_TTL = 6 * 3600.0
+    # Espera (segundos) antes de tentar de novo após um erro do backend, dobrando até o máximo
+    STORE_RETRY = 1.0
+    STORE_RETRY_MAX = 30.0
+
+    def __init__(self, client, schedule: Optional[PollSchedule] = None,
+                 analytics: Optional[AnalyticsStore] = None, queue_size: int = 32,
+                 store=None, owner: Optional[str] = None):
+        self.client = client
+        self.analytics = analytics or AnalyticsStore()
+        # Intervalo de polling adaptado ao estado de cada jogo
+        self.schedule = schedule or PollSchedule()
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        # Último estado publicado por jogo, usado para snapshots e deltas
+        self._details: Dict[str, Dict[str, Any]] = {}
+        self._actions: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        # Cursores `since` de inscritos que chegaram antes do primeiro poll do jogo;
+        # usados uma vez, quando o play-by-play chega pela primeira vez
+        self._cursors: Dict[str, Dict[asyncio.Queue, int]] = {}
+        # Backend compartilhado entre workers (shared.py): um worker líder faz o polling
+        # de cada jogo e os demais repassam as atualizações dele aos seus inscritos
+        self.store = store
+        self.owner = owner or worker_id()
+
+    def subscribe(self, game_id: str, since: Optional[int] = None) -> asyncio.Queue:
+        """
+        Inscreve um novo consumidor no jogo e inicia o poller se necessário.
+
+        Args:
+            game_id: ID do jogo
+            since: actionNumber do último evento já recebido pelo cliente
+                (retomada após reconexão). Se omitido, envia o play-by-play completo.
+
+        Returns:
+            Fila onde as mensagens do jogo serão publicadas
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        for message in self._snapshot(game_id, since):
+            queue.put_nowait(message)
+        if since is not None and not self._actions.get(game_id):
+            self._cursors.setdefault(game_id, {})[queue] = since
+        self._subscribers.setdefault(game_id, set()).add(queue)
+        poller = self._pollers.get(game_id)
+        # Um poller que terminou normalmente indica jogo finalizado; se morreu com erro, é reiniciado
+        if poller is None or (poller.done() and (poller.cancelled() or poller.exception() is not None)):
+            self._pollers[game_id] = asyncio.create_task(self._poll(game_id))
+        return queue
+
+    def unsubscribe(self, game_id: str, queue: asyncio.Queue) -> None:
+        """Remove o consumidor e encerra o poller quando não restar nenhum."""
+        subscribers = self._subscribers.get(game_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        self._cursors.get(game_id, {}).pop(queue, None)
+        if not subscribers:
+            del self._subscribers[game_id]
+            self._details.pop(game_id, None)
+            self._actions.pop(game_id, None)
+            self._cursors.pop(game_id, None)
+            poller = self._pollers.pop(game_id, None)
+            if poller is not None:
+                poller.cancel()
+
+    def subscriber_count(self, game_id: str) -> int:
+        """Número de consumidores inscritos no jogo."""
+        return len(self._subscribers.get(game_id, ()))
+
+    def subscriber_counts(self) -> Dict[str, int]:
+        """Número de consumidores inscritos por jogo."""
+        return {game_id: len(queues) for game_id, queues in self._subscribers.items()}
+
+    def _snapshot(self, game_id: str, since: Optional[int]) -> List[Dict[str, Any]]:
+        """Mensagens iniciais para um novo inscrito a partir do último estado conhecido."""
+        messages = []
+        if game_id in self._details:
+            messages.append({"type": "game_update", "data": self._details[game_id]})
+
+        actions = self._actions.get(game_id)
+        if actions:
+            if since is None:
+                messages.append({"type": "playbyplay_update", "data": list(actions.values())})
+            else:
+                messages.append(self._delta_message(
+                    [action for number, action in actions.items() if number > since], [], [], actions
+                ))
+
+        analytics = self.analytics.get(game_id)
+        if analytics is not None and actions:
+            messages.append({"type": "analytics_update", "data": analytics.summary()})
+        return messages
+
+    def _delta_message(self, added: List[Dict[str, Any]], corrections: List[Dict[str, Any]],
+                       removed: List[int], actions: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+        """Monta a mensagem de delta do play-by-play."""
+        return {
+            "type": "playbyplay_delta",
+            "data": {
+                "actions": added,
+                "corrections": corrections,
+                "removed": removed,
+                "lastActionNumber": max(actions) if actions else 0,
+            },
+        }
+
+    def _update_details(self, game_id: str, details: Dict[str, Any]) -> bool:
+        """Publica os detalhes do jogo apenas quando mudaram desde o último envio."""
+        if self._details.get(game_id) == details:
+            return False
+        self._details[game_id] = details
+        self._publish(game_id, {"type": "game_update", "data": details})
+        return True
+
+    def _update_play_by_play(self, game_id: str, pbp: List[Dict[str, Any]]) -> bool:
+        """
+        Compara o play-by-play recebido com o último publicado e envia só o que mudou.
+
+        Ações com actionNumber acima do último enviado ou inseridas no meio do feed
+        vão em "actions"; ações já enviadas que foram editadas no upstream vão em
+        "corrections"; ações que sumiram do feed vão em "removed".
+        """
+        current = {action['actionNumber']: action for action in pbp}
+        previous = self._actions.get(game_id)
+        self._actions[game_id] = current
+
+        if previous is None:
+            # Inscritos que pediram `since` antes do primeiro poll recebem só o que perderam
+            cursors = self._cursors.pop(game_id, {})
+            full = {"type": "playbyplay_update", "data": pbp}
+            for queue in list(self._subscribers.get(game_id, ())):
+                since = cursors.get(queue)
+                if since is None:
+                    self._deliver(game_id, queue, full)
+                else:
+                    self._deliver(game_id, queue, self._delta_message(
+                        [action for number, action in current.items() if number > since], [], [], current
+                    ))
+            self._update_analytics(game_id, pbp)
+            return True
+
+        last_sent = max(previous) if previous else 0
+        added = []
+        corrections = []
+        inserted = False
+        for number, action in current.items():
+            if number > last_sent:
+                added.append(action)
+            elif number not in previous:
+                # Ação inserida no meio do feed: é nova para os clientes, mas desloca as métricas
+                added.append(action)
+                inserted = True
+            elif previous[number] != action:
+                corrections.append(action)
+        removed = [number for number in previous if number not in current]
+
+        if added or corrections or removed:
+            self._publish(game_id, self._delta_message(added, corrections, removed, current))
+            # Só inserções, remoções e correções em campos usados pelas métricas exigem reconstruir o analytics
+            rebuild = inserted or bool(removed) or any(
+                affects_metrics(previous[action['actionNumber']], action) for action in corrections
+            )
+            self._update_analytics(game_id, pbp, rebuild, [action['personId'] for action in added])
+            return True
+        return False
+
+    def _update_analytics(self, game_id: str, pbp: List[Dict[str, Any]], rebuild: bool = False,
+                          players: Optional[List[int]] = None) -> None:
+        """
+        Atualiza as métricas do jogo com as ações novas e publica o resultado se mudou.
+
+        Sem reconstrução, envia um `analytics_delta` só com os pontos novos da
+        linha do tempo e os jogadores das ações novas, para que a mensagem não
+        cresça com o jogo; após uma reconstrução envia o `analytics_update` completo.
+        """
+        details = self._details.get(game_id)
+        if details is None:
+            return
+        previous = self.analytics.get(game_id)
+        generation = previous.generation if previous is not None else None
+        timeline_from = previous.timeline_length if previous is not None else 0
+        if not self.analytics.update(details, pbp, rebuild):
+            return
+        analytics = self.analytics.get(game_id)
+        if players is not None and analytics is previous and analytics.generation == generation:
+            self._publish(game_id, {"type": "analytics_delta", "data": analytics.delta(timeline_from, players)})
+        else:
+            self._publish(game_id, {"type": "analytics_update", "data": analytics.summary()})
+
+    def _publish(self, game_id: str, message: Dict[str, Any]) -> None:
+        """
+        Entrega a mensagem a todos os inscritos.
+
+        Um inscrito lento com a fila cheia não pode simplesmente perder deltas,
+        então o backlog dele é descartado e substituído por um snapshot completo.
+        """
+        for queue in self._subscribers.get(game_id, ()):
+            self._deliver(game_id, queue, message)
+
+    def _deliver(self, game_id: str, queue: asyncio.Queue, message: Dict[str, Any]) -> None:
+        """Entrega a mensagem a um inscrito, trocando o backlog por um snapshot se a fila estiver cheia."""
+        if queue.full():
+            while not queue.empty():
+                queue.get_nowait()
+            for snapshot in self._snapshot(game_id, None):
+                queue.put_nowait(snapshot)
+        else:
+            queue.put_nowait(message)
+
+    async def _poll(self, game_id: str) -> None:
+        """
+        Loop de polling do jogo; roda enquanto houver inscritos e o jogo não
+        tiver terminado. Depois do fim, novos inscritos recebem o snapshot final.
+
+        Com backend compartilhado, o worker que obtém o lease do jogo faz o
+        polling e publica o estado; os outros seguem o líder e tentam assumir
+        o lease se ele sumir.
+        """
+        if self.store is None:
+            await self._poll_upstream(game_id)
+            return
+
+        lease = f"nba:leader:game:{game_id}"
+        retry = self.STORE_RETRY
+        while True:
+            try:
+                if await self.store.acquire(lease, self.owner, self.LEASE_MARGIN):
+                    try:
+                        finished = await self._poll_upstream(game_id, lease)
+                    finally:
+                        await self._release(lease)
+                else:
+                    finished = await self._follow(game_id, lease)
+            except Exception as e:
+                # Backend indisponível: tenta de novo (como líder ou seguidor) após o backoff
+                logger.error("Shared store error for game %s: %s", game_id, e, extra={'gameId': game_id})
+                await asyncio.sleep(retry)
+                retry = min(retry * 2, self.STORE_RETRY_MAX)
+                continue
+            if finished:
+                return
+            retry = self.STORE_RETRY
+
+    async def _release(self, lease: str) -> None:
+        """Libera o lease de líder; se o backend falhar, ele expira sozinho."""
+        try:
+            await self.store.release(lease, self.owner)
+        except Exception as e:
+            logger.warning("Could not release lease %s: %s", lease, e)
+
+    async def _poll_upstream(self, game_id: str, lease: Optional[str] = None) -> bool:
+        """
+        Busca o jogo no cliente na cadência do PollSchedule.
+
+        Returns:
+            True quando o jogo terminou; False se o lease de líder foi perdido
+        """
+        while True:
+            details = None
+            try:
+                details = await self.client.get_game_details(game_id)
+                changed = bool(details) and self._update_details(game_id, details)
+
+                pbp = await self.client.get_play_by_play(game_id)
+                if pbp:
+                    changed = self._update_play_by_play(game_id, pbp) or changed
+                if lease is not None and changed:
+                    await self._share(game_id, details, pbp)
+            except Exception as e:
+                logger.error("Poller error for game %s: %s", game_id, e, extra={'gameId': game_id})
+
+            interval = self.schedule.interval(details)
+            if interval is None:
+                return True
+            # Jogos em replay acelerado são polled proporcionalmente mais rápido
+            interval /= self.client.replay_speed(game_id)
+            if lease is not None and not await self.store.acquire(lease, self.owner, interval + self.LEASE_MARGIN):
+                return False
+            await asyncio.sleep(interval)
+
+    async def _share(self, game_id: str, details: Optional[Dict[str, Any]],
+                     pbp: Optional[List[Dict[str, Any]]]) -> None:
+        """Publica o estado buscado pelo líder para os outros workers."""
+        message = encode({"details": details or None, "pbp": pbp or None})
+        await self.store.set(f"nba:state:game:{game_id}", message, self.STATE_TTL)
+        await self.store.publish(f"nba:game:{game_id}", message)
+
+    def _apply_shared(self, game_id: str, raw: bytes) -> bool:
+        """Aplica o estado publicado pelo líder; retorna True se o jogo terminou."""
+        state = decode(raw)
+        if state["details"]:
+            self._update_details(game_id, state["details"])
+        if state["pbp"]:
+            self._update_play_by_play(game_id, state["pbp"])
+        return bool(state["details"]) and self.schedule.interval(state["details"]) is None
+
+    async def _follow(self, game_id: str, lease: str) -> bool:
+        """
+        Repassa as atualizações do líder aos inscritos locais, sem chamar o upstream.
+
+        Returns:
+            True quando o jogo terminou; False se o líder sumiu (o lease expirou)
+        """
+        subscription = await self.store.subscribe(f"nba:game:{game_id}")
+        try:
+            state = await self.store.get(f"nba:state:game:{game_id}")
+            if state is not None and self._apply_shared(game_id, state):
+                return True
+            while True:
+                message = await subscription.get(self.FOLLOW_CHECK)
+                if message is not None:
+                    if self._apply_shared(game_id, message):
+                        return True
+                elif await self.store.get(lease) is None:
+                    return False
+        finally:
+            await subscription.close()
+
+def _pointer(path: str, key: str) -> str:
+    """Acrescenta uma chave a um JSON Pointer (RFC 6901)."""
+    return f"{path}/{key.replace('~', '~0').replace('/', '~1')}"
+
+
+def json_patch(old: Dict[str, Any], new: Dict[str, Any], path: str = "") -> List[Dict[str, Any]]:
+    """
+    Diferença entre dois dicionários como operações JSON Patch (RFC 6902).
+
+    Dicionários aninhados são comparados campo a campo; outros valores
+    (inclusive listas) são substituídos inteiros.
+
+    Args:
+        old: Estado anterior
+        new: Estado atual
+        path: JSON Pointer do dicionário dentro do documento
+
+    Returns:
+        Lista de operações add/remove/replace que levam `old` a `new`
+    """
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": _pointer(path, key)})
+    for key, value in new.items():
+        pointer = _pointer(path, key)
+        if key not in old:
+            ops.append({"op": "add", "path": pointer, "value": value})
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            ops.extend(json_patch(old[key], value, pointer))
+        elif old[key] != value:
+            ops.append({"op": "replace", "path": pointer, "value": value})
+    return ops
+
+
+class ScoreboardHub:
+    """
+    Stream multiplexado do scoreboard: um único socket recebe vários jogos.
+
+    Alimentado pelo LiveScoreboard do cliente (sem polling próprio). Cada
+    inscrito escolhe um conjunto de jogos ou todos os jogos de hoje, recebe um
+    snapshot com o resumo desses jogos e depois só operações JSON Patch sobre
+    esse documento quando placar, relógio, período ou status mudam.
+    """
+
+    def __init__(self, client, queue_size: int = 32):
+        self.client = client
+        self.queue_size = queue_size
+        # Fila -> jogos inscritos (None = todos os jogos de hoje)
+        self._subscribers: Dict[asyncio.Queue, Optional[Set[str]]] = {}
+        # Último resumo publicado por jogo
+        self._games: Dict[str, Dict[str, Any]] = {}
+        client.live_scoreboard.add_listener(self.update)
+
+    def subscribe(self, game_ids: Optional[Set[str]] = None) -> asyncio.Queue:
+        """
+        Inscreve um novo consumidor.
+
+        Args:
+            game_ids: IDs dos jogos; se omitido, todos os jogos de hoje,
+                incluindo os que entrarem no scoreboard depois
+
+        Returns:
+            Fila onde as mensagens do scoreboard serão publicadas
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        queue.put_nowait(self._snapshot(game_ids))
+        self._subscribers[queue] = game_ids
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Remove o consumidor."""
+        self._subscribers.pop(queue, None)
+
+    def subscriber_count(self) -> int:
+        """Número de consumidores inscritos."""
+        return len(self._subscribers)
+
+    def _snapshot(self, game_ids: Optional[Set[str]]) -> Dict[str, Any]:
+        """Documento completo com os jogos do consumidor; os patches seguintes se aplicam a ele."""
+        games = {
+            game_id: summary for game_id, summary in self._games.items()
+            if game_ids is None or game_id in game_ids
+        }
+        return {"type": "scoreboard_snapshot", "data": {"games": games}}
+
+    def update(self, games: List[Dict[str, Any]]) -> None:
+        """Recebe uma atualização do scoreboard ao vivo e publica as diferenças."""
+        current = {}
+        for game in games:
+            try:
+                summary = self.client.live_game_summary(game)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning("Error parsing scoreboard game: %s", e)
+                continue
+            current[summary['gameId']] = summary
+
+        ops = json_patch({"games": self._games}, {"games": current})
+        self._games = current
+        if ops:
+            self._publish(ops)
+
+    def _publish(self, ops: List[Dict[str, Any]]) -> None:
+        """
+        Entrega a cada inscrito só as operações dos jogos que ele acompanha.
+
+        Assim como no GameHub, um inscrito com a fila cheia tem o backlog
+        descartado e recebe um snapshot novo no lugar dos patches perdidos.
+        """
+        for queue, game_ids in self._subscribers.items():
+            if game_ids is None:
+                selected = ops
+            else:
+                # Paths têm a forma /games/<gameId>/...
+                selected = [op for op in ops if op["path"].split("/")[2] in game_ids]
+            if not selected:
+                continue
+            if queue.full():
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._snapshot(game_ids))
+            else:
+                queue.put_nowait({"type": "scoreboard_patch", "data": selected})
@@ -0,0 +1,77 @@
+from typing import Any, Dict, Optional
+import datetime
+import json
+import logging
+import os
+
+# Atributos padrão de um LogRecord; o resto veio de `extra=` e vai como campo do JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro, com os campos passados em `extra=`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging(level: Optional[str] = None, json_format: Optional[bool] = None) -> None:
+    """
+    Configura o logging da aplicação.
+
+    Args:
+        level: Nível inicial (padrão: LOG_LEVEL ou INFO)
+        json_format: Saída em JSON por linha (padrão: LOG_FORMAT != 'text')
+    """
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    if json_format is None:
+        json_format = os.environ.get('LOG_FORMAT', 'json') != 'text'
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(
+        '%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+    # Cada requisição ao upstream já é medida no /metrics; o log do httpx só é útil para depuração
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+
+def set_level(level: str, logger: Optional[str] = None) -> str:
+    """
+    Altera o nível de log em tempo de execução.
+
+    Args:
+        level: Um de DEBUG, INFO, WARNING, ERROR ou CRITICAL
+        logger: Nome do logger (ex.: 'async_client'); se omitido, o logger raiz
+
+    Returns:
+        Nível efetivo do logger após a alteração
+    """
+    level = level.upper()
+    if level not in LEVELS:
+        raise ValueError(f"Nível de log inválido: {level}")
+    target = logging.getLogger(logger)
+    target.setLevel(level)
+    return logging.getLevelName(target.getEffectiveLevel())
+
+
+def get_levels() -> Dict[str, str]:
+    """Nível do logger raiz e dos loggers com nível próprio."""
+    levels = {'root': logging.getLevelName(logging.getLogger().level)}
+    for name, logger in logging.root.manager.loggerDict.items():
+        if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET:
+            levels[name] = logging.getLevelName(logger.level)
+    return levels
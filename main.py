@@ -47,10 +47,9 @@ def main():
             
             print(f"\nAnalisando: {away_name} vs {home_name}...")
             
-            home_recent = client.get_recent_games(home_id)
-            away_recent = client.get_recent_games(away_id)
-            
-            analysis = analytics.analyze_matchup(None, None, home_recent, away_recent)
+            # Forma dos 30 times calculada uma vez por atualização do game log
+            form = analytics.season_form(client.get_season_game_log())
+            analysis = analytics.analyze_matchup(home_id, away_id, form)
             
             print_header(f"Análise: {away_name} @ {home_name}")
             print(f"{'Métrica':<15} | {'Casa (Home)':<15} | {'Fora (Away)':<15}")
@@ -74,8 +73,8 @@ def main():
             team_name = input("Nome do time: ")
             team_id = client.get_team_id(team_name)
             if team_id:
-                recent = client.get_recent_games(team_id)
-                stats = analytics.calculate_averages(recent)
+                form = analytics.season_form(client.get_season_game_log())
+                stats = analytics.calculate_averages(form, team_id)
                 print_header(f"Estatísticas Recentes: {team_name}")
                 for k, v in stats.items():
                     print(f"{k}: {v}")
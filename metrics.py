@@ -0,0 +1,242 @@
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import bisect
+import math
+import threading
+import time
+
+LabelValues = Tuple[str, ...]
+
+# Buckets padrão de latência (segundos), de 1 ms a 10 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class Metric:
+    """Base das métricas: nome, descrição e nomes dos labels."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """Amostras no formato (sufixo, nomes dos labels, valores dos labels, valor)."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for suffix, names, values, value in self.samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}')
+        return lines
+
+
+class Counter(Metric):
+    """Contador monotônico por combinação de labels."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for values, value in items:
+            yield '', self.labelnames, values, value
+
+
+class Gauge(Metric):
+    """
+    Valor instantâneo por combinação de labels.
+
+    Com `collect`, os valores são lidos na hora da coleta (ex.: inscritos por
+    jogo, taxa de acerto do cache) em vez de atualizados no caminho quente.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], Dict[LabelValues, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.collect = collect
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self):
+        if self.collect is not None:
+            items = list(self.collect().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for values, value in items:
+            yield '', self.labelnames, values, value
+
+
+class Histogram(Metric):
+    """Histograma cumulativo (buckets, soma e contagem) por combinação de labels."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por label: contagens por bucket (o último é +Inf), soma e contagem
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def time(self, **labels: str) -> '_Timer':
+        """Context manager que observa a duração do bloco."""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        bucket_names = self.labelnames + ('le',)
+        for values, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield '_bucket', bucket_names, values + (_format_value(bound),), cumulative
+            yield '_sum', self.labelnames, values, total
+            yield '_count', self.labelnames, values, cumulative
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class Registry:
+    """Conjunto de métricas expostas no /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus (versão 0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    'nba_upstream_request_seconds', 'Latência das requisições ao upstream da NBA.', ['endpoint']))
+UPSTREAM_ERRORS = REGISTRY.register(Counter(
+    'nba_upstream_errors_total', 'Requisições ao upstream que falharam.', ['endpoint', 'reason']))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    'nba_http_request_seconds', 'Latência das requisições HTTP da API.', ['method', 'route', 'status']))
+HTTP_BYTES = REGISTRY.register(Counter(
+    'nba_http_response_bytes_total', 'Bytes enviados nos corpos das respostas HTTP.', ['route']))
+WEBSOCKET_MESSAGES = REGISTRY.register(Counter(
+    'nba_websocket_messages_total', 'Mensagens enviadas pelos WebSockets.', ['stream']))
+WEBSOCKET_BYTES = REGISTRY.register(Counter(
+    'nba_websocket_sent_bytes_total', 'Bytes enviados pelos WebSockets.', ['stream']))
+SERIALIZATION_LATENCY = REGISTRY.register(Histogram(
+    'nba_serialization_seconds', 'Tempo de serialização (e compressão) das respostas.', ['kind']))
+EVENT_LOOP_LAG = REGISTRY.register(Histogram(
+    'nba_event_loop_lag_seconds', 'Atraso do event loop em relação ao agendado.',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)))
+
+
+async def monitor_event_loop(interval: float = 0.5) -> None:
+    """
+    Mede o atraso do event loop: quanto um sleep de `interval` demora além do
+    pedido. Atrasos altos indicam código bloqueando o loop.
+    """
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, time.perf_counter() - started - interval))
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede latência e bytes enviados por rota HTTP.
+
+    A rota é o template do path (ex.: /games/{game_id}/details), não o path
+    concreto, para manter a cardinalidade dos labels baixa.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                size += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            route_path = getattr(route, 'path', 'unmatched')
+            HTTP_LATENCY.observe(time.perf_counter() - started, method=scope['method'],
+                                 route=route_path, status=str(status))
+            HTTP_BYTES.inc(size, route=route_path)
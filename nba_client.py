@@ -1,16 +1,42 @@
 from nba_api.stats.static import teams
 from nba_api.stats.endpoints import scoreboardv3, BoxScoreSummaryV3
-from nba_api.live.nba.endpoints import PlayByPlay, ScoreBoard
-from typing import List, Dict, Any, Optional
+from nba_api.live.nba.endpoints import PlayByPlay
+from typing import List, Dict, Any, Optional, Callable, Hashable
+from cache import ResponseCache
+from archive import GameArchive, DEFAULT_ARCHIVE_DIR
+from scoreboard import LiveScoreboard
+from gamelog import TeamGameLog
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import time
 import datetime
-import sys
+import logging
+
+logger = logging.getLogger(__name__)
 
 class NBAClient:
-    def __init__(self):
+    # TTL do cache (segundos) por status do jogo; None = até ser removido por LRU
+    CACHE_TTL = {
+        "finished": None,
+        "live": 3,
+        "pre-live": 300,
+        "unknown": 30,
+    }
+
+    def __init__(self, cache_size: int = 512, archive_dir: Optional[str] = DEFAULT_ARCHIVE_DIR,
+                 batch_concurrency: int = 8):
+        self.cache = ResponseCache(maxsize=cache_size)
+        # Máximo de jogos buscados em paralelo por get_games_details
+        self.batch_concurrency = batch_concurrency
+        # Arquivo em disco dos jogos finalizados; archive_dir=None desabilita
+        self.archive = GameArchive(archive_dir) if archive_dir else None
+        # Snapshot único do ScoreBoard ao vivo, compartilhado por todos os métodos
+        self.live_scoreboard = LiveScoreboard()
         self.teams = teams.get_teams()
         self.teams_dict = {team['id']: team for team in self.teams}
+        self.teams_index = self._build_teams_index()
+        # Game log da temporada atual, carregado sob demanda por get_recent_games
+        self._game_log: Optional[TeamGameLog] = None
         self.headers = {
             'Host': 'stats.nba.com',
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:72.0) Gecko/20100101 Firefox/72.0',
@@ -35,7 +61,136 @@ class NBAClient:
         et_now = utc_now + est_offset
         return et_now.strftime('%m/%d/%Y')
 
+    def _is_past_season(self, game_id: str) -> bool:
+        """
+        Indica se o jogo pertence a uma temporada anterior à atual.
+
+        O ID do jogo codifica a temporada nos dígitos 4 e 5
+        (ex.: '0022300061' é da temporada 2023-24).
+        """
+        if len(game_id) != 10 or not game_id.isdigit():
+            return False
+        season_start = 2000 + int(game_id[3:5])
+        return season_start < self._current_season_start()
+
+    def _current_season_start(self) -> int:
+        """Ano de início da temporada atual (ex.: 2023 para 2023-24)."""
+        today_et = datetime.datetime.strptime(self._get_today_et(), '%m/%d/%Y')
+        # A temporada começa em outubro; de julho a setembro ainda não há jogos da nova
+        return today_et.year if today_et.month >= 7 else today_et.year - 1
+
+    def _current_season(self) -> str:
+        """Temporada atual no formato 'YYYY-YY'."""
+        start = self._current_season_start()
+        return f"{start}-{str(start + 1)[-2:]}"
+
+    def _cached(self, key: Hashable, fetch: Callable[[], Any], ttl_for: Callable[[Any], Optional[float]]) -> Any:
+        """
+        Retorna o valor em cache para `key` ou chama `fetch` e armazena o resultado.
+
+        Antes de ir ao upstream consulta o arquivo em disco; valores sem
+        expiração (jogos finalizados, datas passadas) são arquivados após a busca.
+        Erros do upstream (None) não são armazenados; listas vazias (ex.: datas
+        sem jogos) são valores válidos e são armazenadas.
+
+        Args:
+            key: Chave do cache (nome do método e argumentos)
+            fetch: Função que busca o valor no upstream
+            ttl_for: Função que calcula o TTL a partir do valor buscado
+        """
+        hit, value = self.cache.get(key)
+        if hit:
+            return value
+
+        if self.archive is not None:
+            value = self.archive.get(key)
+            # Só valores finais são servidos do arquivo; entradas que ainda não
+            # são imutáveis (ex.: gravadas com jogos ao vivo) são buscadas de novo
+            if value is not None and ttl_for(value) is None:
+                self.cache.set(key, value, None)
+                return value
+
+        value = fetch()
+        if value is not None:
+            ttl = ttl_for(value)
+            if ttl is None and self.archive is not None:
+                self.archive.put(key, value)
+            self.cache.set(key, value, ttl)
+        return value
+
+    def _ttl_for_statuses(self, statuses: List[str]) -> Optional[float]:
+        """Menor TTL entre os status informados (None = sem expiração)."""
+        ttls = [self.CACHE_TTL.get(status, self.CACHE_TTL["unknown"]) for status in statuses]
+        ttls = [ttl for ttl in ttls if ttl is not None]
+        return min(ttls) if ttls else None
+
+    def _games_ttl(self, game_date: str, games: List[Dict[str, Any]]) -> Optional[float]:
+        """
+        TTL da lista de jogos: imutável só quando a data já passou e todos os
+        jogos estão finalizados; caso contrário depende do status.
+
+        A data ET usa UTC-5 fixo, então jogos da costa oeste ainda podem estar
+        ao vivo na lista de "ontem" logo após a meia-noite.
+        """
+        statuses = [game['status'] for game in games]
+        date_obj = datetime.datetime.strptime(game_date, '%Y-%m-%d')
+        today_et = datetime.datetime.strptime(self._get_today_et(), '%m/%d/%Y')
+        if date_obj < today_et and all(status == 'finished' for status in statuses):
+            return None
+        return self._ttl_for_statuses(statuses) or self.CACHE_TTL["unknown"]
+
+    def _play_by_play_ttl(self, events: List[Dict[str, Any]]) -> Optional[float]:
+        """
+        TTL do play-by-play: sem expiração quando o feed já contém o fim do jogo,
+        curto enquanto estiver ao vivo.
+        """
+        # O status "finished" dos detalhes pode chegar antes da última ação do feed,
+        # então só a ação de fim de jogo torna o play-by-play imutável
+        if not events:
+            return self.CACHE_TTL["live"]
+        last = events[-1]
+        if last['actionType'] == 'game' and last['subType'] == 'end':
+            return self.CACHE_TTL["finished"]
+        return self.CACHE_TTL["live"]
+
+    def response_ttl(self, method: str, arg: str, value: Any) -> Optional[float]:
+        """
+        TTL de um valor retornado por um método público do cliente.
+
+        Args:
+            method: 'get_games_by_date', 'get_game_details' ou 'get_play_by_play'
+            arg: Argumento da chamada (data ou ID do jogo)
+            value: Valor retornado (não vazio)
+
+        Returns:
+            Segundos de validade, ou None se o valor é imutável
+        """
+        if method == 'get_games_by_date':
+            return self._games_ttl(arg, value)
+        if method == 'get_game_details':
+            return self._ttl_for_statuses([value['status']])
+        if method == 'get_play_by_play':
+            return self._play_by_play_ttl(value)
+        return self.CACHE_TTL["unknown"]
+
     def get_games_by_date(self, game_date: str) -> List[Dict[str, Any]]:
+        """
+        Busca jogos de uma data específica, usando o cache quando possível.
+
+        Args:
+            game_date: Data no formato 'YYYY-MM-DD'
+
+        Returns:
+            Lista de jogos com informações básicas
+        """
+        # None indica erro no upstream; para quem chama, equivale a nenhum resultado
+        return self._cached(
+            ('get_games_by_date', game_date),
+            lambda: self._fetch_games_by_date(game_date),
+            lambda games: self._games_ttl(game_date, games),
+        ) or []
+
+    def _fetch_games_by_date(self, game_date: str) -> Optional[List[Dict[str, Any]]]:
         """
         Busca jogos de uma data específica usando ScoreboardV2.
         
@@ -53,44 +208,72 @@ class NBAClient:
             # Usar data de hoje no timezone ET
             today_et = self._get_today_et()
             if formatted_date == today_et:
-                # Usar endpoint ao vivo para jogos de hoje
-                scoreboard = ScoreBoard()
+                # Usar o snapshot do scoreboard ao vivo para jogos de hoje
+                games_list = self.live_scoreboard.games()
             else:
-                scoreboard = scoreboardv3.ScoreboardV3(game_date=formatted_date)   
-            # Chamar ScoreboardV3
-            data = scoreboard.get_dict()
-            games_list = data['scoreboard']['games']
-            
-            games = []
-            for game in games_list:
-                game_info = {
-                    'gameId': str(game['gameId']),
-                    'gameDate': game_date,
-                    'homeTeamId': int(game['homeTeam']['teamId']),
-                    'homeTeamName': self._get_team_name(game['homeTeam']['teamId']),
-                    'homeTeamAbbr': self._get_team_abbr(game['homeTeam']['teamId']),
-                    'awayTeamId': int(game['awayTeam']['teamId']),
-                    'awayTeamName': self._get_team_name(game['awayTeam']['teamId']),
-                    'awayTeamAbbr': self._get_team_abbr(game['awayTeam']['teamId']),
-                    'status': self._parse_game_status(game['gameStatus']),
-                    'homeScore': int(game['homeTeam']['score']),
-                    'awayScore': int(game['awayTeam']['score']),
-                    'quarter': int(game['period']),
-                    'timeRemaining': str(game['gameClock']),
-                    'arena': '',
-                    'broadcaster': '',
-                }
-                games.append(game_info)
+                scoreboard = scoreboardv3.ScoreboardV3(game_date=formatted_date)
+                data = scoreboard.get_dict()
+                games_list = data['scoreboard']['games']
             
-            return games
+            return self._parse_games(games_list, game_date)
         except Exception as e:
-            print(f"Error fetching games for {game_date}: {str(e)}", file=sys.stderr)
-            return []
+            logger.error("Error fetching games for %s: %s", game_date, e, extra={'gameDate': game_date})
+            return None
+
+    def _parse_games(self, games_list: List[Dict[str, Any]], game_date: str) -> List[Dict[str, Any]]:
+        """
+        Converte a lista bruta de jogos do ScoreBoard/ScoreboardV3 no formato da API.
+
+        Args:
+            games_list: Jogos no formato bruto do upstream
+            game_date: Data no formato 'YYYY-MM-DD'
+
+        Returns:
+            Lista de jogos com informações básicas
+        """
+        games = []
+        for game in games_list:
+            game_info = {
+                'gameId': str(game['gameId']),
+                'gameDate': game_date,
+                'homeTeamId': int(game['homeTeam']['teamId']),
+                'homeTeamName': self._get_team_name(game['homeTeam']['teamId']),
+                'homeTeamAbbr': self._get_team_abbr(game['homeTeam']['teamId']),
+                'awayTeamId': int(game['awayTeam']['teamId']),
+                'awayTeamName': self._get_team_name(game['awayTeam']['teamId']),
+                'awayTeamAbbr': self._get_team_abbr(game['awayTeam']['teamId']),
+                'status': self._parse_game_status(game['gameStatus']),
+                'homeScore': int(game['homeTeam']['score']),
+                'awayScore': int(game['awayTeam']['score']),
+                'quarter': int(game['period']),
+                'timeRemaining': str(game['gameClock']),
+                'arena': '',
+                'broadcaster': '',
+            }
+            games.append(game_info)
+
+        return games
 
     def get_game_details(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca detalhes completos de um jogo, usando o cache quando possível.
+
+        Args:
+            game_id: ID do jogo
+
+        Returns:
+            Dicionário com detalhes do jogo
+        """
+        return self._cached(
+            ('get_game_details', game_id),
+            lambda: self._fetch_game_details(game_id),
+            lambda details: self._ttl_for_statuses([details['status']]),
+        )
+
+    def _fetch_game_details(self, game_id: str) -> Optional[Dict[str, Any]]:
         """
         Busca detalhes completos de um jogo usando BoxScoreSummaryV3.
-        Para jogos ao vivo, usa ScoreBoard() similar a get_games_by_date.
+        Para jogos ao vivo, usa o snapshot do ScoreBoard.
         
         Args:
             game_id: ID do jogo
@@ -99,113 +282,110 @@ class NBAClient:
             Dicionário com detalhes do jogo
         """
         try:
-            # Primeiro, verificar se o jogo está ao vivo usando ScoreBoard
-            try:
-                scoreboard = ScoreBoard()
-                scoreboard_data = scoreboard.get_dict()
-                games_list = scoreboard_data['scoreboard']['games']
-                
-                # Procurar o jogo específico no scoreboard
-                live_game = None
-                for game in games_list:
-                    if str(game['gameId']) == game_id:
-                        live_game = game
-                        # Se o jogo está ao vivo (status == 2 = "live"), usar ScoreBoard
-                        status_parsed = self._parse_game_status(game['gameStatus'])
-                        if status_parsed == "live":
-                            return self._build_game_details_from_scoreboard(live_game)
-                        break
-            except Exception as e:
-                # Se ScoreBoard falhar, continuar com BoxScoreSummaryV3
-                pass
+            # Jogos de temporadas passadas nunca estão ao vivo
+            if not self._is_past_season(game_id):
+                live_game = self.live_scoreboard.get_game(game_id)
+                # Se o jogo está ao vivo (status == 2 = "live"), usar ScoreBoard
+                if live_game and self._parse_game_status(live_game['gameStatus']) == "live":
+                    return self._build_game_details_from_scoreboard(live_game)
             
             # Se não encontrou ou não está ao vivo, usar BoxScoreSummaryV3
             box_score = BoxScoreSummaryV3(game_id=game_id)
             data = box_score.get_dict()
-            game = data['boxScoreSummary']
-            
-            # Processar line score from homeTeam and awayTeam periods
-            line_score_data = []
-            
-            # Home team line score
-            home_periods = game['homeTeam']['periods']
-            home_line = {
-                'teamId': game['homeTeam']['teamId'],
-                'teamAbbr': game['homeTeam']['teamTricode'],
-                'q1': home_periods[0]['score'] if len(home_periods) > 0 else 0,
-                'q2': home_periods[1]['score'] if len(home_periods) > 1 else 0,
-                'q3': home_periods[2]['score'] if len(home_periods) > 2 else 0,
-                'q4': home_periods[3]['score'] if len(home_periods) > 3 else 0,
-                'ot1': home_periods[4]['score'] if len(home_periods) > 4 else 0,
-                'ot2': home_periods[5]['score'] if len(home_periods) > 5 else 0,
-                'total': game['homeTeam']['score'],
-            }
-            line_score_data.append(home_line)
-            
-            # Away team line score
-            away_periods = game['awayTeam']['periods']
-            away_line = {
-                'teamId': game['awayTeam']['teamId'],
-                'teamAbbr': game['awayTeam']['teamTricode'],
-                'q1': away_periods[0]['score'] if len(away_periods) > 0 else 0,
-                'q2': away_periods[1]['score'] if len(away_periods) > 1 else 0,
-                'q3': away_periods[2]['score'] if len(away_periods) > 2 else 0,
-                'q4': away_periods[3]['score'] if len(away_periods) > 3 else 0,
-                'ot1': away_periods[4]['score'] if len(away_periods) > 4 else 0,
-                'ot2': away_periods[5]['score'] if len(away_periods) > 5 else 0,
-                'total': game['awayTeam']['score'],
-            }
-            line_score_data.append(away_line)
-            
-            return {
-                'gameId': str(game['gameId']),
-                'gameCode': str(game['gameCode']),
-                'status': self._parse_game_status(game['gameStatus']),
-                'statusText': str(game['gameStatusText']),
-                'period': int(game['period']),
-                'gameClock': str(game['gameClock']),
-                'gameTimeUTC': str(game['gameTimeUTC']),
-                'gameEt': str(game['gameEt']),
-                'duration': str(game['duration']),
-                'arena': {
-                    'name': str(game['arena']['arenaName']),
-                    'city': str(game['arena']['arenaCity']),
-                    'state': str(game['arena']['arenaState']),
-                    'country': str(game['arena']['arenaCountry']),
-                },
-                'attendance': int(game['attendance']),
-                'homeTeam': {
-                    'teamId': int(game['homeTeam']['teamId']),
-                    'teamName': str(game['homeTeam']['teamName']),
-                    'teamCity': str(game['homeTeam']['teamCity']),
-                    'teamTricode': str(game['homeTeam']['teamTricode']),
-                    'wins': int(game['homeTeam']['teamWins']),
-                    'losses': int(game['homeTeam']['teamLosses']),
-                    'score': int(game['homeTeam']['score']),
-                    'periods': game['homeTeam']['periods'],
-                    'players': game['homeTeam']['players'],
-                    'inactives': game['homeTeam']['inactives'],
-                },
-                'awayTeam': {
-                    'teamId': int(game['awayTeam']['teamId']),
-                    'teamName': str(game['awayTeam']['teamName']),
-                    'teamCity': str(game['awayTeam']['teamCity']),
-                    'teamTricode': str(game['awayTeam']['teamTricode']),
-                    'wins': int(game['awayTeam']['teamWins']),
-                    'losses': int(game['awayTeam']['teamLosses']),
-                    'score': int(game['awayTeam']['score']),
-                    'periods': game['awayTeam']['periods'],
-                    'players': game['awayTeam']['players'],
-                    'inactives': game['awayTeam']['inactives'],
-                },
-                'officials': game['officials'],
-                'lastFiveMeetings': game['lastFiveMeetings'],
-                'lineScore': line_score_data,
-            }
+            return self._parse_box_score(data['boxScoreSummary'])
         except Exception as e:
-            print(f"Error fetching game details for {game_id}: {str(e)}", file=sys.stderr)
+            logger.error("Error fetching game details for %s: %s", game_id, e, extra={'gameId': game_id})
             return None
 
+    def _parse_box_score(self, game: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Converte o boxScoreSummary bruto do BoxScoreSummaryV3 no formato da API.
+
+        Args:
+            game: Dicionário boxScoreSummary do upstream
+
+        Returns:
+            Dicionário com detalhes do jogo
+        """
+        # Processar line score from homeTeam and awayTeam periods
+        line_score_data = []
+
+        # Home team line score
+        home_periods = game['homeTeam']['periods']
+        home_line = {
+            'teamId': game['homeTeam']['teamId'],
+            'teamAbbr': game['homeTeam']['teamTricode'],
+            'q1': home_periods[0]['score'] if len(home_periods) > 0 else 0,
+            'q2': home_periods[1]['score'] if len(home_periods) > 1 else 0,
+            'q3': home_periods[2]['score'] if len(home_periods) > 2 else 0,
+            'q4': home_periods[3]['score'] if len(home_periods) > 3 else 0,
+            'ot1': home_periods[4]['score'] if len(home_periods) > 4 else 0,
+            'ot2': home_periods[5]['score'] if len(home_periods) > 5 else 0,
+            'total': game['homeTeam']['score'],
+        }
+        line_score_data.append(home_line)
+
+        # Away team line score
+        away_periods = game['awayTeam']['periods']
+        away_line = {
+            'teamId': game['awayTeam']['teamId'],
+            'teamAbbr': game['awayTeam']['teamTricode'],
+            'q1': away_periods[0]['score'] if len(away_periods) > 0 else 0,
+            'q2': away_periods[1]['score'] if len(away_periods) > 1 else 0,
+            'q3': away_periods[2]['score'] if len(away_periods) > 2 else 0,
+            'q4': away_periods[3]['score'] if len(away_periods) > 3 else 0,
+            'ot1': away_periods[4]['score'] if len(away_periods) > 4 else 0,
+            'ot2': away_periods[5]['score'] if len(away_periods) > 5 else 0,
+            'total': game['awayTeam']['score'],
+        }
+        line_score_data.append(away_line)
+
+        return {
+            'gameId': str(game['gameId']),
+            'gameCode': str(game['gameCode']),
+            'status': self._parse_game_status(game['gameStatus']),
+            'statusText': str(game['gameStatusText']),
+            'period': int(game['period']),
+            'gameClock': str(game['gameClock']),
+            'gameTimeUTC': str(game['gameTimeUTC']),
+            'gameEt': str(game['gameEt']),
+            'duration': str(game['duration']),
+            'arena': {
+                'name': str(game['arena']['arenaName']),
+                'city': str(game['arena']['arenaCity']),
+                'state': str(game['arena']['arenaState']),
+                'country': str(game['arena']['arenaCountry']),
+            },
+            'attendance': int(game['attendance']),
+            'homeTeam': {
+                'teamId': int(game['homeTeam']['teamId']),
+                'teamName': str(game['homeTeam']['teamName']),
+                'teamCity': str(game['homeTeam']['teamCity']),
+                'teamTricode': str(game['homeTeam']['teamTricode']),
+                'wins': int(game['homeTeam']['teamWins']),
+                'losses': int(game['homeTeam']['teamLosses']),
+                'score': int(game['homeTeam']['score']),
+                'periods': game['homeTeam']['periods'],
+                'players': game['homeTeam']['players'],
+                'inactives': game['homeTeam']['inactives'],
+            },
+            'awayTeam': {
+                'teamId': int(game['awayTeam']['teamId']),
+                'teamName': str(game['awayTeam']['teamName']),
+                'teamCity': str(game['awayTeam']['teamCity']),
+                'teamTricode': str(game['awayTeam']['teamTricode']),
+                'wins': int(game['awayTeam']['teamWins']),
+                'losses': int(game['awayTeam']['teamLosses']),
+                'score': int(game['awayTeam']['score']),
+                'periods': game['awayTeam']['periods'],
+                'players': game['awayTeam']['players'],
+                'inactives': game['awayTeam']['inactives'],
+            },
+            'officials': game['officials'],
+            'lastFiveMeetings': game['lastFiveMeetings'],
+            'lineScore': line_score_data,
+        }
+
     def _build_game_details_from_scoreboard(self, game: Dict[str, Any]) -> Dict[str, Any]:
         """
         Constrói detalhes do jogo a partir dos dados do ScoreBoard (para jogos ao vivo).
@@ -298,7 +478,52 @@ class NBAClient:
             'lineScore': line_score_data,
         }
 
+    def get_games_details(self, game_ids: List[str], concurrency: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Busca detalhes de vários jogos em paralelo.
+
+        Falhas são reportadas por jogo, sem derrubar o lote inteiro.
+
+        Args:
+            game_ids: IDs dos jogos
+            concurrency: Máximo de buscas simultâneas (padrão: batch_concurrency)
+
+        Returns:
+            Dicionário por ID com {'details': ...} ou {'error': ...}
+        """
+        game_ids = list(dict.fromkeys(game_ids))
+        with ThreadPoolExecutor(max_workers=concurrency or self.batch_concurrency) as pool:
+            results = list(pool.map(self._get_batch_item, game_ids))
+        return dict(zip(game_ids, results))
+
+    def _get_batch_item(self, game_id: str) -> Dict[str, Any]:
+        """Resultado de um item do lote de detalhes."""
+        try:
+            details = self.get_game_details(game_id)
+        except Exception as e:
+            return {'error': str(e)}
+        if not details:
+            return {'error': 'Jogo não encontrado'}
+        return {'details': details}
+
     def get_play_by_play(self, game_id: str) -> List[Dict[str, Any]]:
+        """
+        Busca eventos do play-by-play, usando o cache quando possível.
+
+        Args:
+            game_id: ID do jogo
+
+        Returns:
+            Lista de eventos do jogo
+        """
+        # None indica erro no upstream; para quem chama, equivale a nenhum resultado
+        return self._cached(
+            ('get_play_by_play', game_id),
+            lambda: self._fetch_play_by_play(game_id),
+            lambda events: self._play_by_play_ttl(events),
+        ) or []
+
+    def _fetch_play_by_play(self, game_id: str) -> Optional[List[Dict[str, Any]]]:
         """
         Busca eventos do play-by-play usando PlayByPlayV2.
         
@@ -311,39 +536,79 @@ class NBAClient:
         try:
             pbp = PlayByPlay(game_id=game_id)
             data = pbp.get_dict()
-            actions = data['game']['actions']
-            
-            events = []
-            for action in actions:
-                event_info = {
-                    'actionNumber': int(action['actionNumber']),
-                    'actionType': str(action['actionType']),
-                    'subType': str(action.get('subType', '')),
-                    'descriptor': str(action.get('descriptor', '')),
-                    'clock': str(action['clock']),
-                    'period': int(action['period']),
-                    'periodType': str(action['periodType']),
-                    'teamId': int(action.get('teamId', 0)),
-                    'teamTricode': str(action.get('teamTricode', '')),
-                    'personId': int(action.get('personId', 0)),
-                    'playerName': str(action.get('playerName', '')),
-                    'playerNameI': str(action.get('playerNameI', '')),
-                    'description': str(action.get('description', '')),
-                    'scoreHome': str(action.get('scoreHome', '')),
-                    'scoreAway': str(action.get('scoreAway', '')),
-                    'possession': int(action.get('possession', 0)),
-                    'timeActual': str(action.get('timeActual', '')),
-                    'x': action.get('x'),
-                    'y': action.get('y'),
-                    'qualifiers': action.get('qualifiers', []),
-                    'personIdsFilter': action.get('personIdsFilter', []),
-                }
-                events.append(event_info)
-            
-            return events
+            return self._parse_play_by_play(data['game']['actions'])
         except Exception as e:
-            print(f"Error fetching play-by-play for {game_id}: {str(e)}", file=sys.stderr)
-            return []
+            logger.error("Error fetching play-by-play for %s: %s", game_id, e, extra={'gameId': game_id})
+            return None
+
+    def _parse_play_by_play(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Converte as ações brutas do PlayByPlay no formato da API.
+
+        Args:
+            actions: Lista game.actions do upstream
+
+        Returns:
+            Lista de eventos do jogo
+        """
+        events = []
+        for action in actions:
+            event_info = {
+                'actionNumber': int(action['actionNumber']),
+                'actionType': str(action['actionType']),
+                'subType': str(action.get('subType', '')),
+                'descriptor': str(action.get('descriptor', '')),
+                'clock': str(action['clock']),
+                'period': int(action['period']),
+                'periodType': str(action['periodType']),
+                'teamId': int(action.get('teamId', 0)),
+                'teamTricode': str(action.get('teamTricode', '')),
+                'personId': int(action.get('personId', 0)),
+                'playerName': str(action.get('playerName', '')),
+                'playerNameI': str(action.get('playerNameI', '')),
+                'description': str(action.get('description', '')),
+                'scoreHome': str(action.get('scoreHome', '')),
+                'scoreAway': str(action.get('scoreAway', '')),
+                'possession': int(action.get('possession', 0)),
+                'timeActual': str(action.get('timeActual', '')),
+                'x': action.get('x'),
+                'y': action.get('y'),
+                'qualifiers': action.get('qualifiers', []),
+                'personIdsFilter': action.get('personIdsFilter', []),
+            }
+            events.append(event_info)
+
+        return events
+
+    def live_game_summary(self, game: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resumo de um jogo do ScoreBoard ao vivo com os campos que mudam durante
+        o jogo (placar, relógio, período e status), usado no stream do scoreboard.
+
+        Args:
+            game: Jogo no formato bruto do ScoreBoard
+
+        Returns:
+            Dicionário com o resumo do jogo
+        """
+        return {
+            'gameId': str(game['gameId']),
+            'status': self._parse_game_status(game['gameStatus']),
+            'statusText': str(game['gameStatusText']).strip(),
+            'period': int(game['period']),
+            'gameClock': str(game['gameClock']),
+            'gameTimeUTC': str(game['gameTimeUTC']),
+            'homeTeam': {
+                'teamId': int(game['homeTeam']['teamId']),
+                'teamTricode': str(game['homeTeam']['teamTricode']),
+                'score': int(game['homeTeam']['score']),
+            },
+            'awayTeam': {
+                'teamId': int(game['awayTeam']['teamId']),
+                'teamTricode': str(game['awayTeam']['teamTricode']),
+                'score': int(game['awayTeam']['score']),
+            },
+        }
 
     def _parse_game_status(self, status_id: int) -> str:
         """Converte ID de status para string."""
@@ -364,4 +629,79 @@ class NBAClient:
     def _get_team_abbr(self, team_id: int) -> str:
         """Obtém abreviação do time pelo ID."""
         team = self.teams_dict.get(team_id)
-        return team['abbreviation'] if team else "UNK"
\ No newline at end of file
+        return team['abbreviation'] if team else "UNK"
+
+    def _build_teams_index(self) -> Dict[str, int]:
+        """
+        Índice de busca de times: nome completo, sigla, apelido e cidade (em minúsculas) -> ID.
+
+        Chaves ambíguas (ex.: 'los angeles') ficam de fora.
+        """
+        index: Dict[str, int] = {}
+        ambiguous = set()
+        for team in self.teams:
+            for key in (team['full_name'], team['abbreviation'], team['nickname'], team['city']):
+                key = key.lower()
+                if key in index and index[key] != team['id']:
+                    ambiguous.add(key)
+                index[key] = team['id']
+        for key in ambiguous:
+            del index[key]
+        return index
+
+    def get_team_id(self, name: str) -> Optional[int]:
+        """
+        Busca o ID de um time pelo nome completo, sigla, apelido ou cidade.
+
+        Args:
+            name: Ex.: 'Boston Celtics', 'BOS', 'Celtics' ou 'Boston'
+
+        Returns:
+            ID do time ou None se não encontrado
+        """
+        return self.teams_index.get(name.strip().lower())
+
+    def get_team_name_by_id(self, team_id: int) -> str:
+        """Obtém nome do time pelo ID."""
+        return self._get_team_name(int(team_id))
+
+    def get_todays_games(self) -> pd.DataFrame:
+        """
+        Jogos de hoje a partir do snapshot do scoreboard ao vivo.
+
+        Returns:
+            DataFrame com GAME_ID, HOME_TEAM_ID, VISITOR_TEAM_ID, GAME_STATUS e GAME_STATUS_TEXT
+        """
+        return pd.DataFrame(
+            [
+                {
+                    'GAME_ID': str(game['gameId']),
+                    'HOME_TEAM_ID': int(game['homeTeam']['teamId']),
+                    'VISITOR_TEAM_ID': int(game['awayTeam']['teamId']),
+                    'GAME_STATUS': self._parse_game_status(game['gameStatus']),
+                    'GAME_STATUS_TEXT': str(game.get('gameStatusText', '')).strip(),
+                }
+                for game in self.live_scoreboard.games()
+            ],
+            columns=['GAME_ID', 'HOME_TEAM_ID', 'VISITOR_TEAM_ID', 'GAME_STATUS', 'GAME_STATUS_TEXT'],
+        )
+
+    def get_season_game_log(self) -> TeamGameLog:
+        """Game log de todos os times na temporada atual, buscado uma vez e atualizado incrementalmente."""
+        season = self._current_season()
+        if self._game_log is None or self._game_log.season != season:
+            self._game_log = TeamGameLog(season)
+        return self._game_log
+
+    def get_recent_games(self, team_id: int, last_n: int = 10) -> pd.DataFrame:
+        """
+        Últimos jogos de um time na temporada atual, servidos do game log em memória.
+
+        Args:
+            team_id: ID do time
+            last_n: Número de jogos
+
+        Returns:
+            DataFrame do LeagueGameLog com os últimos `last_n` jogos do time
+        """
+        return self.get_season_game_log().team_games(team_id).tail(last_n)
\ No newline at end of file
@@ -0,0 +1,68 @@
+from typing import Dict, Any, Optional
+from columnar import parse_clock
+import datetime
+
+
+class PollSchedule:
+    """
+    Intervalo de polling de um jogo a partir do status, período e relógio.
+
+    Rápido durante o jogo e mais ainda no fim do 4º período/prorrogação,
+    lento antes do jogo e nos intervalos, e nenhum polling depois do fim.
+    Todos os intervalos estão em segundos.
+    """
+
+    def __init__(self, live: float = 6.0, crunch_time: float = 3.0, period_break: float = 20.0,
+                 halftime: float = 60.0, pre_game: float = 60.0, pre_game_far: float = 300.0,
+                 unknown: float = 30.0, crunch_time_clock: float = 300.0, pre_game_window: float = 1800.0):
+        self.live = live
+        self.crunch_time = crunch_time
+        self.period_break = period_break
+        self.halftime = halftime
+        self.pre_game = pre_game
+        self.pre_game_far = pre_game_far
+        self.unknown = unknown
+        # Segundos restantes no 4º período/prorrogação a partir dos quais é "crunch time"
+        self.crunch_time_clock = crunch_time_clock
+        # Antecedência do início do jogo a partir da qual o pré-jogo passa a ser polled mais rápido
+        self.pre_game_window = pre_game_window
+
+    def interval(self, details: Optional[Dict[str, Any]]) -> Optional[float]:
+        """
+        Calcula o próximo intervalo de polling.
+
+        Args:
+            details: Detalhes do jogo (get_game_details) ou None se a busca falhou
+
+        Returns:
+            Segundos até o próximo poll, ou None se o jogo terminou
+        """
+        if not details:
+            return self.unknown
+
+        status = details['status']
+        if status == "finished":
+            return None
+        if status == "pre-live":
+            return self._pre_game_interval(details['gameTimeUTC'])
+        if status != "live":
+            return self.unknown
+
+        period = details['period']
+        clock = parse_clock(details['gameClock'])
+        if clock == 0:
+            return self.halftime if period == 2 else self.period_break
+        if period >= 4 and clock <= self.crunch_time_clock:
+            return self.crunch_time
+        return self.live
+
+    def _pre_game_interval(self, game_time_utc: str) -> float:
+        """Pré-jogo: polling lento até perto do horário de início."""
+        try:
+            tip_off = datetime.datetime.fromisoformat(game_time_utc.replace('Z', '+00:00'))
+        except ValueError:
+            return self.pre_game
+        if tip_off.tzinfo is None:
+            tip_off = tip_off.replace(tzinfo=datetime.timezone.utc)
+        remaining = (tip_off - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        return self.pre_game_far if remaining > self.pre_game_window else self.pre_game
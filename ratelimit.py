@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Limitador token bucket para as requisições ao upstream.
+
+    Acumula `rate` tokens por segundo até `capacity`; cada requisição consome
+    um token e, sem tokens disponíveis, aguarda até o próximo ser gerado.
+    """
+
+    def __init__(self, rate: float = 5.0, capacity: float = 10.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.waits = 0
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Consome um token, aguardando se o limite tiver sido atingido."""
+        # O lock mantém a ordem de chegada entre os chamadores que estão esperando
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                self.waits += 1
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
@@ -0,0 +1,105 @@
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from metrics import SERIALIZATION_LATENCY
+import gzip
+import hashlib
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usa o json da biblioteca padrão
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele só gzip é oferecido
+    brotli = None
+
+# Respostas menores que isso não compensam compressão
+MIN_COMPRESS_SIZE = 1024
+
+
+def dumps(data: Any) -> bytes:
+    """Serializa em JSON compacto, com orjson quando disponível."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class EncodedResponse:
+    """
+    Corpo JSON já serializado, com as variantes comprimidas e o ETag.
+
+    O ETag é forte, então cada codificação tem o seu (sufixo -gzip/-br):
+    corpos com bytes diferentes não podem compartilhar o mesmo validador.
+
+    Para dados imutáveis (jogos finalizados) é criado uma vez e reaproveitado
+    em todas as requisições seguintes.
+    """
+
+    def __init__(self, data: Any, compress_level: int = 9):
+        with SERIALIZATION_LATENCY.time(kind='http'):
+            self.body = dumps(data)
+            self.digest = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+            self.etag = f'"{self.digest}"'
+            self.gzip: Optional[bytes] = None
+            self.br: Optional[bytes] = None
+            if len(self.body) >= MIN_COMPRESS_SIZE:
+                self.gzip = gzip.compress(self.body, compresslevel=compress_level)
+                if brotli is not None:
+                    self.br = brotli.compress(self.body, quality=11 if compress_level >= 9 else 4)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """ETag da variante na codificação informada (None = sem compressão)."""
+        return f'"{self.digest}-{encoding}"' if encoding else self.etag
+
+
+def cache_control(ttl: Optional[float]) -> str:
+    """Cache-Control a partir do TTL do dado: imutável para jogos finalizados, curto para jogos ao vivo."""
+    if ttl is None:
+        return "public, max-age=86400, immutable"
+    return f"public, max-age={int(ttl)}"
+
+
+def _accepted_encodings(request: Request) -> set:
+    encodings = set()
+    for item in request.headers.get('accept-encoding', '').split(','):
+        name, _, params = item.partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0'):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+def respond(request: Request, encoded: EncodedResponse, ttl: Optional[float]) -> Response:
+    """
+    Monta a resposta HTTP: 304 se o cliente já tem a versão atual (If-None-Match),
+    senão o corpo na melhor codificação aceita pelo cliente.
+    """
+    accepted = _accepted_encodings(request)
+    body, encoding = encoded.body, None
+    if encoded.br is not None and 'br' in accepted:
+        body, encoding = encoded.br, 'br'
+    elif encoded.gzip is not None and 'gzip' in accepted:
+        body, encoding = encoded.gzip, 'gzip'
+
+    etag = encoded.etag_for(encoding)
+    headers = {
+        'ETag': etag,
+        'Cache-Control': cache_control(ttl),
+        'Vary': 'Accept-Encoding',
+    }
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return Response(body, media_type='application/json', headers=headers)
@@ -0,0 +1,177 @@
+from nba_api.live.nba.endpoints import ScoreBoard
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from shared import decode, encode
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LiveScoreboard:
+    """
+    Snapshot compartilhado do ScoreBoard ao vivo, indexado por gameId.
+
+    Uma task em background (`run`) atualiza o snapshot em cadência fixa e
+    todos os caminhos que precisam do status ao vivo ou dos jogos de hoje
+    leem daqui. Sem a task (ex.: CLI), o snapshot é atualizado sob demanda
+    quando fica mais velho que `max_age`.
+    """
+
+    def __init__(self, interval: float = 10.0, max_age: float = 30.0):
+        self.interval = interval
+        self.max_age = max_age
+        self._games: List[Dict[str, Any]] = []
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        # Chamados com a lista de jogos a cada atualização bem-sucedida do snapshot
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+    def add_listener(self, callback: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """
+        Registra um callback chamado a cada atualização do snapshot.
+
+        O callback roda na mesma thread/loop que a atualização; com o
+        AsyncLiveScoreboard, isso é o event loop.
+        """
+        self._listeners.append(callback)
+
+    def _fetch(self) -> List[Dict[str, Any]]:
+        """Busca a lista de jogos do ScoreBoard ao vivo."""
+        return ScoreBoard().get_dict()['scoreboard']['games']
+
+    def refresh(self) -> None:
+        """Atualiza o snapshot; em caso de erro mantém o anterior."""
+        try:
+            games = self._fetch()
+        except Exception as e:
+            logger.error("Error refreshing live scoreboard: %s", e)
+            return
+        self._store(games)
+
+    def _store(self, games: List[Dict[str, Any]]) -> None:
+        """Substitui o snapshot e o índice por gameId."""
+        index = {str(game['gameId']): game for game in games}
+        with self._lock:
+            self._games, self._index = games, index
+            self._fetched_at = time.monotonic()
+        for callback in self._listeners:
+            try:
+                callback(games)
+            except Exception as e:
+                logger.exception("Error in live scoreboard listener: %s", e)
+
+    def _is_stale(self) -> bool:
+        """Indica se o snapshot não existe ou está mais velho que `max_age`."""
+        fetched_at = self._fetched_at
+        return fetched_at is None or time.monotonic() - fetched_at > self.max_age
+
+    def _ensure_fresh(self) -> None:
+        """Atualiza o snapshot sob demanda se ele não existir ou estiver velho."""
+        if self._is_stale():
+            self.refresh()
+
+    def games(self) -> List[Dict[str, Any]]:
+        """Jogos de hoje no formato bruto do ScoreBoard."""
+        self._ensure_fresh()
+        return self._games
+
+    def get_game(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca um jogo de hoje no snapshot.
+
+        Args:
+            game_id: ID do jogo
+
+        Returns:
+            Dados brutos do jogo ou None se ele não estiver no scoreboard de hoje
+        """
+        self._ensure_fresh()
+        return self._index.get(game_id)
+
+    async def run(self) -> None:
+        """Loop de atualização em background; bloqueio do nba_api roda fora do event loop."""
+        while True:
+            await asyncio.to_thread(self.refresh)
+            await asyncio.sleep(self.interval)
+
+
+class AsyncLiveScoreboard(LiveScoreboard):
+    """
+    Variante assíncrona do LiveScoreboard, usada pelo AsyncNBAClient.
+
+    Mantém os mesmos nomes de métodos, mas a busca é uma corrotina que usa o
+    cliente HTTP do AsyncNBAClient em vez de bloquear o event loop.
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]],
+                 interval: float = 10.0, max_age: float = 30.0):
+        super().__init__(interval, max_age)
+        self._fetch_games = fetch
+
+    async def refresh(self) -> None:
+        """Atualiza o snapshot; em caso de erro mantém o anterior."""
+        try:
+            games = await self._fetch_games()
+        except Exception as e:
+            logger.error("Error refreshing live scoreboard: %s", e)
+            return
+        self._store(games)
+
+    async def _ensure_fresh(self) -> None:
+        """Atualiza o snapshot sob demanda se ele não existir ou estiver velho."""
+        if self._is_stale():
+            await self.refresh()
+
+    async def games(self) -> List[Dict[str, Any]]:
+        """Jogos de hoje no formato bruto do ScoreBoard."""
+        await self._ensure_fresh()
+        return self._games
+
+    async def get_game(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca um jogo de hoje no snapshot.
+
+        Args:
+            game_id: ID do jogo
+
+        Returns:
+            Dados brutos do jogo ou None se ele não estiver no scoreboard de hoje
+        """
+        await self._ensure_fresh()
+        return self._index.get(game_id)
+
+    async def run(self) -> None:
+        """Loop de atualização em background."""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    async def run_shared(self, store, owner: str) -> None:
+        """
+        Loop de atualização com backend compartilhado entre workers.
+
+        Só o worker que detém o lease `nba:leader:scoreboard` busca o upstream
+        e publica o snapshot; os outros leem o snapshot publicado. Se o líder
+        sumir, o lease expira e outro worker assume.
+
+        Args:
+            store: Backend compartilhado (shared.MemoryStore ou shared.RedisStore)
+            owner: Identificador deste worker
+        """
+        while True:
+            try:
+                if await store.acquire('nba:leader:scoreboard', owner, self.interval * 3):
+                    fetched_at = self._fetched_at
+                    await self.refresh()
+                    if self._fetched_at != fetched_at:
+                        await store.set('nba:scoreboard', encode(self._games), self.max_age)
+                else:
+                    raw = await store.get('nba:scoreboard')
+                    if raw is not None:
+                        self._store(decode(raw))
+            except Exception as e:
+                logger.error("Error syncing shared live scoreboard: %s", e)
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,178 @@
+from typing import Any, Dict, Optional, Set, Tuple
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # redis é opcional; sem ele só o MemoryStore está disponível
+    redis = None
+
+# Valores imutáveis (jogos finalizados) ficam no backend por um dia; o arquivo local guarda o resto
+IMMUTABLE_TTL = 86400.0
+
+
+def encode(value: Any) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def decode(raw: bytes) -> Any:
+    return json.loads(raw)
+
+
+def worker_id() -> str:
+    """Identificador único deste processo, usado como dono dos leases."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class MemorySubscription:
+    def __init__(self, store: 'MemoryStore', channel: str):
+        self._store = store
+        self._channel = channel
+        self._queue: asyncio.Queue = asyncio.Queue()
+        store._channels.setdefault(channel, set()).add(self._queue)
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """Próxima mensagem do canal, ou None se nada chegou em `timeout` segundos."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        self._store._channels.get(self._channel, set()).discard(self._queue)
+
+
+class MemoryStore:
+    """
+    Backend compartilhado em memória, com a mesma interface do RedisStore.
+
+    Só é compartilhado dentro do processo: serve para testes e para rodar
+    com um único worker sem Redis.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._channels: Dict[str, Set[asyncio.Queue]] = {}
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._values[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """Obtém ou renova o lease `key` para `owner` por `ttl` segundos."""
+        current = self._get(key)
+        if current is not None and current != owner.encode():
+            return False
+        await self.set(key, owner.encode(), ttl)
+        return True
+
+    async def release(self, key: str, owner: str) -> None:
+        """Libera o lease, se ainda pertencer a `owner`."""
+        if self._get(key) == owner.encode():
+            del self._values[key]
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for queue in self._channels.get(channel, ()):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> MemorySubscription:
+        return MemorySubscription(self, channel)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """Próxima mensagem do canal, ou None se nada chegou em `timeout` segundos."""
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return message['data'] if message is not None else None
+
+    async def close(self) -> None:
+        await self._pubsub.unsubscribe()
+        await self._pubsub.aclose()
+
+
+class RedisStore:
+    """
+    Backend compartilhado em um Redis (ou compatível: Valkey, KeyDB, Dragonfly).
+
+    Leases usam SET NX com expiração; renovação e liberação são scripts Lua
+    que só agem se o lease ainda pertence ao dono, para que um worker atrasado
+    nunca apague o lease de outro.
+    """
+
+    ACQUIRE_SCRIPT = """
+    if redis.call('set', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then return 1 end
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        redis.call('pexpire', KEYS[1], ARGV[2])
+        return 1
+    end
+    return 0
+    """
+    RELEASE_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end
+    return 0
+    """
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("RedisStore requer o pacote redis (pip install redis)")
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        await self._redis.set(key, value, px=int(ttl * 1000) if ttl is not None else None)
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """Obtém ou renova o lease `key` para `owner` por `ttl` segundos."""
+        return bool(await self._redis.eval(self.ACQUIRE_SCRIPT, 1, key, owner, int(ttl * 1000)))
+
+    async def release(self, key: str, owner: str) -> None:
+        """Libera o lease, se ainda pertencer a `owner`."""
+        await self._redis.eval(self.RELEASE_SCRIPT, 1, key, owner)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self._redis.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> RedisSubscription:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(channel)
+        return RedisSubscription(pubsub)
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
+
+
+def store_from_env():
+    """
+    Backend configurado em NBA_SHARED_STORE: uma URL redis:// (ou rediss://)
+    ou 'memory'. Retorna None se a variável não estiver definida.
+    """
+    url = os.environ.get('NBA_SHARED_STORE')
+    if not url:
+        return None
+    if url == 'memory':
+        return MemoryStore()
+    return RedisStore(url)
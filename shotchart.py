@@ -0,0 +1,157 @@
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from analytics import action_points
+import numpy as np
+
+# Grade de meia quadra sobre as coordenadas do feed (percentual da quadra inteira):
+# x de 0 a 50 (da linha de fundo ao meio da quadra) e y de 0 a 100, ~2 pés por bin
+X_RANGE = 50.0
+Y_RANGE = 100.0
+X_BINS = 25
+Y_BINS = 25
+SHOT_TYPES = ('2pt', '3pt')
+
+
+class GameShotBins:
+    """
+    Arremessos de um jogo já agregados na grade, uma linha por jogador.
+
+    `attempts` e `made` têm forma (jogadores, X_BINS * Y_BINS), então somar
+    jogos, times ou jogadores é só somar linhas desses arrays.
+    """
+
+    def __init__(self, person_ids: np.ndarray, team_ids: np.ndarray, attempts: np.ndarray, made: np.ndarray):
+        self.person_ids = person_ids
+        self.team_ids = team_ids
+        self.attempts = attempts
+        self.made = made
+
+    def select(self, team_id: Optional[int] = None, person_id: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Soma os bins das linhas que passam nos filtros de time e jogador."""
+        mask = np.ones(len(self.person_ids), dtype=bool)
+        if team_id is not None:
+            mask &= self.team_ids == team_id
+        if person_id is not None:
+            mask &= self.person_ids == person_id
+        return self.attempts[mask].sum(axis=0, dtype=np.int64), self.made[mask].sum(axis=0, dtype=np.int64)
+
+
+def game_shot_bins(events: List[Dict[str, Any]]) -> GameShotBins:
+    """
+    Agrega os arremessos de quadra de um jogo na grade de meia quadra.
+
+    Arremessos do lado oposto são espelhados para a mesma cesta. Um arremesso
+    é considerado convertido quando o placar muda na própria ação.
+
+    Args:
+        events: Play-by-play completo do jogo (get_play_by_play)
+
+    Returns:
+        Bins de tentativas e acertos por jogador
+    """
+    points = action_points(events) if events else np.zeros(0, dtype=np.int64)
+    shots = [
+        (e['personId'], e['teamId'], e['x'], e['y'], made)
+        for e, made in zip(events, points > 0)
+        if e['actionType'] in SHOT_TYPES and e['x'] is not None and e['y'] is not None
+    ]
+    if not shots:
+        empty = np.zeros((0, X_BINS * Y_BINS), dtype=np.uint8)
+        return GameShotBins(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), empty, empty)
+
+    person, team, x, y, made = (np.array(column) for column in zip(*shots))
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    far_side = x > X_RANGE
+    x = np.where(far_side, 2 * X_RANGE - x, x)
+    y = np.where(far_side, Y_RANGE - y, y)
+
+    x_bin = np.clip((x / X_RANGE * X_BINS).astype(np.int64), 0, X_BINS - 1)
+    y_bin = np.clip((y / Y_RANGE * Y_BINS).astype(np.int64), 0, Y_BINS - 1)
+    cell = x_bin * Y_BINS + y_bin
+
+    players, first, row = np.unique(person, return_index=True, return_inverse=True)
+    # uint8 basta por jogador/jogo/bin e mantém uma temporada inteira de jogos em poucas dezenas de MB
+    attempts = np.zeros((len(players), X_BINS * Y_BINS), dtype=np.uint8)
+    made_bins = np.zeros_like(attempts)
+    np.add.at(attempts, (row, cell), 1)
+    np.add.at(made_bins, (row, cell), made.astype(np.uint8))
+
+    # Time de cada jogador: o do seu primeiro arremesso no jogo
+    return GameShotBins(players.astype(np.int64), team[first].astype(np.int64), attempts, made_bins)
+
+
+def aggregate(games: Iterable[GameShotBins], team_id: Optional[int] = None,
+              person_id: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Soma os bins de vários jogos.
+
+    Returns:
+        Tupla (tentativas, acertos), cada uma com forma (X_BINS, Y_BINS)
+    """
+    attempts = np.zeros(X_BINS * Y_BINS, dtype=np.int64)
+    made = np.zeros(X_BINS * Y_BINS, dtype=np.int64)
+    for bins in games:
+        game_attempts, game_made = bins.select(team_id, person_id)
+        attempts += game_attempts
+        made += game_made
+    return attempts.reshape(X_BINS, Y_BINS), made.reshape(X_BINS, Y_BINS)
+
+
+def to_response(attempts: np.ndarray, made: np.ndarray) -> Dict[str, Any]:
+    """Formata a grade agregada para a API (só bins com tentativas)."""
+    x_index, y_index = np.nonzero(attempts)
+    total_attempts = int(attempts.sum())
+    total_made = int(made.sum())
+    return {
+        'grid': {
+            'xBins': X_BINS,
+            'yBins': Y_BINS,
+            'xRange': [0.0, X_RANGE],
+            'yRange': [0.0, Y_RANGE],
+        },
+        'bins': [
+            {
+                'x': int(i),
+                'y': int(j),
+                'attempts': int(attempts[i, j]),
+                'made': int(made[i, j]),
+                'fgPct': round(float(made[i, j] / attempts[i, j]), 3),
+            }
+            for i, j in zip(x_index, y_index)
+        ],
+        'totals': {
+            'attempts': total_attempts,
+            'made': total_made,
+            'fgPct': round(total_made / total_attempts, 3) if total_attempts else 0.0,
+        },
+    }
+
+
+class ShotChartStore:
+    """
+    Cache dos bins por jogo.
+
+    Jogos finalizados ficam no cache (LRU, até `maxsize` jogos); jogos ao vivo
+    são recalculados a cada consulta, pois o play-by-play ainda muda.
+    """
+
+    def __init__(self, maxsize: int = 1500):
+        self.maxsize = maxsize
+        self._games: "OrderedDict[str, GameShotBins]" = OrderedDict()
+
+    def get(self, game_id: str) -> Optional[GameShotBins]:
+        """Bins em cache do jogo ou None."""
+        bins = self._games.get(game_id)
+        if bins is not None:
+            self._games.move_to_end(game_id)
+        return bins
+
+    def build(self, game_id: str, events: List[Dict[str, Any]]) -> GameShotBins:
+        """Calcula os bins do jogo e os guarda se o play-by-play já contém o fim do jogo."""
+        bins = game_shot_bins(events)
+        if events and events[-1]['actionType'] == 'game' and events[-1]['subType'] == 'end':
+            self._games[game_id] = bins
+            while len(self._games) > self.maxsize:
+                self._games.popitem(last=False)
+        return bins
@@ -0,0 +1,47 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+
+
+class SingleFlight:
+    """
+    Deduplicação de chamadas assíncronas concorrentes pela mesma chave.
+
+    Enquanto uma busca por `key` está em andamento, novos chamadores com a
+    mesma chave aguardam o mesmo resultado em vez de disparar outra chamada
+    ao upstream. A busca roda em uma task própria, então o cancelamento de um
+    chamador (ex.: cliente HTTP desconectou) não cancela os demais.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa `fetch` uma única vez por chave entre chamadores concorrentes.
+
+        Args:
+            key: Chave da chamada (endpoint e parâmetros)
+            fetch: Função que retorna a corrotina da busca
+
+        Returns:
+            Resultado da busca, compartilhado entre todos os chamadores
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de chamadas executadas, coalescidas e em andamento."""
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'inflight': len(self._inflight),
+        }
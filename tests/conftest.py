@@ -0,0 +1,36 @@
+import importlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Data dos jogos finalizados nas fixtures sintéticas do upstream
+FIXTURE_DATE = '2024-01-15'
+
+
+@pytest.fixture(scope='session')
+def api(tmp_path_factory):
+    """Módulo app configurado sobre um upstream sintético (upstream.synthesize), sem rede."""
+    from upstream import synthesize
+
+    directory = str(tmp_path_factory.mktemp('fixtures'))
+    synthesize(FIXTURE_DATE, directory, games=3, actions=120)
+    os.environ['NBA_UPSTREAM_FIXTURES'] = directory
+    os.environ.setdefault('LOG_FORMAT', 'text')
+    return importlib.import_module('app')
+
+
+@pytest.fixture(scope='session')
+def live_game_id(api) -> str:
+    """Um dos jogos ao vivo do scoreboard de hoje nas fixtures."""
+    from upstream import load_fixture
+
+    scoreboard = load_fixture(os.environ['NBA_UPSTREAM_FIXTURES'], 'todaysScoreboard.json.gz')
+    return scoreboard['scoreboard']['games'][0]['gameId']
+
+
+@pytest.fixture(scope='session')
+def http(api):
+    # Uma sessão só: o fim do lifespan fecha o cliente do upstream, que é global no app
+    with TestClient(api.app) as client:
+        yield client
@@ -0,0 +1,67 @@
+from typing import Any, Dict, List
+
+
+def make_details(game_id: str = '0022300001', status: str = 'live', period: int = 2) -> Dict[str, Any]:
+    """Detalhes mínimos de um jogo no formato de get_game_details."""
+    return {
+        'gameId': game_id,
+        'status': status,
+        'period': period,
+        'gameClock': 'PT05M00.00S',
+        'gameTimeUTC': '2024-01-15T00:00:00Z',
+        'homeTeam': {'teamId': 1610612737, 'score': 50},
+        'awayTeam': {'teamId': 1610612738, 'score': 48},
+    }
+
+
+def make_action(number: int, **fields: Any) -> Dict[str, Any]:
+    """Ação de play-by-play no formato de get_play_by_play."""
+    action = {
+        'actionNumber': number,
+        'actionType': '2pt',
+        'subType': 'Jump Shot',
+        'clock': 'PT10M00.00S',
+        'period': 1,
+        'teamId': 1610612737,
+        'personId': 1629001,
+        'scoreHome': str(2 * number),
+        'scoreAway': '0',
+        'description': f'Ação {number}',
+    }
+    action.update(fields)
+    return action
+
+
+def make_play_by_play(count: int) -> List[Dict[str, Any]]:
+    return [make_action(number) for number in range(1, count + 1)]
+
+
+def game_end(number: int) -> Dict[str, Any]:
+    return make_action(number, actionType='game', subType='end', personId=0, teamId=0)
+
+
+class FakeClient:
+    """Cliente com a interface usada pelo GameHub, servindo um estado controlado pelo teste."""
+
+    def __init__(self, details: Dict[str, Any], pbp: List[Dict[str, Any]]):
+        self.details = details
+        self.pbp = pbp
+        self.calls = 0
+
+    async def get_game_details(self, game_id: str) -> Dict[str, Any]:
+        self.calls += 1
+        return self.details
+
+    async def get_play_by_play(self, game_id: str) -> List[Dict[str, Any]]:
+        return self.pbp
+
+    def replay_speed(self, game_id: str) -> float:
+        return 1.0
+
+
+def drain(queue) -> List[Dict[str, Any]]:
+    """Mensagens pendentes na fila de um inscrito."""
+    messages = []
+    while not queue.empty():
+        messages.append(queue.get_nowait())
+    return messages
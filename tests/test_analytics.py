@@ -0,0 +1,60 @@
+import pytest
+
+from analytics import NBAAnalytics
+from tests.test_gamelog import CELTICS, HAWKS, NETS, FakeGameLog, game_rows
+
+
+@pytest.fixture
+def game_log():
+    rows = (game_rows('1', '2024-01-10', HAWKS, CELTICS, 110, 100)
+            + game_rows('2', '2024-01-12', CELTICS, HAWKS, 120, 104)
+            + game_rows('3', '2024-01-14', HAWKS, NETS, 98, 102))
+    return FakeGameLog([rows])
+
+
+def test_season_form_is_cached_per_game_log_version(game_log):
+    analytics = NBAAnalytics()
+    form = analytics.season_form(game_log)
+    assert analytics.season_form(game_log) is form
+    assert analytics.season_form(game_log, last_n=2) is not form
+
+    game_log.version += 1
+    assert analytics.season_form(game_log, last_n=2) is not form
+
+
+def test_calculate_averages_record_and_home_away_splits(game_log):
+    analytics = NBAAnalytics()
+    hawks = analytics.calculate_averages(analytics.season_form(game_log), HAWKS)
+    assert hawks['record'] == '1-2'
+    assert hawks['PTS'] == pytest.approx((110 + 104 + 98) / 3, abs=1e-3)
+    assert hawks['OPP_PTS'] == pytest.approx((100 + 120 + 102) / 3, abs=1e-3)
+    assert hawks['HOME_PTS'] == 104.0
+    assert hawks['AWAY_PTS'] == 104.0
+
+    nets = analytics.calculate_averages(analytics.season_form(game_log), NETS)
+    assert nets['AWAY_PTS'] == 102.0
+    assert nets['HOME_PTS'] is None
+
+
+def test_team_form_uses_only_last_n_games(game_log):
+    analytics = NBAAnalytics()
+    hawks = analytics.calculate_averages(analytics.season_form(game_log, last_n=1), HAWKS)
+    assert hawks['record'] == '0-1'
+    assert hawks['PTS'] == 98.0
+
+
+def test_analyze_matchup_expected_total(game_log):
+    analytics = NBAAnalytics()
+    form = analytics.season_form(game_log)
+    result = analytics.analyze_matchup(HAWKS, CELTICS, form)
+    hawks, celtics = result['home_form'], result['away_form']
+    expected = (hawks['PTS'] + celtics['OPP_PTS']) / 2 + (celtics['PTS'] + hawks['OPP_PTS']) / 2
+    assert result['total_expected_pts'] == pytest.approx(expected, abs=1e-2)
+    assert result['ppg_diff'] == pytest.approx(hawks['PTS'] - celtics['PTS'])
+
+
+def test_analyze_matchup_with_unknown_team(game_log):
+    analytics = NBAAnalytics()
+    result = analytics.analyze_matchup(HAWKS, 1, analytics.season_form(game_log))
+    assert result['away_form'] == {}
+    assert result['total_expected_pts'] == 0.0
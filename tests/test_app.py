@@ -0,0 +1,78 @@
+import json
+
+from tests.conftest import FIXTURE_DATE
+
+
+def test_date_range_streams_one_json_line_per_date(http):
+    response = http.get('/games', params={'from': '2024-01-14', 'to': '2024-01-16'})
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line['date'] for line in lines) == ['2024-01-14', '2024-01-15', '2024-01-16']
+    games = next(line['games'] for line in lines if line['date'] == FIXTURE_DATE)
+    assert len(games) == 3
+
+
+def test_date_range_rejects_inverted_and_long_ranges(http):
+    assert http.get('/games', params={'from': '2024-01-16', 'to': '2024-01-14'}).status_code == 400
+    assert http.get('/games', params={'from': '2022-01-01', 'to': '2024-01-14'}).status_code == 400
+
+
+def test_analytics_of_game_tracked_by_hub_reads_hub_state(api, http, live_game_id):
+    with http.websocket_connect(f'/ws/games/{live_game_id}') as websocket:
+        message = websocket.receive_json()
+        while message['type'] != 'analytics_update':
+            message = websocket.receive_json()
+
+        response = http.get(f'/games/{live_game_id}/analytics')
+        assert response.status_code == 200
+        assert response.json()['analytics'] == message['data']
+    # A rota não cria nem altera estado próprio para um jogo que o hub acompanha
+    assert api.analytics.get(live_game_id) is None
+
+
+def test_shot_chart_rejects_too_many_games_outside_archive(api, http):
+    game_ids = ','.join(f'00223{number:05d}' for number in range(api.MAX_BATCH_SIZE + 10))
+    response = http.get('/shotchart', params={'game_id': game_ids})
+    assert response.status_code == 400
+    assert str(api.MAX_BATCH_SIZE) in response.json()['detail']
+
+
+def test_shot_chart_of_a_date_range(http):
+    response = http.get('/shotchart', params={'from': FIXTURE_DATE, 'to': FIXTURE_DATE})
+    assert response.status_code == 200
+    body = response.json()
+    assert body['games'] == 3
+    assert body['totals']['attempts'] == sum(b['attempts'] for b in body['bins']) > 0
+
+
+def test_live_response_is_encoded_once_while_data_is_unchanged(api, http, live_game_id):
+    key = ('get_game_details', live_game_id)
+    first = http.get(f'/games/{live_game_id}/details')
+    assert first.status_code == 200
+    _, (value, encoded) = api.encoded_responses.get(key)
+    assert value is not None
+
+    second = http.get(f'/games/{live_game_id}/details', headers={'If-None-Match': first.headers['etag']})
+    # Mesmo dado no cache do cliente (TTL de alguns segundos): a resposta serializada é reaproveitada
+    assert api.encoded_responses.get(key)[1] == (value, encoded)
+    assert second.status_code == 304
+    assert second.headers['cache-control'].startswith('public, max-age=')
+
+
+def test_finished_game_response_is_immutable(api, http):
+    game_id = http.get(f'/games/{FIXTURE_DATE}').json()['games'][0]['gameId']
+    response = http.get(f'/games/{game_id}/details', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['cache-control'] == 'public, max-age=86400, immutable'
+    assert response.headers['etag'].endswith('-gzip"')
+    assert http.get(f'/games/{game_id}/details', headers={'If-None-Match': response.headers['etag'],
+                                                         'Accept-Encoding': 'gzip'}).status_code == 304
+
+
+def test_metrics_endpoint_reports_routes_by_template(http):
+    http.get(f'/games/{FIXTURE_DATE}')
+    response = http.get('/metrics')
+    assert response.status_code == 200
+    assert 'route="/games/{date}"' in response.text
+    assert '# TYPE nba_http_request_seconds histogram' in response.text
+    assert 'nba_cache_hit_ratio{cache="responses"}' in response.text
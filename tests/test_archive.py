@@ -0,0 +1,49 @@
+import pytest
+
+from archive import GameArchive
+from nba_client import NBAClient
+from tests.helpers import game_end, make_details, make_play_by_play
+
+
+def test_put_and_get_round_trip(tmp_path):
+    archive = GameArchive(str(tmp_path))
+    pbp = make_play_by_play(3) + [game_end(4)]
+    archive.put(('get_play_by_play', '0022300001'), pbp)
+
+    assert archive.get(('get_play_by_play', '0022300001')) == pbp
+    assert archive.contains(('get_play_by_play', '0022300001'))
+    assert archive.get(('get_play_by_play', '0022300002')) is None
+    assert not archive.contains(('get_game_details', '0022300001'))
+
+
+def test_archive_survives_reopening(tmp_path):
+    GameArchive(str(tmp_path)).put(('get_games_by_date', '2024-01-15'), [{'gameId': '1'}])
+    assert GameArchive(str(tmp_path)).get(('get_games_by_date', '2024-01-15')) == [{'gameId': '1'}]
+
+
+def test_client_archives_only_final_values(tmp_path):
+    client = NBAClient(archive_dir=str(tmp_path))
+    statuses = {'0022300001': 'live', '0022300002': 'finished'}
+    client._fetch_game_details = lambda game_id: make_details(game_id, status=statuses[game_id])
+    client.get_game_details('0022300001')
+    client.get_game_details('0022300002')
+
+    assert not client.archive.contains(('get_game_details', '0022300001'))
+    assert client.archive.contains(('get_game_details', '0022300002'))
+
+
+def test_client_ignores_archived_values_that_are_not_final(tmp_path):
+    client = NBAClient(archive_dir=str(tmp_path))
+    # Entrada gravada antes da correção do TTL: lista de uma data passada com jogo ao vivo
+    client.archive.put(('get_games_by_date', '2020-01-01'), [{'gameId': '1', 'status': 'live'}])
+    client._fetch_games_by_date = lambda game_date: [{'gameId': '1', 'status': 'finished'}]
+
+    assert client.get_games_by_date('2020-01-01') == [{'gameId': '1', 'status': 'finished'}]
+    assert client.archive.get(('get_games_by_date', '2020-01-01'))[0]['status'] == 'finished'
+
+
+def test_client_serves_final_values_from_the_archive(tmp_path):
+    client = NBAClient(archive_dir=str(tmp_path))
+    client.archive.put(('get_games_by_date', '2020-01-01'), [{'gameId': '1', 'status': 'finished'}])
+    client._fetch_games_by_date = lambda game_date: pytest.fail("valor arquivado foi buscado no upstream")
+    assert client.get_games_by_date('2020-01-01') == [{'gameId': '1', 'status': 'finished'}]
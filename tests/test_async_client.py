@@ -0,0 +1,83 @@
+import asyncio
+
+import async_client
+import cache
+from async_client import AsyncNBAClient
+from shared import MemoryStore
+
+
+def _accept_encoding(monkeypatch, brotli):
+    monkeypatch.setattr(async_client, 'brotli', brotli)
+
+    async def scenario():
+        client = AsyncNBAClient(archive_dir=None)
+        try:
+            return client.http.headers['Accept-Encoding']
+        finally:
+            await client.aclose()
+
+    return asyncio.run(scenario())
+
+
+def test_brotli_is_only_advertised_when_it_can_be_decoded(monkeypatch):
+    assert 'br' not in _accept_encoding(monkeypatch, None)
+    assert 'br' in _accept_encoding(monkeypatch, object())
+
+
+def test_concurrent_lookups_share_one_upstream_request():
+    async def scenario():
+        client = AsyncNBAClient(archive_dir=None)
+        calls = 0
+
+        async def get_json(url, params=None):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {'scoreboard': {'games': []}}
+
+        client._get_json = get_json
+        results = await asyncio.gather(*(client.get_games_by_date('2020-01-01') for _ in range(5)))
+        await client.aclose()
+        return calls, results
+
+    calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert results == [[]] * 5
+
+
+def test_value_from_shared_store_keeps_writer_expiry(monkeypatch):
+    store = MemoryStore()
+    key = ('get_game_details', '0022300001')
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {'gameId': '0022300001', 'status': 'live', 'version': len(calls)}
+
+    async def scenario(elapsed):
+        writer, reader = AsyncNBAClient(archive_dir=None), AsyncNBAClient(archive_dir=None)
+        writer.shared = reader.shared = store
+        await writer._load(key, fetch, lambda value: 10)
+        now = async_client.time.time()
+        monkeypatch.setattr(async_client.time, 'time', lambda: now + elapsed)
+        value = await reader._load(key, fetch, lambda value: 10)
+        monkeypatch.undo()
+        await writer.aclose()
+        await reader.aclose()
+        return reader, value
+
+    reader, value = asyncio.run(scenario(elapsed=8))
+    assert value['version'] == 1 and len(calls) == 1
+    # No cache local do leitor o valor vale só pelos ~2 s que restavam
+    started = cache.time.monotonic()
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: started + 1)
+    assert reader.cache.get(key)[0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: started + 3)
+    assert not reader.cache.get(key)[0]
+    monkeypatch.undo()
+
+    # Entrada que já expirou para quem gravou é buscada de novo no upstream
+    calls.clear()
+    store._values.clear()
+    _, value = asyncio.run(scenario(elapsed=11))
+    assert len(calls) == 2 and value['version'] == 2
@@ -0,0 +1,49 @@
+import cache
+from cache import ResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_keeps_recently_used_entries():
+    responses = ResponseCache(maxsize=2)
+    responses.set('a', 1, None)
+    responses.set('b', 2, None)
+    assert responses.get('a') == (True, 1)
+    responses.set('c', 3, None)
+
+    assert responses.get('b') == (False, None)
+    assert responses.get('a') == (True, 1)
+    assert responses.get('c') == (True, 3)
+    assert responses.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, 'monotonic', clock)
+    responses = ResponseCache()
+    responses.set('live', 'placar', 3)
+    responses.set('final', 'placar final', None)
+
+    clock.now += 2.9
+    assert responses.get('live') == (True, 'placar')
+    clock.now += 0.2
+    assert responses.get('live') == (False, None)
+    clock.now += 86400
+    assert responses.get('final') == (True, 'placar final')
+    assert responses.stats()['size'] == 1
+
+
+def test_stats_and_invalidate():
+    responses = ResponseCache()
+    responses.set('a', [], None)
+    assert responses.get('a') == (True, [])
+    responses.invalidate('a')
+    assert responses.get('a') == (False, None)
+    stats = responses.stats()
+    assert (stats['hits'], stats['misses'], stats['hitRatio']) == (1, 1, 0.5)
@@ -0,0 +1,65 @@
+from capture import GameRecorder, GameRecording, GameReplay
+from tests.helpers import game_end, make_action, make_details, make_play_by_play
+
+GAME_ID = '0022300001'
+
+
+def record_game(directory, keyframe_interval=3):
+    """Grava um jogo com ações novas, uma correção e uma remoção; retorna os snapshots por timestamp."""
+    recorder = GameRecorder(str(directory), keyframe_interval=keyframe_interval)
+    snapshots = {}
+    for ts in range(10):
+        details = make_details(GAME_ID, period=1 + ts // 3)
+        pbp = make_play_by_play(5 * (ts + 1))
+        if ts >= 4:
+            pbp[1] = make_action(2, description='Editada')
+        if ts >= 6:
+            del pbp[3]
+        recorder.record(('get_game_details', GAME_ID), details, ts=1000.0 + ts)
+        recorder.record(('get_play_by_play', GAME_ID), pbp, ts=1000.0 + ts)
+        snapshots[1000.0 + ts] = (details, pbp)
+
+    final = make_play_by_play(50) + [game_end(51)]
+    final_details = make_details(GAME_ID, status='finished', period=4)
+    recorder.record(('get_game_details', GAME_ID), final_details, ts=1010.0)
+    recorder.record(('get_play_by_play', GAME_ID), final, ts=1010.0)
+    snapshots[1010.0] = (final_details, final)
+    return snapshots
+
+
+def test_recording_round_trip(tmp_path):
+    snapshots = record_game(tmp_path)
+    recording = GameRecording(GAME_ID, str(tmp_path))
+    assert recording.start == 1000.0
+    assert recording.end == 1010.0
+    for ts, expected in snapshots.items():
+        assert recording.state_at(ts) == expected
+        assert recording.state_at(ts + 0.5) == expected
+    assert recording.state_at(999.0) == (None, [])
+
+
+def test_only_live_games_are_recorded(tmp_path):
+    recorder = GameRecorder(str(tmp_path))
+    recorder.record(('get_game_details', GAME_ID), make_details(GAME_ID, status='finished'), ts=1.0)
+    recorder.record(('get_play_by_play', GAME_ID), make_play_by_play(3), ts=1.0)
+    assert not (tmp_path / f'{GAME_ID}.idx').exists()
+
+
+def test_replay_advances_incrementally(tmp_path):
+    snapshots = record_game(tmp_path)
+    recording = GameRecording(GAME_ID, str(tmp_path))
+    replay = GameReplay(recording, speed=1.0)
+
+    for ts, (details, pbp) in snapshots.items():
+        replay.position = lambda ts=ts: ts
+        assert replay.details() == details
+        assert replay.play_by_play() == pbp
+
+
+def test_replay_with_offset_starts_mid_game(tmp_path):
+    snapshots = record_game(tmp_path)
+    replay = GameReplay(GameRecording(GAME_ID, str(tmp_path)), speed=1.0, offset=7.0)
+    details, pbp = snapshots[1007.0]
+    assert replay.details() == details
+    assert replay.play_by_play() == pbp
+    assert not replay.finished
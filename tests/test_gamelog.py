@@ -0,0 +1,73 @@
+import pandas as pd
+
+from gamelog import TeamGameLog
+
+HAWKS, CELTICS, NETS = 1610612737, 1610612738, 1610612751
+
+
+def game_rows(game_id, date, home, away, home_pts, away_pts):
+    """Duas linhas do LeagueGameLog (uma por time) para um jogo."""
+    rows = []
+    for team, points, allowed, matchup in ((home, home_pts, away_pts, 'HOM vs. AWY'),
+                                           (away, away_pts, home_pts, 'AWY @ HOM')):
+        rows.append({'TEAM_ID': team, 'GAME_ID': game_id, 'GAME_DATE': date, 'MATCHUP': matchup,
+                     'WL': 'W' if points > allowed else 'L', 'PTS': points, 'PLUS_MINUS': points - allowed,
+                     'FG_PCT': 0.45, 'FG3_PCT': 0.35, 'FT_PCT': 0.8, 'REB': 44, 'AST': 25, 'TOV': 13})
+    return rows
+
+
+class FakeGameLog(TeamGameLog):
+    """Game log servido de listas de linhas, registrando as datas pedidas ao upstream."""
+
+    def __init__(self, pages, **kwargs):
+        super().__init__('2023-24', **kwargs)
+        self.pages = list(pages)
+        self.requests = []
+
+    def _fetch(self, date_from):
+        self.requests.append(date_from)
+        page = self.pages.pop(0)
+        if isinstance(page, Exception):
+            raise page
+        return pd.DataFrame(page)
+
+
+def test_first_load_fetches_whole_season_and_derives_columns():
+    log = FakeGameLog([game_rows('1', '2024-01-10', HAWKS, CELTICS, 110, 100)])
+    frame = log.frame()
+    assert log.requests == [None]
+    assert log.version == 1
+    hawks = frame[frame['TEAM_ID'] == HAWKS].iloc[0]
+    assert bool(hawks['HOME']) and bool(hawks['WIN'])
+    assert hawks['OPP_PTS'] == 100
+    assert len(log.team_games(CELTICS)) == 1
+
+
+def test_refresh_fetches_from_last_date_and_replaces_repeated_games():
+    log = FakeGameLog([
+        game_rows('1', '2024-01-10', HAWKS, CELTICS, 110, 100),
+        # A última data volta com o placar corrigido, junto com um jogo novo
+        game_rows('1', '2024-01-10', HAWKS, CELTICS, 111, 100) + game_rows('2', '2024-01-12', NETS, HAWKS, 99, 101),
+    ], max_age=0)
+    log.frame()
+    log.refresh()
+    assert log.requests[1] == pd.Timestamp('2024-01-10')
+    assert log.version == 2
+    hawks = log.team_games(HAWKS)
+    assert list(hawks['GAME_ID']) == ['1', '2']
+    assert list(hawks['PTS']) == [111, 101]
+
+
+def test_fetch_error_keeps_current_table():
+    log = FakeGameLog([game_rows('1', '2024-01-10', HAWKS, CELTICS, 110, 100), RuntimeError('timeout')])
+    log.frame()
+    log.refresh()
+    assert log.version == 1
+    assert len(log.frame()) == 2
+
+
+def test_fresh_table_is_not_refetched():
+    log = FakeGameLog([game_rows('1', '2024-01-10', HAWKS, CELTICS, 110, 100)])
+    log.frame()
+    log.team_games(HAWKS)
+    assert log.requests == [None]
@@ -0,0 +1,308 @@
+import asyncio
+
+from hub import GameHub, ScoreboardHub, json_patch
+from polling import PollSchedule
+from shared import MemoryStore
+from tests.helpers import FakeClient, drain, make_action, make_details, make_play_by_play
+
+FAST = PollSchedule(live=0.01, crunch_time=0.01, period_break=0.01, halftime=0.01)
+
+
+def make_hub(client, **kwargs) -> GameHub:
+    return GameHub(client, FAST, **kwargs)
+
+
+def types(messages):
+    return [message['type'] for message in messages]
+
+
+def test_first_subscriber_receives_full_play_by_play():
+    async def scenario():
+        hub = make_hub(FakeClient(make_details(), make_play_by_play(10)))
+        queue = hub.subscribe('0022300001')
+        await asyncio.sleep(0.05)
+        messages = drain(queue)
+        update = next(m for m in messages if m['type'] == 'playbyplay_update')
+        assert len(update['data']) == 10
+        assert 'game_update' in types(messages)
+        hub.unsubscribe('0022300001', queue)
+
+    asyncio.run(scenario())
+
+
+def test_late_subscriber_gets_snapshot_from_current_state():
+    async def scenario():
+        hub = make_hub(FakeClient(make_details(), make_play_by_play(8)))
+        first = hub.subscribe('0022300001')
+        await asyncio.sleep(0.05)
+
+        second = hub.subscribe('0022300001')
+        snapshot = drain(second)
+        assert types(snapshot)[:2] == ['game_update', 'playbyplay_update']
+        assert len(snapshot[1]['data']) == 8
+        hub.unsubscribe('0022300001', first)
+        hub.unsubscribe('0022300001', second)
+
+    asyncio.run(scenario())
+
+
+def test_new_actions_and_corrections_are_sent_as_delta():
+    async def scenario():
+        client = FakeClient(make_details(), make_play_by_play(10))
+        hub = make_hub(client)
+        queue = hub.subscribe('0022300001')
+        await asyncio.sleep(0.05)
+        drain(queue)
+
+        client.pbp = make_play_by_play(12)
+        client.pbp[4] = make_action(5, description='Editada')
+        await asyncio.sleep(0.05)
+        deltas = [m for m in drain(queue) if m['type'] == 'playbyplay_delta']
+        assert len(deltas) == 1
+        delta = deltas[0]['data']
+        assert [a['actionNumber'] for a in delta['actions']] == [11, 12]
+        assert [a['actionNumber'] for a in delta['corrections']] == [5]
+        assert delta['removed'] == []
+        assert delta['lastActionNumber'] == 12
+        hub.unsubscribe('0022300001', queue)
+
+    asyncio.run(scenario())
+
+
+def test_since_with_existing_state_sends_only_missed_actions():
+    async def scenario():
+        hub = make_hub(FakeClient(make_details(), make_play_by_play(60)))
+        first = hub.subscribe('0022300001')
+        await asyncio.sleep(0.05)
+
+        resumed = hub.subscribe('0022300001', since=55)
+        delta = next(m for m in drain(resumed) if m['type'] == 'playbyplay_delta')
+        assert [a['actionNumber'] for a in delta['data']['actions']] == [56, 57, 58, 59, 60]
+        hub.unsubscribe('0022300001', first)
+        hub.unsubscribe('0022300001', resumed)
+
+    asyncio.run(scenario())
+
+
+def test_since_as_only_subscriber_sends_only_missed_actions():
+    async def scenario():
+        hub = make_hub(FakeClient(make_details(), make_play_by_play(60)))
+        resumed = hub.subscribe('0022300001', since=55)
+        fresh = hub.subscribe('0022300001')
+        await asyncio.sleep(0.05)
+
+        resumed_messages = drain(resumed)
+        assert 'playbyplay_update' not in types(resumed_messages)
+        delta = next(m for m in resumed_messages if m['type'] == 'playbyplay_delta')
+        assert [a['actionNumber'] for a in delta['data']['actions']] == [56, 57, 58, 59, 60]
+
+        update = next(m for m in drain(fresh) if m['type'] == 'playbyplay_update')
+        assert len(update['data']) == 60
+        hub.unsubscribe('0022300001', resumed)
+        hub.unsubscribe('0022300001', fresh)
+
+    asyncio.run(scenario())
+
+
+def test_description_edit_does_not_rebuild_analytics():
+    async def scenario():
+        client = FakeClient(make_details(), make_play_by_play(10))
+        hub = make_hub(client)
+        queue = hub.subscribe('0022300001')
+        await asyncio.sleep(0.05)
+        generation = hub.analytics.get('0022300001').generation
+
+        client.pbp = make_play_by_play(11)
+        client.pbp[2] = make_action(3, description='Editada')
+        await asyncio.sleep(0.05)
+        assert hub.analytics.get('0022300001').generation == generation
+        assert 'analytics_delta' in types(drain(queue))
+
+        client.pbp = make_play_by_play(11)
+        client.pbp[2] = make_action(3, scoreHome='7')
+        await asyncio.sleep(0.05)
+        assert hub.analytics.get('0022300001').generation == generation + 1
+        assert 'analytics_update' in types(drain(queue))
+        hub.unsubscribe('0022300001', queue)
+
+    asyncio.run(scenario())
+
+
+
+
+def test_action_inserted_before_last_sent_is_new_and_rebuilds_analytics():
+    async def scenario():
+        client = FakeClient(make_details(), [a for a in make_play_by_play(10) if a['actionNumber'] != 3])
+        hub = make_hub(client)
+        queue = hub.subscribe('0022300001')
+        await asyncio.sleep(0.05)
+        drain(queue)
+        generation = hub.analytics.get('0022300001').generation
+
+        client.pbp = make_play_by_play(10)
+        await asyncio.sleep(0.05)
+        messages = drain(queue)
+        delta = next(m for m in messages if m['type'] == 'playbyplay_delta')['data']
+        assert [a['actionNumber'] for a in delta['actions']] == [3]
+        assert delta['corrections'] == []
+        assert delta['lastActionNumber'] == 10
+        assert hub.analytics.get('0022300001').generation == generation + 1
+        assert 'analytics_update' in types(messages)
+        hub.unsubscribe('0022300001', queue)
+
+    asyncio.run(scenario())
+
+
+def test_json_patch():
+    old = {'games': {'1': {'status': 'live', 'homeTeam': {'score': 10}}, '2': {'status': 'live'}}}
+    new = {'games': {'1': {'status': 'live', 'homeTeam': {'score': 12}}, '3': {'status': 'pre-live'}}}
+    assert json_patch(old, new) == [
+        {'op': 'remove', 'path': '/games/2'},
+        {'op': 'replace', 'path': '/games/1/homeTeam/score', 'value': 12},
+        {'op': 'add', 'path': '/games/3', 'value': {'status': 'pre-live'}},
+    ]
+    assert json_patch(new, new) == []
+    assert json_patch({'a/b': 1, 'c~d': 1}, {'a/b': 2, 'c~d': 2}) == [
+        {'op': 'replace', 'path': '/a~1b', 'value': 2},
+        {'op': 'replace', 'path': '/c~0d', 'value': 2},
+    ]
+
+
+class FakeLiveScoreboard:
+    def __init__(self):
+        self.listeners = []
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+
+class FakeScoreboardClient:
+    """Cliente com o scoreboard ao vivo usado pelo ScoreboardHub; os jogos já chegam resumidos."""
+
+    def __init__(self):
+        self.live_scoreboard = FakeLiveScoreboard()
+
+    def live_game_summary(self, game):
+        return dict(game)
+
+
+def scoreboard_game(game_id, home_score=50, status='live'):
+    return {'gameId': game_id, 'status': status, 'homeTeam': {'score': home_score}}
+
+
+def test_scoreboard_snapshot_then_patches_for_subscribed_games():
+    client = FakeScoreboardClient()
+    hub = ScoreboardHub(client)
+    assert client.live_scoreboard.listeners == [hub.update]
+    hub.update([scoreboard_game('1'), scoreboard_game('2')])
+
+    everything = hub.subscribe()
+    only_first = hub.subscribe({'1'})
+    assert drain(everything)[0]['data'] == {'games': {'1': scoreboard_game('1'), '2': scoreboard_game('2')}}
+    assert drain(only_first)[0] == {'type': 'scoreboard_snapshot', 'data': {'games': {'1': scoreboard_game('1')}}}
+
+    hub.update([scoreboard_game('1'), scoreboard_game('2', home_score=52)])
+    assert drain(everything) == [{'type': 'scoreboard_patch', 'data': [
+        {'op': 'replace', 'path': '/games/2/homeTeam/score', 'value': 52}]}]
+    assert drain(only_first) == []
+
+    hub.update([scoreboard_game('1'), scoreboard_game('2', home_score=52), scoreboard_game('3')])
+    assert drain(everything)[0]['data'] == [{'op': 'add', 'path': '/games/3', 'value': scoreboard_game('3')}]
+    assert drain(only_first) == []
+
+    hub.unsubscribe(only_first)
+    assert hub.subscriber_count() == 1
+
+
+def test_scoreboard_full_queue_is_replaced_by_snapshot():
+    hub = ScoreboardHub(FakeScoreboardClient(), queue_size=2)
+    queue = hub.subscribe()
+    for score in range(51, 55):
+        hub.update([scoreboard_game('1', home_score=score)])
+    # O snapshot já reflete a atualização que encontrou a fila cheia
+    assert drain(queue) == [{'type': 'scoreboard_snapshot', 'data': {'games': {'1': scoreboard_game('1', 54)}}}]
+
+
+def test_scoreboard_skips_games_that_fail_to_parse():
+    client = FakeScoreboardClient()
+    client.live_game_summary = lambda game: {'gameId': game['gameId'], 'period': int(game['period'])}
+    hub = ScoreboardHub(client)
+    hub.update([{'gameId': '1', 'period': '2'}, {'gameId': '2', 'period': None}])
+    assert drain(hub.subscribe())[0]['data'] == {'games': {'1': {'gameId': '1', 'period': 2}}}
+
+
+def test_leader_polls_and_follower_relays_then_takes_over():
+    async def scenario():
+        store = MemoryStore()
+        clients = [FakeClient(make_details(), make_play_by_play(5)) for _ in range(2)]
+        hubs = [make_hub(client, store=store, owner=f'worker-{i}') for i, client in enumerate(clients)]
+        for hub in hubs:
+            hub.FOLLOW_CHECK = 0.02
+        queues = [hub.subscribe('0022300001') for hub in hubs]
+        await asyncio.sleep(0.1)
+
+        leader = 0 if clients[0].calls else 1
+        follower = 1 - leader
+        assert clients[follower].calls == 0
+        for queue in queues:
+            update = next(m for m in drain(queue) if m['type'] == 'playbyplay_update')
+            assert len(update['data']) == 5
+
+        clients[leader].pbp = clients[follower].pbp = make_play_by_play(7)
+        await asyncio.sleep(0.1)
+        delta = next(m for m in drain(queues[follower]) if m['type'] == 'playbyplay_delta')
+        assert [a['actionNumber'] for a in delta['data']['actions']] == [6, 7]
+        assert clients[follower].calls == 0
+
+        # O líder sai; o lease é liberado e o seguidor assume o polling
+        hubs[leader].unsubscribe('0022300001', queues[leader])
+        await asyncio.sleep(0.1)
+        assert await store.get('nba:leader:game:0022300001') == f'worker-{follower}'.encode()
+        assert clients[follower].calls > 0
+        hubs[follower].unsubscribe('0022300001', queues[follower])
+
+    asyncio.run(scenario())
+
+
+class FlakyStore(MemoryStore):
+    """MemoryStore cujo acquire falha nas primeiras chamadas."""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    async def acquire(self, key, owner, ttl):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('store indisponível')
+        return await super().acquire(key, owner, ttl)
+
+
+def test_poller_survives_store_errors():
+    async def scenario():
+        client = FakeClient(make_details(), make_play_by_play(5))
+        hub = make_hub(client, store=FlakyStore(failures=2), owner='worker-0')
+        hub.STORE_RETRY = 0.01
+        queue = hub.subscribe('0022300001')
+        await asyncio.sleep(0.1)
+        assert not hub._pollers['0022300001'].done()
+        assert 'playbyplay_update' in types(drain(queue))
+        hub.unsubscribe('0022300001', queue)
+
+    asyncio.run(scenario())
+
+
+def test_subscribe_restarts_a_dead_poller():
+    async def scenario():
+        hub = make_hub(FakeClient(make_details(), make_play_by_play(5)))
+        queue = hub.subscribe('0022300001')
+        poller = hub._pollers['0022300001']
+        poller.cancel()
+        await asyncio.sleep(0)
+
+        other = hub.subscribe('0022300001')
+        assert hub._pollers['0022300001'] is not poller
+        hub.unsubscribe('0022300001', queue)
+        hub.unsubscribe('0022300001', other)
+
+    asyncio.run(scenario())
@@ -0,0 +1,63 @@
+from metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_renders_help_type_and_one_line_per_label_set():
+    counter = Counter('requests_total', 'Requisições.', ['route'])
+    counter.inc(route='/a')
+    counter.inc(2, route='/a')
+    counter.inc(route='/b')
+    assert counter.render() == [
+        '# HELP requests_total Requisições.',
+        '# TYPE requests_total counter',
+        'requests_total{route="/a"} 3.0',
+        'requests_total{route="/b"} 1.0',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter('errors_total', 'Erros.', ['reason'])
+    counter.inc(reason='say "hi"\\\n')
+    assert counter.render()[-1] == 'errors_total{reason="say \\"hi\\"\\\\\\n"} 1.0'
+
+
+def test_gauge_set_and_collect():
+    gauge = Gauge('temperature', 'Temperatura.')
+    gauge.set(21.5)
+    assert gauge.render()[-1] == 'temperature 21.5'
+
+    subscribers = {'0022300001': 3}
+    collected = Gauge('subscribers', 'Inscritos.', ['game_id'],
+                      collect=lambda: {(game_id,): count for game_id, count in subscribers.items()})
+    assert collected.render()[2:] == ['subscribers{game_id="0022300001"} 3.0']
+    subscribers['0022300002'] = 1
+    assert len(collected.render()) == 4
+
+
+def test_histogram_buckets_are_cumulative_with_sum_and_count():
+    histogram = Histogram('latency_seconds', 'Latência.', ['route'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value, route='/a')
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2.0',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3.0',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4.0',
+        'latency_seconds_sum{route="/a"} 5.65',
+        'latency_seconds_count{route="/a"} 4.0',
+    ]
+
+
+def test_histogram_timer_observes_block_duration():
+    histogram = Histogram('work_seconds', 'Trabalho.', buckets=(10.0,))
+    with histogram.time():
+        pass
+    assert histogram.render()[-1] == 'work_seconds_count 1.0'
+
+
+def test_registry_renders_all_metrics_with_trailing_newline():
+    registry = Registry()
+    registry.register(Counter('a_total', 'A.')).inc()
+    registry.register(Gauge('b', 'B.')).set(2)
+    text = registry.render()
+    assert text.endswith('\n')
+    assert text.splitlines() == ['# HELP a_total A.', '# TYPE a_total counter', 'a_total 1.0',
+                                 '# HELP b B.', '# TYPE b gauge', 'b 2.0']
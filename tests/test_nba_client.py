@@ -0,0 +1,77 @@
+import datetime
+
+import pytest
+
+from nba_client import NBAClient
+from tests.helpers import game_end, make_play_by_play
+
+
+@pytest.fixture
+def client():
+    return NBAClient(archive_dir=None)
+
+
+def _date(client, days: int) -> str:
+    today = datetime.datetime.strptime(client._get_today_et(), '%m/%d/%Y')
+    return (today + datetime.timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def test_past_date_with_all_games_final_is_immutable(client):
+    games = [{'status': 'finished'}, {'status': 'finished'}]
+    assert client._games_ttl(_date(client, -1), games) is None
+
+
+def test_past_date_with_live_game_uses_status_ttl(client):
+    games = [{'status': 'live'}, {'status': 'finished'}]
+    assert client._games_ttl(_date(client, -1), games) == client.CACHE_TTL['live']
+
+
+def test_today_uses_shortest_status_ttl(client):
+    games = [{'status': 'pre-live'}, {'status': 'live'}]
+    assert client._games_ttl(_date(client, 0), games) == client.CACHE_TTL['live']
+    assert client._games_ttl(_date(client, 0), [{'status': 'pre-live'}]) == client.CACHE_TTL['pre-live']
+
+
+def test_today_all_final_is_not_immutable(client):
+    assert client._games_ttl(_date(client, 0), [{'status': 'finished'}]) is not None
+
+
+def test_play_by_play_ttl(client):
+    live = make_play_by_play(10)
+    assert client._play_by_play_ttl(live) == client.CACHE_TTL['live']
+    assert client._play_by_play_ttl(live + [game_end(11)]) is None
+
+
+def test_empty_past_date_is_cached_but_errors_are_not(client):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return results.pop(0)
+
+    past = _date(client, -3)
+    results = [None, []]
+    key = ('get_games_by_date', past)
+    ttl_for = lambda games: client._games_ttl(past, games)
+
+    assert client._cached(key, fetch, ttl_for) is None
+    assert client._cached(key, fetch, ttl_for) == []
+    assert client._cached(key, fetch, ttl_for) == []
+    assert len(calls) == 2
+
+
+def test_empty_past_date_is_archived(tmp_path):
+    client = NBAClient(archive_dir=str(tmp_path))
+    past = _date(client, -3)
+    client._fetch_games_by_date = lambda game_date: []
+    assert client.get_games_by_date(past) == []
+
+    reopened = NBAClient(archive_dir=str(tmp_path))
+    reopened._fetch_games_by_date = lambda game_date: pytest.fail("data arquivada foi buscada de novo")
+    assert reopened.get_games_by_date(past) == []
+
+
+def test_fetch_error_returns_empty_list_without_caching(client):
+    client._fetch_games_by_date = lambda game_date: None
+    assert client.get_games_by_date(_date(client, -3)) == []
+    assert client.cache.stats()['size'] == 0
@@ -0,0 +1,54 @@
+import datetime
+
+from polling import PollSchedule
+from tests.helpers import make_details
+
+
+def details(status='live', period=2, clock='PT05M00.00S', tip_off=None):
+    game = make_details(status=status, period=period)
+    game['gameClock'] = clock
+    if tip_off is not None:
+        game['gameTimeUTC'] = tip_off.strftime('%Y-%m-%dT%H:%M:%SZ')
+    return game
+
+
+def test_live_game_uses_live_interval():
+    assert PollSchedule().interval(details()) == 6.0
+
+
+def test_end_of_fourth_period_and_overtime_are_crunch_time():
+    schedule = PollSchedule()
+    assert schedule.interval(details(period=4, clock='PT04M59.00S')) == 3.0
+    assert schedule.interval(details(period=5, clock='PT01M00.00S')) == 3.0
+    assert schedule.interval(details(period=4, clock='PT06M00.00S')) == 6.0
+    assert schedule.interval(details(period=3, clock='PT01M00.00S')) == 6.0
+
+
+def test_breaks_between_periods_and_halftime():
+    schedule = PollSchedule()
+    assert schedule.interval(details(period=2, clock='PT00M00.00S')) == 60.0
+    assert schedule.interval(details(period=1, clock='PT00M00.00S')) == 20.0
+    assert schedule.interval(details(period=3, clock='PT00M00.00S')) == 20.0
+
+
+def test_finished_game_stops_polling():
+    assert PollSchedule().interval(details(status='finished')) is None
+
+
+def test_missing_details_and_unknown_status():
+    schedule = PollSchedule()
+    assert schedule.interval(None) == 30.0
+    assert schedule.interval(details(status='postponed')) == 30.0
+
+
+def test_pre_game_is_faster_close_to_tip_off():
+    schedule = PollSchedule()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    assert schedule.interval(details(status='pre-live', tip_off=now + datetime.timedelta(hours=3))) == 300.0
+    assert schedule.interval(details(status='pre-live', tip_off=now + datetime.timedelta(minutes=10))) == 60.0
+
+
+def test_pre_game_with_invalid_tip_off_time():
+    game = details(status='pre-live')
+    game['gameTimeUTC'] = 'TBD'
+    assert PollSchedule().interval(game) == 60.0
@@ -0,0 +1,40 @@
+import asyncio
+import time
+
+from ratelimit import TokenBucket
+
+
+def test_burst_up_to_capacity_does_not_wait():
+    async def scenario():
+        bucket = TokenBucket(rate=1.0, capacity=5)
+        started = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        assert time.monotonic() - started < 0.1
+        assert bucket.waits == 0
+
+    asyncio.run(scenario())
+
+
+def test_waits_for_refill_once_bucket_is_empty():
+    async def scenario():
+        bucket = TokenBucket(rate=20.0, capacity=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        # Dois tokens além da capacidade, a 20/s: ~0.1 s de espera
+        assert time.monotonic() - started >= 0.09
+        assert bucket.waits == 2
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_callers_are_throttled_to_rate():
+    async def scenario():
+        bucket = TokenBucket(rate=50.0, capacity=1)
+        started = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+        assert time.monotonic() - started >= 0.09
+        assert bucket.waits == 5
+
+    asyncio.run(scenario())
@@ -0,0 +1,74 @@
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+import responses
+from responses import EncodedResponse, cache_control, respond
+
+DATA = {'play_by_play': [{'actionNumber': number, 'description': 'Arremesso'} for number in range(100)]}
+
+
+def make_request(**headers) -> Request:
+    raw = [(name.replace('_', '-').encode(), value.encode()) for name, value in headers.items()]
+    return Request({'type': 'http', 'method': 'GET', 'path': '/', 'headers': raw})
+
+
+def test_identity_response_has_etag_and_cache_control():
+    encoded = EncodedResponse(DATA)
+    response = respond(make_request(), encoded, None)
+    assert response.status_code == 200
+    assert response.body == encoded.body
+    assert response.headers['etag'] == encoded.etag
+    assert response.headers['cache-control'] == 'public, max-age=86400, immutable'
+    assert 'content-encoding' not in response.headers
+
+
+def test_gzip_variant_has_its_own_etag():
+    encoded = EncodedResponse(DATA)
+    response = respond(make_request(accept_encoding='gzip'), encoded, 3)
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['etag'] == f'"{encoded.digest}-gzip"' != encoded.etag
+    assert response.headers['cache-control'] == 'public, max-age=3'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert gzip.decompress(response.body) == encoded.body
+
+
+def test_brotli_is_preferred_when_available():
+    if responses.brotli is None:
+        pytest.skip('brotli não instalado')
+    encoded = EncodedResponse(DATA)
+    response = respond(make_request(accept_encoding='gzip, br'), encoded, None)
+    assert response.headers['content-encoding'] == 'br'
+    assert response.headers['etag'] == f'"{encoded.digest}-br"'
+
+
+def test_refused_encoding_and_small_bodies_are_sent_uncompressed():
+    encoded = EncodedResponse(DATA)
+    assert 'content-encoding' not in respond(make_request(accept_encoding='gzip;q=0'), encoded, None).headers
+    small = EncodedResponse({'games': []})
+    assert small.gzip is None
+    assert 'content-encoding' not in respond(make_request(accept_encoding='gzip'), small, None).headers
+
+
+def test_if_none_match_returns_304_only_for_same_variant():
+    encoded = EncodedResponse(DATA)
+    gzip_etag = encoded.etag_for('gzip')
+    not_modified = respond(make_request(accept_encoding='gzip', if_none_match=gzip_etag), encoded, None)
+    assert not_modified.status_code == 304
+    assert not_modified.body == b''
+    assert not_modified.headers['etag'] == gzip_etag
+
+    # O ETag da variante gzip não valida o corpo sem compressão
+    assert respond(make_request(if_none_match=gzip_etag), encoded, None).status_code == 200
+    assert respond(make_request(if_none_match=f'"x", W/{encoded.etag}'), encoded, None).status_code == 304
+    assert respond(make_request(if_none_match='*'), encoded, None).status_code == 304
+
+
+def test_etag_changes_with_content():
+    assert EncodedResponse(DATA).etag == EncodedResponse(DATA).etag
+    assert EncodedResponse({'games': [1]}).etag != EncodedResponse({'games': [2]}).etag
+
+
+def test_cache_control_for_live_data():
+    assert cache_control(2.7) == 'public, max-age=2'
@@ -0,0 +1,59 @@
+from shotchart import X_BINS, Y_BINS, ShotChartStore, aggregate, game_shot_bins, to_response
+from tests.helpers import game_end, make_action
+
+HAWKS, CELTICS = 1610612737, 1610612738
+
+
+def shot(number, x, y, score, person=1629001, team=HAWKS, action_type='2pt'):
+    return make_action(number, actionType=action_type, x=x, y=y, personId=person, teamId=team,
+                       scoreHome=str(score), scoreAway='0')
+
+
+def test_shots_are_binned_and_made_by_score_change():
+    events = [shot(1, 1.0, 50.0, 2), shot(2, 1.0, 50.0, 2), shot(3, 30.0, 10.0, 5, action_type='3pt')]
+    attempts, made = aggregate([game_shot_bins(events)])
+    assert attempts.shape == (X_BINS, Y_BINS)
+    assert attempts[0, 12] == 2 and made[0, 12] == 1
+    assert attempts[15, 2] == 1 and made[15, 2] == 1
+    assert attempts.sum() == 3
+
+
+def test_far_side_shots_are_mirrored_to_same_basket():
+    near = aggregate([game_shot_bins([shot(1, 5.0, 20.0, 0)])])[0]
+    far = aggregate([game_shot_bins([shot(1, 95.0, 80.0, 0)])])[0]
+    assert (near == far).all()
+
+
+def test_non_shots_and_missing_coordinates_are_ignored():
+    events = [make_action(1, actionType='rebound', x=5.0, y=5.0), shot(2, None, None, 0)]
+    attempts, _ = aggregate([game_shot_bins(events)])
+    assert attempts.sum() == 0
+    assert to_response(*aggregate([game_shot_bins([])]))['totals'] == {'attempts': 0, 'made': 0, 'fgPct': 0.0}
+
+
+def test_aggregate_filters_by_team_and_player_across_games():
+    first = game_shot_bins([shot(1, 5.0, 50.0, 2), shot(2, 5.0, 50.0, 2, person=1629002, team=CELTICS)])
+    second = game_shot_bins([shot(1, 5.0, 50.0, 0)])
+    assert aggregate([first, second])[0].sum() == 3
+    assert aggregate([first, second], team_id=HAWKS)[0].sum() == 2
+    attempts, made = aggregate([first, second], person_id=1629002)
+    assert (attempts.sum(), made.sum()) == (1, 0)
+
+
+def test_to_response_lists_only_bins_with_attempts():
+    response = to_response(*aggregate([game_shot_bins([shot(1, 1.0, 50.0, 2), shot(2, 1.0, 50.0, 2)])]))
+    assert response['bins'] == [{'x': 0, 'y': 12, 'attempts': 2, 'made': 1, 'fgPct': 0.5}]
+    assert response['totals'] == {'attempts': 2, 'made': 1, 'fgPct': 0.5}
+    assert response['grid']['xBins'] == X_BINS
+
+
+def test_store_keeps_only_finished_games():
+    store = ShotChartStore(maxsize=1)
+    store.build('live', [shot(1, 1.0, 50.0, 2)])
+    assert store.get('live') is None
+
+    store.build('first', [shot(1, 1.0, 50.0, 2), game_end(2)])
+    assert store.get('first') is not None
+    store.build('second', [shot(1, 1.0, 50.0, 2), game_end(2)])
+    assert store.get('first') is None
+    assert store.get('second') is not None
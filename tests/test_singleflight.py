@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_fetch():
+    async def scenario():
+        flights = SingleFlight()
+        fetches = 0
+        release = asyncio.Event()
+
+        async def fetch():
+            nonlocal fetches
+            fetches += 1
+            await release.wait()
+            return {'value': fetches}
+
+        calls = [asyncio.create_task(flights.do(('pbp', '1'), fetch)) for _ in range(10)]
+        other = asyncio.create_task(flights.do(('pbp', '2'), fetch))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*calls, other)
+
+        assert fetches == 2
+        assert all(result is results[0] for result in results[:10])
+        assert flights.stats() == {'calls': 2, 'coalesced': 9, 'inflight': 0}
+
+    asyncio.run(scenario())
+
+
+def test_next_call_after_completion_fetches_again():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fetch():
+            return 1
+
+        await flights.do('key', fetch)
+        await flights.do('key', fetch)
+        assert flights.stats()['calls'] == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return 'ok'
+
+        first = asyncio.create_task(flights.do('key', fetch))
+        second = asyncio.create_task(flights.do('key', fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        assert await second == 'ok'
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(scenario())
+
+
+def test_errors_reach_every_caller():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0)
+            raise RuntimeError('upstream')
+
+        results = await asyncio.gather(*(flights.do('key', fetch) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flights.stats()['calls'] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,346 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import Counter
+import argparse
+import asyncio
+import datetime
+import gzip
+import json
+import os
+import random
+import re
+import time
+import httpx
+
+DEFAULT_FIXTURES_DIR = 'bench_fixtures'
+
+_PLAY_BY_PLAY_PATH = re.compile(r'/playbyplay/playbyplay_(\w+)\.json$')
+
+
+def fixture_name(url: httpx.URL) -> Optional[Tuple[str, str]]:
+    """
+    Mapeia uma URL do upstream para o arquivo de fixture correspondente.
+
+    Cobre os mesmos endpoints que o NBAClient usa: ScoreBoard ao vivo,
+    ScoreboardV3, BoxScoreSummaryV3 e PlayByPlay.
+
+    Returns:
+        Tupla (endpoint, caminho relativo do arquivo) ou None se a URL não é conhecida
+    """
+    path = url.path
+    if path.endswith('/scoreboard/todaysScoreboard_00.json'):
+        return 'scoreboard', 'todaysScoreboard.json.gz'
+    if path.endswith('/scoreboardv3'):
+        return 'scoreboardv3', f"scoreboardv3/{url.params.get('GameDate', '')}.json.gz"
+    if path.endswith('/boxscoresummaryv3'):
+        return 'boxscoresummaryv3', f"boxscoresummaryv3/{url.params.get('GameID', '')}.json.gz"
+    match = _PLAY_BY_PLAY_PATH.search(path)
+    if match:
+        return 'playbyplay', f"playbyplay/{match.group(1)}.json.gz"
+    return None
+
+
+def save_fixture(directory: str, relative_path: str, data: Any) -> None:
+    """Grava uma fixture como JSON comprimido com gzip."""
+    path = os.path.join(directory, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+
+
+def load_fixture(directory: str, relative_path: str) -> Optional[Any]:
+    """Lê uma fixture gravada; None se ela não existir."""
+    path = os.path.join(directory, relative_path)
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Substituto offline do upstream da NBA para o AsyncNBAClient.
+
+    Responde às mesmas URLs do stats.nba.com e do cdn.nba.com com respostas
+    gravadas em disco (ver `record` e `synthesize`), com latência e taxa de
+    erro configuráveis. Com `live_pace`, o play-by-play dos jogos ao vivo no
+    scoreboard gravado cresce com o tempo, como durante um jogo real.
+    """
+
+    def __init__(self, directory: str = DEFAULT_FIXTURES_DIR, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, live_pace: float = 0.0, seed: Optional[int] = None):
+        """
+        Args:
+            directory: Diretório das fixtures
+            latency: Latência fixa por requisição (segundos)
+            jitter: Latência extra aleatória, uniforme entre 0 e `jitter` (segundos)
+            error_rate: Fração das requisições respondidas com 503
+            live_pace: Ações por segundo liberadas no play-by-play dos jogos ao vivo (0 = completo)
+            seed: Semente do gerador aleatório, para execuções reproduzíveis
+        """
+        self.directory = directory
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.live_pace = live_pace
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._random = random.Random(seed)
+        self._bodies: Dict[str, Optional[bytes]] = {}
+        self._live_ids: Optional[set] = None
+        self._started = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """Requisições e erros injetados por endpoint."""
+        return {'requests': dict(self.requests), 'errors': dict(self.errors)}
+
+    def _load(self, relative_path: str) -> Optional[bytes]:
+        """Corpo JSON da fixture (mantido em memória após a primeira leitura) ou None."""
+        if relative_path not in self._bodies:
+            path = os.path.join(self.directory, relative_path)
+            body = None
+            if os.path.exists(path):
+                with gzip.open(path, 'rb') as f:
+                    body = f.read()
+            self._bodies[relative_path] = body
+        return self._bodies[relative_path]
+
+    def _live_game_ids(self) -> set:
+        """IDs dos jogos ao vivo no scoreboard gravado."""
+        if self._live_ids is None:
+            body = self._load('todaysScoreboard.json.gz')
+            games = json.loads(body)['scoreboard']['games'] if body else []
+            self._live_ids = {str(game['gameId']) for game in games if game['gameStatus'] == 2}
+        return self._live_ids
+
+    def _live_play_by_play(self, game_id: str, body: bytes) -> bytes:
+        """Play-by-play de um jogo ao vivo truncado no ponto atual do jogo simulado."""
+        data = json.loads(body)
+        actions = data['game']['actions']
+        available = max(1, int((time.monotonic() - self._started) * self.live_pace))
+        data['game']['actions'] = actions[:available]
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        name = fixture_name(request.url)
+        if name is None:
+            return httpx.Response(404, request=request)
+        endpoint, relative_path = name
+        self.requests[endpoint] += 1
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors[endpoint] += 1
+            return httpx.Response(503, request=request)
+
+        body = self._load(relative_path)
+        if body is None:
+            return httpx.Response(404, request=request)
+        if endpoint == 'playbyplay' and self.live_pace:
+            game_id = _PLAY_BY_PLAY_PATH.search(request.url.path).group(1)
+            if game_id in self._live_game_ids():
+                body = self._live_play_by_play(game_id, body)
+        return httpx.Response(200, content=body, headers={'Content-Type': 'application/json'}, request=request)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Repassa as requisições ao transporte real e grava as respostas 200 como fixtures."""
+
+    def __init__(self, directory: str = DEFAULT_FIXTURES_DIR, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.directory = directory
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        name = fixture_name(request.url)
+        if name is None or response.status_code != 200:
+            return response
+        body = await response.aread()
+        save_fixture(self.directory, name[1], json.loads(body))
+        # O corpo já foi lido (e descomprimido); devolve uma resposta nova com ele
+        return httpx.Response(200, content=body, headers={'Content-Type': 'application/json'}, request=request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def transport_from_env() -> Optional[ReplayTransport]:
+    """
+    ReplayTransport configurado por variáveis de ambiente, ou None se
+    NBA_UPSTREAM_FIXTURES não estiver definida (upstream real).
+    """
+    directory = os.environ.get('NBA_UPSTREAM_FIXTURES')
+    if not directory:
+        return None
+    return ReplayTransport(
+        directory,
+        latency=float(os.environ.get('NBA_UPSTREAM_LATENCY', 0)),
+        jitter=float(os.environ.get('NBA_UPSTREAM_JITTER', 0)),
+        error_rate=float(os.environ.get('NBA_UPSTREAM_ERROR_RATE', 0)),
+        live_pace=float(os.environ.get('NBA_UPSTREAM_LIVE_PACE', 0)),
+    )
+
+
+async def record(game_date: str, directory: str = DEFAULT_FIXTURES_DIR) -> None:
+    """
+    Grava as respostas reais do upstream para uma data: ScoreboardV3 da data,
+    detalhes e play-by-play de cada jogo e o ScoreBoard ao vivo de hoje.
+    """
+    from async_client import AsyncNBAClient
+
+    client = AsyncNBAClient(archive_dir=None, transport=RecordingTransport(directory))
+    try:
+        games = await client.get_games_by_date(game_date)
+        game_ids = [game['gameId'] for game in games]
+        game_ids += [str(game['gameId']) for game in await client.live_scoreboard.games()]
+        for game_id in dict.fromkeys(game_ids):
+            await client.get_game_details(game_id)
+            await client.get_play_by_play(game_id)
+            print(f"Gravado {game_id}")
+    finally:
+        await client.aclose()
+
+
+def _season_code(game_date: str) -> str:
+    """Dois dígitos da temporada usados no ID do jogo (a temporada começa em outubro)."""
+    year, month = int(game_date[:4]), int(game_date[5:7])
+    return f"{(year if month >= 8 else year - 1) % 100:02d}"
+
+
+def _synthetic_team(team: Dict[str, Any], score: int, periods: List[int]) -> Dict[str, Any]:
+    return {
+        'teamId': team['id'],
+        'teamName': team['nickname'],
+        'teamCity': team['city'],
+        'teamTricode': team['abbreviation'],
+        'teamWins': 0,
+        'teamLosses': 0,
+        'wins': 0,
+        'losses': 0,
+        'score': score,
+        'periods': [{'period': i + 1, 'periodType': 'REGULAR', 'score': points} for i, points in enumerate(periods)],
+        'players': [],
+        'inactives': [],
+    }
+
+
+def _synthetic_actions(rng: random.Random, home: Dict[str, Any], away: Dict[str, Any],
+                       count: int, finished: bool) -> Tuple[List[Dict[str, Any]], List[List[int]]]:
+    """Play-by-play aleatório e os pontos por período de cada time."""
+    actions = []
+    scores = [0, 0]
+    periods = [[0] * 4, [0] * 4]
+    for number in range(1, count + 1):
+        period = min(4, 1 + (number - 1) * 4 // count)
+        remaining = 720 - ((number - 1) % max(1, count // 4)) * 720 // max(1, count // 4)
+        side = rng.randrange(2)
+        team = (home, away)[side]
+        action_type = rng.choices(('2pt', '3pt', 'freethrow', 'rebound', 'turnover'), (35, 15, 10, 30, 10))[0]
+        made = action_type in ('2pt', '3pt', 'freethrow') and rng.random() < 0.5
+        if made:
+            points = {'2pt': 2, '3pt': 3, 'freethrow': 1}[action_type]
+            scores[side] += points
+            periods[side][period - 1] += points
+        shot = action_type in ('2pt', '3pt')
+        x = rng.uniform(5, 45) if shot else None
+        actions.append({
+            'actionNumber': number,
+            'actionType': action_type,
+            'subType': 'Jump Shot' if shot else '',
+            'clock': f'PT{remaining // 60:02d}M{remaining % 60:02d}.00S',
+            'period': period,
+            'periodType': 'REGULAR',
+            'teamId': team['id'],
+            'teamTricode': team['abbreviation'],
+            # IDs no formato dos reais (7 dígitos); cabem no int32 das tabelas colunares
+            'personId': 1629000 + team['id'] % 100 * 10 + rng.randrange(8),
+            'scoreHome': str(scores[0]),
+            'scoreAway': str(scores[1]),
+            'possession': team['id'],
+            'x': None if x is None else (100 - x if side else x),
+            'y': rng.uniform(5, 95) if shot else None,
+        })
+    if finished:
+        actions.append({
+            'actionNumber': count + 1, 'actionType': 'game', 'subType': 'end', 'clock': 'PT00M00.00S',
+            'period': 4, 'periodType': 'REGULAR', 'scoreHome': str(scores[0]), 'scoreAway': str(scores[1]),
+        })
+    return actions, periods
+
+
+def synthesize(game_date: str, directory: str = DEFAULT_FIXTURES_DIR, games: int = 10,
+               actions: int = 450, seed: int = 0) -> None:
+    """
+    Gera um conjunto de fixtures sintético, para benchmarks sem gravação real:
+    `games` jogos finalizados na data informada e `games` jogos ao vivo no
+    ScoreBoard de hoje, cada um com ~`actions` ações de play-by-play.
+    """
+    from nba_api.stats.static import teams
+
+    rng = random.Random(seed)
+    all_teams = teams.get_teams()
+    # Jogos ao vivo precisam de IDs da temporada atual; os de temporadas passadas nunca são tratados como ao vivo
+    today = datetime.date.today().isoformat()
+    scoreboard_games = []
+    live_games = []
+    for i in range(2 * games):
+        finished = i < games
+        home, away = rng.sample(all_teams, 2)
+        date = game_date if finished else today
+        game_id = f"002{_season_code(date)}{(2 if finished else 9) * 10000 + i:05d}"
+        plays, periods = _synthetic_actions(rng, home, away, actions, finished)
+        game = {
+            'gameId': game_id,
+            'gameCode': f"{date.replace('-', '')}/{away['abbreviation']}{home['abbreviation']}",
+            'gameStatus': 3 if finished else 2,
+            'gameStatusText': 'Final' if finished else 'Q4 5:00',
+            'period': 4,
+            'gameClock': '' if finished else 'PT05M00.00S',
+            'gameTimeUTC': f'{date}T00:00:00Z',
+            'gameEt': f'{date}T19:00:00',
+            'duration': '2:15' if finished else '',
+            'arena': {'arenaName': '', 'arenaCity': home['city'], 'arenaState': home['state'], 'arenaCountry': 'US'},
+            'attendance': 18000,
+            'homeTeam': _synthetic_team(home, sum(periods[0]), periods[0]),
+            'awayTeam': _synthetic_team(away, sum(periods[1]), periods[1]),
+            'officials': [],
+            'lastFiveMeetings': [],
+        }
+        save_fixture(directory, f'playbyplay/{game_id}.json.gz', {'game': {'gameId': game_id, 'actions': plays}})
+        if finished:
+            scoreboard_games.append(game)
+            save_fixture(directory, f'boxscoresummaryv3/{game_id}.json.gz', {'boxScoreSummary': game})
+        else:
+            live_games.append(game)
+    save_fixture(directory, f'scoreboardv3/{game_date}.json.gz', {'scoreboard': {'gameDate': game_date, 'games': scoreboard_games}})
+    save_fixture(directory, 'todaysScoreboard.json.gz', {'scoreboard': {'games': live_games}})
+    print(f"{len(scoreboard_games)} jogos finalizados em {game_date} e {len(live_games)} ao vivo gravados em {directory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixtures do upstream da NBA para uso offline")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help="Grava as respostas reais do upstream para uma data")
+    record_parser.add_argument('date', help="Data no formato YYYY-MM-DD")
+    record_parser.add_argument('--dir', default=DEFAULT_FIXTURES_DIR, help="Diretório das fixtures")
+    synth_parser = subparsers.add_parser('synthesize', help="Gera fixtures sintéticas")
+    synth_parser.add_argument('date', help="Data dos jogos finalizados (YYYY-MM-DD)")
+    synth_parser.add_argument('--dir', default=DEFAULT_FIXTURES_DIR, help="Diretório das fixtures")
+    synth_parser.add_argument('--games', type=int, default=10, help="Jogos finalizados e ao vivo (cada)")
+    synth_parser.add_argument('--actions', type=int, default=450, help="Ações de play-by-play por jogo")
+    synth_parser.add_argument('--seed', type=int, default=0, help="Semente do gerador")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        try:
+            datetime.datetime.strptime(args.date, '%Y-%m-%d')
+        except ValueError:
+            parser.error("Data deve estar no formato YYYY-MM-DD")
+        asyncio.run(record(args.date, args.dir))
+    else:
+        synthesize(args.date, args.dir, args.games, args.actions, args.seed)
+
+
+if __name__ == '__main__':
+    main()